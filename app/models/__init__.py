@@ -0,0 +1,5 @@
+"""Domain models built straight from repository rows."""
+from app.models.autor import Autor
+from app.models.obra import Obra
+
+__all__ = ["Autor", "Obra"]
@@ -0,0 +1,24 @@
+"""Field projection shared by the tuple-based models."""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.utils.fast_json import Column
+
+
+@lru_cache(maxsize=256)
+def columns_for(
+    all_fields: Tuple[str, ...], fields: Optional[Tuple[str, ...]]
+) -> Tuple[Column, ...]:
+    """``(key, position)`` pairs for ``rows_to_json``, projected to ``fields`` in that order."""
+    if fields is None:
+        return tuple((name, position) for position, name in enumerate(all_fields))
+    unknown = [name for name in fields if name not in all_fields]
+    if unknown:
+        raise ValueError(f"Campo desconocido: '{unknown[0]}'.")
+    return tuple((name, all_fields.index(name)) for name in fields)
+
+
+def project(row: Sequence, columns: Sequence[Column]) -> Dict[str, object]:
+    return {name: row[position] for name, position in columns}
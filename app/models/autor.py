@@ -0,0 +1,32 @@
+"""Autor model: an author row as an immutable tuple."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from app.models._fields import columns_for, project
+from app.utils.fast_json import Column, RawJSON, rows_to_json
+
+
+class Autor(NamedTuple):
+    """An author; ``total_obras`` is None when the query did not aggregate obras."""
+
+    id: int
+    nombre: str
+    total_obras: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "Autor":
+        return cls(*row)
+
+    @classmethod
+    def columns(cls, fields: Optional[Sequence[str]] = None) -> Tuple[Column, ...]:
+        """Columns for ``rows_to_json``; ``fields`` selects and orders them."""
+        return columns_for(cls._fields, None if fields is None else tuple(fields))
+
+    @classmethod
+    def to_json(cls, autores: Iterable["Autor"], fields: Optional[Sequence[str]] = None) -> RawJSON:
+        """Encode ``autores`` as a JSON array of objects (see ``rows_to_json``)."""
+        return rows_to_json(autores, cls.columns(fields))
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        return project(self, self.columns(fields))
@@ -0,0 +1,43 @@
+"""Obra model: one catalog row as an immutable tuple."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from app.models._fields import columns_for, project
+from app.utils.fast_json import Column, RawJSON, rows_to_json
+
+
+class Obra(NamedTuple):
+    """An obra with its author name and coordinates.
+
+    Field order matches the repository SELECT lists, so ``Obra._make(row)``
+    wraps a cursor row without copying values. Instances carry no
+    ``__dict__`` and still work wherever rows are read by position
+    (snapshots, columnar and binary encoders).
+    """
+
+    id: int
+    nombre: str
+    autor_id: Optional[int]
+    autor: Optional[str]
+    anio: Optional[int]
+    tipo: Optional[str]
+    comuna: Optional[str]
+    barrio: Optional[str]
+    direccion: Optional[str]
+    descripcion: Optional[str]
+    lat: Optional[float]
+    lon: Optional[float]
+
+    @classmethod
+    def columns(cls, fields: Optional[Sequence[str]] = None) -> Tuple[Column, ...]:
+        """Columns for ``rows_to_json``; ``fields`` selects and orders them."""
+        return columns_for(cls._fields, None if fields is None else tuple(fields))
+
+    @classmethod
+    def to_json(cls, obras: Iterable["Obra"], fields: Optional[Sequence[str]] = None) -> RawJSON:
+        """Encode ``obras`` as a JSON array of objects (see ``rows_to_json``)."""
+        return rows_to_json(obras, cls.columns(fields))
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        return project(self, self.columns(fields))
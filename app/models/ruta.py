@@ -0,0 +1,14 @@
+"""Walking-route value types."""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+
+class Parada(NamedTuple):
+    """One stop of a route; ``id`` is None for the starting point."""
+
+    id: Optional[int]
+    nombre: str
+    autor: Optional[str]
+    lat: float
+    lon: float
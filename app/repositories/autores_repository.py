@@ -1,14 +1,27 @@
 """Repository layer for autores queries."""
 from __future__ import annotations
 
-from typing import Any, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
+from psycopg2.extras import execute_values
 
-AutorRow = Tuple[int, str]
-AutorWithCountRow = Tuple[int, str, int]
+from app import settings
+from app.models.autor import Autor
+from app.repositories.counts import count_total
+from app.utils.query_log import query_shape, timed_execute
 
 
+# Cuenta por autor con el índice de obras.autor_id: una página solo cuenta sus propios autores.
 _DEF_CTE = (
+    "WITH agg AS ("
+    "SELECT a.id, a.nombre, "
+    "(SELECT COUNT(o.id) FROM obras o WHERE o.autor_id = a.id) AS total_obras "
+    "FROM autores a"
+    ") "
+)
+# Filtrar por total exige todos los conteos: una sola agregación sale más barata.
+_TOTALS_CTE = (
     "WITH agg AS ("
     "SELECT a.id, a.nombre, COUNT(o.id) AS total_obras "
     "FROM autores a "
@@ -43,6 +56,22 @@ def _build_filters(
     return where_sql, params
 
 
+@lru_cache(maxsize=settings.PREPARED_CACHE_SIZE)
+def _statements(where_sql: str) -> Tuple[str, str, str]:
+    """Return the count, estimate and data SQL for one filter combination (built once)."""
+    cte = _TOTALS_CTE if "total_obras" in where_sql else _DEF_CTE
+    count_sql = cte + f" SELECT COUNT(*) FROM agg{where_sql}"
+    rows_sql = cte + f" SELECT 1 FROM agg{where_sql}"
+    data_sql = (
+        cte
+        + " SELECT agg.id, agg.nombre, agg.total_obras "
+        + f" FROM agg{where_sql} "
+        + "ORDER BY agg.nombre ASC "
+        + "LIMIT %s OFFSET %s"
+    )
+    return count_sql, rows_sql, data_sql
+
+
 def list_autores(
     conn,
     *,
@@ -51,30 +80,139 @@ def list_autores(
     max_obras: Optional[int] = None,
     limit: int,
     offset: int,
-) -> Tuple[List[AutorWithCountRow], int]:
-    """Return autores rows and total count applying filters and pagination."""
+    count: str = "exact",
+) -> Tuple[List[Autor], Optional[int]]:
+    """Return autores rows and total count (per ``count`` mode) applying filters and pagination."""
     where_sql, params = _build_filters(nombre, min_obras, max_obras)
+    shape = query_shape(
+        {"nombre": nombre, "min_obras": min_obras, "max_obras": max_obras}, offset
+    )
+
+    count_sql, rows_sql, data_sql = _statements(where_sql)
 
     with conn.cursor() as cur:
-        count_sql = _DEF_CTE + f" SELECT COUNT(*) FROM agg{where_sql}"
-        cur.execute(count_sql, params)
-        total = cur.fetchone()[0]
-
-        data_sql = (
-            _DEF_CTE
-            + " SELECT agg.id, agg.nombre, agg.total_obras "
-            + f" FROM agg{where_sql} "
-            + "ORDER BY agg.nombre ASC "
-            + "LIMIT %s OFFSET %s"
+        total = count_total(
+            cur,
+            count,
+            table="autores",
+            where_sql=where_sql,
+            params=params,
+            count_sql=count_sql,
+            rows_sql=rows_sql,
+            source="list_autores",
+            shape=shape,
+        )
+
+        timed_execute(
+            cur,
+            data_sql,
+            [*params, limit, offset],
+            source="list_autores",
+            statement="data",
+            shape=shape,
         )
-        cur.execute(data_sql, [*params, limit, offset])
-        rows = cur.fetchall()
+        rows = list(map(Autor._make, cur.fetchall()))
 
     return rows, total
 
 
-def get_autor(conn, autor_id: int) -> Optional[AutorRow]:
-    """Return single author or None."""
+def get_autor(conn, autor_id: int, *, with_total: bool = False) -> Optional[Autor]:
+    """Return single author or None; ``total_obras`` is only read ``with_total``."""
+    sql = "SELECT id, nombre FROM autores WHERE id = %s"
+    if with_total:
+        sql = (
+            "SELECT id, nombre, "
+            "(SELECT COUNT(o.id) FROM obras o WHERE o.autor_id = autores.id) "
+            "FROM autores WHERE id = %s"
+        )
+    with conn.cursor() as cur:
+        cur.execute(sql, (autor_id,))
+        row = cur.fetchone()
+    return Autor.from_row(row) if row else None
+
+
+def list_all_autores(conn) -> List[Autor]:
+    """Return every author with its obra count, ordered by name."""
     with conn.cursor() as cur:
-        cur.execute("SELECT id, nombre FROM autores WHERE id = %s", (autor_id,))
-        return cur.fetchone()
+        cur.execute(
+            _TOTALS_CTE + " SELECT agg.id, agg.nombre, agg.total_obras FROM agg "
+            "ORDER BY agg.nombre ASC"
+        )
+        return list(map(Autor._make, cur.fetchall()))
+
+
+def upsert_autores(conn, records: Sequence[Mapping[str, Any]]) -> List[Tuple[str, Any]]:
+    """Create autores by ``nombre`` or rename them by ``id``, in a fixed number of statements.
+
+    Returns ``(status, id)`` per record, where status is ``created``, ``updated``
+    or ``unchanged``, or ``("error", message)`` for records that cannot apply.
+    """
+    outcomes: List[Tuple[str, Any]] = [("error", "")] * len(records)
+    ids = sorted({record["id"] for record in records if record.get("id") is not None})
+    names = sorted({record["nombre"] for record in records})
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT id, nombre FROM autores WHERE id = ANY(%s) OR nombre = ANY(%s)",
+            (ids, names),
+        )
+        by_id: Dict[int, str] = {}
+        by_name: Dict[str, int] = {}
+        for autor_id, nombre in cur.fetchall():
+            by_id[autor_id] = nombre
+            by_name[nombre] = autor_id
+
+        renames: List[Tuple[int, int, str]] = []
+        inserts: List[Tuple[int, str]] = []
+        seen_ids, seen_names = set(), set()
+        for position, record in enumerate(records):
+            autor_id, nombre = record.get("id"), record["nombre"]
+            if nombre in seen_names or autor_id in seen_ids:
+                outcomes[position] = ("error", "Registro duplicado en el lote.")
+                continue
+            seen_names.add(nombre)
+            if autor_id is None:
+                if nombre in by_name:
+                    outcomes[position] = ("unchanged", by_name[nombre])
+                else:
+                    inserts.append((position, nombre))
+                continue
+            seen_ids.add(autor_id)
+            if autor_id not in by_id:
+                outcomes[position] = ("error", f"Autor {autor_id} no encontrado.")
+            elif by_id[autor_id] == nombre:
+                outcomes[position] = ("unchanged", autor_id)
+            elif by_name.get(nombre, autor_id) != autor_id:
+                outcomes[position] = (
+                    "error",
+                    f"El nombre '{nombre}' ya pertenece al autor {by_name[nombre]}.",
+                )
+            else:
+                renames.append((position, autor_id, nombre))
+
+        if renames:
+            execute_values(
+                cur,
+                "UPDATE autores AS a SET nombre = v.nombre "
+                "FROM (VALUES %s) AS v(id, nombre) WHERE a.id = v.id",
+                [(autor_id, nombre) for _, autor_id, nombre in renames],
+                template="(%s::int, %s::text)",
+                page_size=len(renames),
+            )
+            for position, autor_id, _ in renames:
+                outcomes[position] = ("updated", autor_id)
+        if inserts:
+            # DO UPDATE (no DO NOTHING) para recibir el id aunque otro proceso lo haya creado.
+            created = dict(
+                execute_values(
+                    cur,
+                    "INSERT INTO autores (nombre) VALUES %s "
+                    "ON CONFLICT (nombre) DO UPDATE SET nombre = EXCLUDED.nombre "
+                    "RETURNING nombre, id",
+                    [(nombre,) for _, nombre in inserts],
+                    page_size=len(inserts),
+                    fetch=True,
+                )
+            )
+            for position, nombre in inserts:
+                outcomes[position] = ("created", created[nombre])
+    return outcomes
@@ -0,0 +1,57 @@
+"""Exact, estimated or skipped totals for paginated repository queries."""
+from __future__ import annotations
+
+import json
+from typing import Any, Optional, Sequence
+
+from app.utils.query_log import timed_execute
+
+COUNT_MODES = ("exact", "estimate", "none")
+
+
+def table_estimate(cur, table: str) -> Optional[int]:
+    """Return ``pg_class.reltuples`` for ``table`` or None before the first ANALYZE."""
+    cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", (table,))
+    row = cur.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def planner_estimate(cur, sql: str, params: Sequence[Any]) -> int:
+    """Return the planner's row estimate for ``sql`` without executing it."""
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(
+    cur,
+    mode: str,
+    *,
+    table: str,
+    where_sql: str,
+    params: Sequence[Any],
+    count_sql: str,
+    rows_sql: str,
+    source: str,
+    shape: str,
+) -> Optional[int]:
+    """Return the total for ``mode``: ``COUNT(*)``, an estimate, or None.
+
+    Estimates come from table statistics when there are no filters and from
+    the planner's row estimate for ``rows_sql`` otherwise; a table that was
+    never analyzed falls back to the planner as well.
+    """
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        total = table_estimate(cur, table) if not where_sql else None
+        if total is None:
+            total = planner_estimate(cur, rows_sql, params)
+        return total
+
+    timed_execute(cur, count_sql, params, source=source, statement="count", shape=shape)
+    return cur.fetchone()[0]
@@ -0,0 +1,35 @@
+"""Repository layer for the dataset version counter."""
+from __future__ import annotations
+
+import json
+import time
+
+# Canal LISTEN/NOTIFY por el que los workers se enteran de una nueva versión.
+DATASET_CHANNEL = "pm_dataset_version"
+
+
+def get_dataset_version(conn) -> int:
+    """Return the current dataset version (0 when the row is missing)."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT version FROM dataset_version WHERE id")
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def bump_dataset_version(conn) -> int:
+    """Increment the dataset version inside the caller's transaction.
+
+    Also queues a ``NOTIFY`` on ``DATASET_CHANNEL``; PostgreSQL delivers it
+    only when the caller commits, so listeners never see uncommitted data.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO dataset_version (id, version) VALUES (TRUE, 1) "
+            "ON CONFLICT (id) DO UPDATE "
+            "SET version = dataset_version.version + 1, updated_at = NOW() "
+            "RETURNING version"
+        )
+        version = int(cur.fetchone()[0])
+        payload = json.dumps({"version": version, "sent_at": time.time()})
+        cur.execute("SELECT pg_notify(%s, %s)", (DATASET_CHANNEL, payload))
+    return version
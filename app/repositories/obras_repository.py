@@ -1,23 +1,53 @@
 """Repository layer for obra queries."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
+from psycopg2.extras import execute_values
 
-ObraRow = Tuple[
-    int,
-    str,
-    int,
-    str,
-    Optional[int],
-    Optional[str],
-    Optional[str],
-    Optional[str],
-    Optional[str],
-    Optional[str],
-    Optional[float],
-    Optional[float],
-]
+from app import settings
+from app.models.obra import Obra
+from app.repositories.counts import count_total
+from app.repositories.spatial import near_clauses
+from app.utils.query_log import query_shape, timed_execute
+
+# Expresión SQL de cada campo de Obra, en el orden del modelo.
+OBRA_SELECT = {
+    "id": "o.id",
+    "nombre": "o.nombre",
+    "autor_id": "o.autor_id",
+    "autor": "a.nombre",
+    "anio": "o.anio",
+    "tipo": "o.tipo",
+    "comuna": "o.comuna",
+    "barrio": "o.barrio",
+    "direccion": "o.direccion",
+    "descripcion": "o.descripcion",
+    "lat": "CASE WHEN o.ubicacion IS NOT NULL THEN ST_Y(o.ubicacion::geometry) END",
+    "lon": "CASE WHEN o.ubicacion IS NOT NULL THEN ST_X(o.ubicacion::geometry) END",
+}
+
+
+def _select_fields(fields: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+    """Canonical (model-ordered) field tuple, so each set shares one statement."""
+    if fields is None:
+        return None
+    return tuple(name for name in Obra._fields if name in fields)
+
+
+def _select_list(fields: Optional[Tuple[str, ...]]) -> str:
+    # Los campos no pedidos salen como NULL: la fila conserva la forma de Obra
+    # sin leer la columna ni evaluar las funciones PostGIS.
+    return ", ".join(
+        OBRA_SELECT[name] if fields is None or name in fields else "NULL"
+        for name in Obra._fields
+    )
+
+
+def _escape_like(value: str) -> str:
+    # Subcadena literal: '%' y '_' del usuario no son comodines (igual que el índice en memoria).
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 def _build_filters(
@@ -37,7 +67,7 @@ def _build_filters(
         params.append(autor_id)
     if autor:
         clauses.append("a.nombre ILIKE %s")
-        params.append(f"%{autor}%")
+        params.append(f"%{_escape_like(autor)}%")
     if comuna:
         clauses.append("o.comuna = %s")
         params.append(comuna)
@@ -48,10 +78,9 @@ def _build_filters(
         clauses.append("o.anio = %s")
         params.append(anio)
     if near:
-        clauses.append(
-            "ST_DWithin(o.ubicacion::geography, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)"
-        )
-        params.extend([near["lon"], near["lat"], near["radius"]])
+        near_sql, near_params = near_clauses(near)
+        clauses.extend(near_sql)
+        params.extend(near_params)
 
     where_sql = ""
     if clauses:
@@ -60,6 +89,26 @@ def _build_filters(
     return where_sql, params
 
 
+@lru_cache(maxsize=settings.PREPARED_CACHE_SIZE)
+def _statements(
+    where_sql: str, fields: Optional[Tuple[str, ...]] = None
+) -> Tuple[str, str, str]:
+    """Return the count, estimate and data SQL for one filter/field combination (built once)."""
+    count_sql = (
+        "SELECT COUNT(*) FROM obras o JOIN autores a ON o.autor_id = a.id"
+        f"{where_sql}"
+    )
+    rows_sql = f"SELECT 1 FROM obras o JOIN autores a ON o.autor_id = a.id{where_sql}"
+    data_sql = (
+        f"SELECT {_select_list(fields)} "
+        "FROM obras o JOIN autores a ON o.autor_id = a.id "
+        f"{where_sql} "
+        "ORDER BY o.anio DESC NULLS LAST, o.id ASC "
+        "LIMIT %s OFFSET %s"
+    )
+    return count_sql, rows_sql, data_sql
+
+
 def list_obras(
     conn,
     *,
@@ -70,30 +119,45 @@ def list_obras(
     near: Optional[Dict[str, float]] = None,
     limit: int,
     offset: int,
-) -> Tuple[List[ObraRow], int]:
-    """Return obras rows and total count applying filters and pagination."""
+    count: str = "exact",
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[List[Obra], Optional[int]]:
+    """Return obras rows and total count applying filters and pagination.
+
+    ``count`` selects how the total is obtained (see ``count_total``); it is
+    None with ``count="none"``. With ``fields`` only those columns are read;
+    the other model fields come back as None.
+    """
     where_sql, params = _build_filters(autor, comuna, tipo, anio, None, near)
+    shape = query_shape(
+        {"autor": autor, "comuna": comuna, "tipo": tipo, "anio": anio, "near": near},
+        offset,
+    )
+
+    count_sql, rows_sql, data_sql = _statements(where_sql, _select_fields(fields))
 
     with conn.cursor() as cur:
-        count_sql = (
-            "SELECT COUNT(*) FROM obras o JOIN autores a ON o.autor_id = a.id"
-            f"{where_sql}"
+        total = count_total(
+            cur,
+            count,
+            table="obras",
+            where_sql=where_sql,
+            params=params,
+            count_sql=count_sql,
+            rows_sql=rows_sql,
+            source="list_obras",
+            shape=shape,
         )
-        cur.execute(count_sql, params)
-        total = cur.fetchone()[0]
-
-        data_sql = (
-            "SELECT o.id, o.nombre, o.autor_id, a.nombre, o.anio, o.tipo, o.comuna, "
-            "o.barrio, o.direccion, o.descripcion, "
-            "CASE WHEN o.ubicacion IS NOT NULL THEN ST_Y(o.ubicacion::geometry) END AS lat, "
-            "CASE WHEN o.ubicacion IS NOT NULL THEN ST_X(o.ubicacion::geometry) END AS lon "
-            "FROM obras o JOIN autores a ON o.autor_id = a.id "
-            f"{where_sql} "
-            "ORDER BY o.anio DESC NULLS LAST, o.id ASC "
-            "LIMIT %s OFFSET %s"
+
+        timed_execute(
+            cur,
+            data_sql,
+            [*params, limit, offset],
+            source="list_obras",
+            statement="data",
+            shape=shape,
         )
-        cur.execute(data_sql, [*params, limit, offset])
-        rows: List[ObraRow] = cur.fetchall()
+        rows = list(map(Obra._make, cur.fetchall()))
 
     return rows, total
 
@@ -107,29 +171,275 @@ def list_obras_by_autor(
     anio: Optional[int] = None,
     limit: int,
     offset: int,
-) -> Tuple[List[ObraRow], int]:
-    """Return obras for a given author with optional filters."""
+    count: str = "exact",
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[List[Obra], Optional[int]]:
+    """Return obras for a given author with optional filters, ``count`` mode and ``fields``."""
     where_sql, params = _build_filters(None, comuna, tipo, anio, autor_id, None)
+    shape = query_shape(
+        {"autor_id": autor_id, "comuna": comuna, "tipo": tipo, "anio": anio},
+        offset,
+    )
+
+    count_sql, rows_sql, data_sql = _statements(where_sql, _select_fields(fields))
 
     with conn.cursor() as cur:
-        count_sql = (
-            "SELECT COUNT(*) FROM obras o JOIN autores a ON o.autor_id = a.id"
-            f"{where_sql}"
+        total = count_total(
+            cur,
+            count,
+            table="obras",
+            where_sql=where_sql,
+            params=params,
+            count_sql=count_sql,
+            rows_sql=rows_sql,
+            source="list_obras_by_autor",
+            shape=shape,
         )
-        cur.execute(count_sql, params)
-        total = cur.fetchone()[0]
-
-        data_sql = (
-            "SELECT o.id, o.nombre, o.autor_id, a.nombre, o.anio, o.tipo, o.comuna, "
-            "o.barrio, o.direccion, o.descripcion, "
-            "CASE WHEN o.ubicacion IS NOT NULL THEN ST_Y(o.ubicacion::geometry) END AS lat, "
-            "CASE WHEN o.ubicacion IS NOT NULL THEN ST_X(o.ubicacion::geometry) END AS lon "
-            "FROM obras o JOIN autores a ON o.autor_id = a.id "
-            f"{where_sql} "
-            "ORDER BY o.anio DESC NULLS LAST, o.id ASC "
-            "LIMIT %s OFFSET %s"
+
+        timed_execute(
+            cur,
+            data_sql,
+            [*params, limit, offset],
+            source="list_obras_by_autor",
+            statement="data",
+            shape=shape,
         )
-        cur.execute(data_sql, [*params, limit, offset])
-        rows: List[ObraRow] = cur.fetchall()
+        rows = list(map(Obra._make, cur.fetchall()))
 
     return rows, total
+
+
+def list_all_obras(conn) -> List[Obra]:
+    """Return every obra in catalog order (used to build in-memory snapshots)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT {_select_list(None)} "
+            "FROM obras o JOIN autores a ON o.autor_id = a.id "
+            "ORDER BY o.anio DESC NULLS LAST, o.id ASC"
+        )
+        return list(map(Obra._make, cur.fetchall()))
+
+
+def list_obra_points(conn) -> List[Tuple[int, float, float]]:
+    """Return ``(id, lat, lon)`` of every located obra ordered by id."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT id, ST_Y(ubicacion::geometry), ST_X(ubicacion::geometry) "
+            "FROM obras WHERE ubicacion IS NOT NULL ORDER BY id"
+        )
+        return cur.fetchall()
+
+
+def list_nearest_obras(
+    conn, obra_id: int, limit: int
+) -> List[Tuple[int, str, Optional[str], float, float, float]]:
+    """Return the ``limit`` obras closest to ``obra_id`` with their distance in metres."""
+    sql = (
+        "SELECT o.id, o.nombre, a.nombre, ST_Y(o.ubicacion::geometry), "
+        "ST_X(o.ubicacion::geometry), ST_Distance(o.ubicacion, ref.ubicacion) "
+        "FROM obras o LEFT JOIN autores a ON o.autor_id = a.id, "
+        "(SELECT ubicacion FROM obras WHERE id = %s AND ubicacion IS NOT NULL) ref "
+        "WHERE o.id <> %s AND o.ubicacion IS NOT NULL "
+        "ORDER BY o.ubicacion <-> ref.ubicacion LIMIT %s"
+    )
+    with conn.cursor() as cur:
+        timed_execute(
+            cur,
+            sql,
+            [obra_id, obra_id, limit],
+            source="list_nearest_obras",
+            statement="data",
+            shape="obra_id",
+        )
+        return cur.fetchall()
+
+
+def count_obras_by_cell(
+    conn, precision: int, within: Optional[Tuple[str, str]] = None
+) -> List[Tuple[str, int]]:
+    """Return ``(cell, obras)`` per geohash cell of ``precision`` characters.
+
+    ``within`` is a ``[low, high)`` geohash range (see ``geohash.prefix_range``)
+    restricting the count to one enclosing cell.
+    """
+    sql = "SELECT LEFT(o.geohash, %s), COUNT(*) FROM obras o WHERE o.geohash IS NOT NULL"
+    params: List[Any] = [precision]
+    if within is not None:
+        sql += " AND o.geohash >= %s AND o.geohash < %s"
+        params.extend(within)
+    sql += " GROUP BY 1 ORDER BY 1"
+    with conn.cursor() as cur:
+        timed_execute(
+            cur,
+            sql,
+            params,
+            source="count_obras_by_cell",
+            statement="data",
+            shape="cell" if within is not None else "sin_filtros",
+        )
+        return cur.fetchall()
+
+
+# Columnas escritas por upsert_obras y su tipo, en el orden de las tuplas de VALUES.
+WRITE_COLUMNS = {
+    "nombre": "text",
+    "autor_id": "int",
+    "anio": "int",
+    "tipo": "text",
+    "comuna": "text",
+    "barrio": "text",
+    "direccion": "text",
+    "descripcion": "text",
+    "lat": "float8",
+    "lon": "float8",
+    "geohash": "text",
+}
+_UBICACION_SQL = (
+    "CASE WHEN v.lat IS NOT NULL AND v.lon IS NOT NULL "
+    "THEN ST_SetSRID(ST_MakePoint(v.lon, v.lat), 4326)::geography END"
+)
+_STORED_COLUMNS = (
+    "nombre, autor_id, anio, tipo, comuna, barrio, direccion, descripcion, ubicacion, geohash"
+)
+_STORED_VALUES = (
+    "v.nombre, v.autor_id, v.anio, v.tipo, v.comuna, v.barrio, v.direccion, v.descripcion, "
+    f"{_UBICACION_SQL}, v.geohash"
+)
+_INSERT_TEMPLATE = "(" + ", ".join(f"%s::{kind}" for kind in WRITE_COLUMNS.values()) + ")"
+_UPDATE_TEMPLATE = "(%s::int, " + _INSERT_TEMPLATE[1:]
+_UPSERT_UPDATE_SQL = (
+    f"UPDATE obras AS o SET ({_STORED_COLUMNS}, updated_at) = ({_STORED_VALUES}, NOW()) "
+    f"FROM (VALUES %s) AS v(id, {', '.join(WRITE_COLUMNS)}) WHERE o.id = v.id"
+)
+_UPSERT_INSERT_SQL = (
+    f"INSERT INTO obras ({_STORED_COLUMNS}) "
+    f"SELECT {_STORED_VALUES} FROM (VALUES %s) AS v({', '.join(WRITE_COLUMNS)}) "
+    "RETURNING id, nombre, autor_id"
+)
+
+
+def upsert_obras(conn, records: Sequence[Mapping[str, Any]]) -> List[Tuple[str, Any]]:
+    """Insert or update ``records`` with a fixed number of multi-row statements.
+
+    A record with ``id`` replaces that obra; otherwise it matches an existing
+    obra by ``(nombre, autor_id)``, like ``scripts/load_data.py``, or is
+    inserted. The author comes from ``autor_id`` or, failing that, from the
+    ``autor`` name, created when missing once the record has passed the id
+    checks. Returns ``(status, id)`` per record (``created`` or ``updated``),
+    or ``("error", message)``.
+    """
+    outcomes: List[Tuple[str, Any]] = [("error", "")] * len(records)
+    with conn.cursor() as cur:
+        known_autores = _existing_ids(
+            cur, "autores", {r["autor_id"] for r in records if r.get("autor_id") is not None}
+        )
+        known_obras = _existing_ids(
+            cur, "obras", {r["id"] for r in records if r.get("id") is not None}
+        )
+
+        valid: List[int] = []
+        ids = set()
+        for position, record in enumerate(records):
+            autor_id, obra_id = record.get("autor_id"), record.get("id")
+            if autor_id is not None and autor_id not in known_autores:
+                outcomes[position] = ("error", f"Autor {autor_id} no encontrado.")
+            elif obra_id is not None and obra_id not in known_obras:
+                outcomes[position] = ("error", f"Obra {obra_id} no encontrada.")
+            elif obra_id is not None and obra_id in ids:
+                outcomes[position] = ("error", "Registro duplicado en el lote.")
+            else:
+                ids.add(obra_id)
+                valid.append(position)
+
+        # Los autores por nombre se crean solo para registros que se van a escribir: un lote
+        # que falla entero no debe dejar autores nuevos sin subir la versión del dataset.
+        autor_ids: Dict[str, int] = {}
+        names = sorted({records[p]["autor"] for p in valid if records[p].get("autor_id") is None})
+        if names:
+            autor_ids = dict(
+                execute_values(
+                    cur,
+                    "INSERT INTO autores (nombre) VALUES %s "
+                    "ON CONFLICT (nombre) DO UPDATE SET nombre = EXCLUDED.nombre "
+                    "RETURNING nombre, id",
+                    [(name,) for name in names],
+                    page_size=len(names),
+                    fetch=True,
+                )
+            )
+        resolved: List[Tuple[int, int]] = [
+            (p, records[p].get("autor_id") or autor_ids[records[p]["autor"]]) for p in valid
+        ]
+
+        # Sin id, la obra se reconoce por (nombre, autor_id) como en la carga del CSV.
+        keys = sorted(
+            {
+                (records[position]["nombre"], autor_id)
+                for position, autor_id in resolved
+                if records[position].get("id") is None
+            }
+        )
+        existing: Dict[Tuple[str, int], int] = {}
+        if keys:
+            rows = execute_values(
+                cur,
+                "SELECT o.nombre, o.autor_id, MIN(o.id) FROM obras o "
+                "JOIN (VALUES %s) AS v(nombre, autor_id) "
+                "ON o.nombre = v.nombre AND o.autor_id = v.autor_id "
+                "GROUP BY o.nombre, o.autor_id",
+                keys,
+                template="(%s::text, %s::int)",
+                page_size=len(keys),
+                fetch=True,
+            )
+            existing = {(nombre, autor_id): obra_id for nombre, autor_id, obra_id in rows}
+
+        updates: List[Tuple[int, int, Tuple[Any, ...]]] = []
+        inserts: List[Tuple[int, Tuple[Any, ...]]] = []
+        seen = set()
+        for position, autor_id in resolved:
+            record = records[position]
+            values = tuple(
+                autor_id if name == "autor_id" else record.get(name) for name in WRITE_COLUMNS
+            )
+            obra_id = record.get("id") or existing.get((record["nombre"], autor_id))
+            key = obra_id if obra_id is not None else (record["nombre"], autor_id)
+            if key in seen:
+                outcomes[position] = ("error", "Registro duplicado en el lote.")
+                continue
+            seen.add(key)
+            if obra_id is None:
+                inserts.append((position, values))
+            else:
+                updates.append((position, obra_id, values))
+
+        if updates:
+            execute_values(
+                cur,
+                _UPSERT_UPDATE_SQL,
+                [(obra_id, *values) for _, obra_id, values in updates],
+                template=_UPDATE_TEMPLATE,
+                page_size=len(updates),
+            )
+            for position, obra_id, _ in updates:
+                outcomes[position] = ("updated", obra_id)
+        if inserts:
+            rows = execute_values(
+                cur,
+                _UPSERT_INSERT_SQL,
+                [values for _, values in inserts],
+                template=_INSERT_TEMPLATE,
+                page_size=len(inserts),
+                fetch=True,
+            )
+            created = {(nombre, autor_id): obra_id for obra_id, nombre, autor_id in rows}
+            for position, values in inserts:
+                outcomes[position] = ("created", created[(values[0], values[1])])
+    return outcomes
+
+
+def _existing_ids(cur, table: str, ids) -> set:
+    if not ids:
+        return set()
+    cur.execute(f"SELECT id FROM {table} WHERE id = ANY(%s)", (sorted(ids),))
+    return {row[0] for row in cur.fetchall()}
@@ -0,0 +1,66 @@
+"""Repository layer for walking-route candidates."""
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence, Set, Tuple
+
+from app.repositories.spatial import near_clauses
+from app.utils.query_log import query_shape, timed_execute
+
+# id, nombre, autor, lat, lon
+ParadaRow = Tuple[int, str, Optional[str], float, float]
+
+
+def list_route_candidates(
+    conn,
+    *,
+    ids: Optional[Sequence[int]] = None,
+    comuna: Optional[str] = None,
+    near: Optional[dict] = None,
+    limit: int,
+) -> List[ParadaRow]:
+    """Return located obras matching ``ids``, ``comuna`` and/or ``near`` (by id)."""
+    clauses = ["o.ubicacion IS NOT NULL"]
+    params: List[Any] = []
+    if ids is not None:
+        clauses.append("o.id = ANY(%s)")
+        params.append(list(ids))
+    if comuna:
+        clauses.append("o.comuna = %s")
+        params.append(comuna)
+    if near:
+        near_sql, near_params = near_clauses(near)
+        clauses.extend(near_sql)
+        params.extend(near_params)
+
+    sql = (
+        "SELECT o.id, o.nombre, a.nombre, "
+        "ST_Y(o.ubicacion::geometry) AS lat, ST_X(o.ubicacion::geometry) AS lon "
+        "FROM obras o LEFT JOIN autores a ON o.autor_id = a.id "
+        f"WHERE {' AND '.join(clauses)} "
+        "ORDER BY o.id LIMIT %s"
+    )
+    shape = query_shape({"ids": ids, "comuna": comuna, "near": near}, 0)
+    with conn.cursor() as cur:
+        timed_execute(
+            cur,
+            sql,
+            [*params, limit],
+            source="list_route_candidates",
+            statement="data",
+            shape=shape,
+        )
+        return cur.fetchall()
+
+
+def list_located_ids(conn, ids: Sequence[int]) -> Set[int]:
+    """Return which of ``ids`` exist and have coordinates."""
+    with conn.cursor() as cur:
+        timed_execute(
+            cur,
+            "SELECT id FROM obras WHERE id = ANY(%s) AND ubicacion IS NOT NULL",
+            [list(ids)],
+            source="list_located_ids",
+            statement="data",
+            shape=query_shape({"ids": ids}, 0),
+        )
+        return {row[0] for row in cur.fetchall()}
@@ -0,0 +1,36 @@
+"""Shared SQL for radius (``near``) filters on obras."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+from app import settings
+from app.utils import geohash
+
+DWITHIN_SQL = (
+    "ST_DWithin(o.ubicacion::geography, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)"
+)
+GEOHASH_RANGE_SQL = "(o.geohash >= %s AND o.geohash < %s)"
+
+
+def near_clauses(near: Dict[str, float]) -> Tuple[List[str], List[Any]]:
+    """Return the WHERE clauses and parameters selecting obras within ``near``.
+
+    With ``GEOHASH_PREFILTER`` the exact ``ST_DWithin`` test is preceded by
+    index ranges over the 3×3 geohash cells covering the circle, so only
+    nearby rows are cast to geography. Whenever ``geohash.cover()`` yields
+    cells the block has nine ranges, so the statement text (and its prepared
+    plan) does not depend on the centre. For huge radii or circles touching
+    a pole ``cover()`` is empty and the pre-filter is skipped: the statement
+    then carries only ``ST_DWithin``, a second text with its own plan.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    if settings.GEOHASH_PREFILTER:
+        cells = geohash.cover(near["lat"], near["lon"], near["radius"])
+        if cells:
+            clauses.append("(" + " OR ".join([GEOHASH_RANGE_SQL] * len(cells)) + ")")
+            for cell in cells:
+                params.extend(geohash.prefix_range(cell))
+    clauses.append(DWITHIN_SQL)
+    params.extend([near["lon"], near["lat"], near["radius"]])
+    return clauses, params
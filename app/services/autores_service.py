@@ -1,16 +1,27 @@
 """Business logic for autores endpoints."""
 from __future__ import annotations
 
-import math
-from typing import Dict, Mapping, Optional
+from typing import Any, Dict, Mapping, Optional, Tuple
 
+from app.models.autor import Autor
 from app.repositories.autores_repository import get_autor, list_autores
-from app.services.obras_service import get_obras_by_autor
-from app.utils.database import get_connection
+from app.services.obras_service import (
+    load_obras_by_autor,
+    obras_by_autor_key,
+    parse_obras_by_autor_query,
+)
+from app.services.paging import build_meta, page_window, parse_count_mode
+from app.utils.database import get_read_connection, primary_pinned
+from app.utils.singleflight import SingleFlight
 
 DEFAULT_LIMIT = 50
 MAX_LIMIT = 100
 
+AUTOR_COLUMNS = Autor.columns()
+
+# Peticiones idénticas simultáneas comparten una sola consulta.
+_flight = SingleFlight("autores")
+
 
 def _parse_int(value: Optional[str], *, field: str) -> Optional[int]:
     if value is None or value == "":
@@ -46,30 +57,6 @@ def _parse_non_negative(value: Optional[str], *, field: str) -> Optional[int]:
     return parsed
 
 
-def _build_meta(total: int, limit: int, offset: int, page_items: int) -> Dict[str, object]:
-    total_pages = max(1, math.ceil(total / limit)) if limit else 1
-    page = 1
-    if limit:
-        page = (offset // limit) + 1
-        page = min(max(1, page), total_pages)
-    has_prev = page > 1
-    has_next = page < total_pages
-    prev_offset = (page - 2) * limit if has_prev else None
-    next_offset = page * limit if has_next else None
-    return {
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "page": page,
-        "total_pages": total_pages,
-        "count": page_items,
-        "has_prev": has_prev,
-        "has_next": has_next,
-        "prev_offset": prev_offset,
-        "next_offset": next_offset,
-    }
-
-
 def _build_filters(
     nombre: Optional[str],
     min_obras: Optional[int],
@@ -84,53 +71,108 @@ def _build_filters(
     }
 
 
-def get_autores(params: Mapping[str, str]) -> Dict[str, object]:
-    """Return autores list with pagination metadata based on filters."""
-    limit = _parse_limit(params.get("limit"))
-    offset = _parse_offset(params.get("offset"))
-    nombre = params.get("nombre")
+def _parse_autores_query(params: Mapping[str, str]) -> Dict[str, Any]:
     min_obras = _parse_non_negative(params.get("min_obras"), field="min_obras")
     max_obras = _parse_non_negative(params.get("max_obras"), field="max_obras")
     if min_obras is not None and max_obras is not None and min_obras > max_obras:
         raise ValueError("'min_obras' no puede ser mayor que 'max_obras'.")
+    return {
+        "limit": _parse_limit(params.get("limit")),
+        "offset": _parse_offset(params.get("offset")),
+        "nombre": params.get("nombre") or None,
+        "min_obras": min_obras,
+        "max_obras": max_obras,
+        "count": parse_count_mode(params.get("count")),
+    }
+
+
+def normalize_autores_query(params: Mapping[str, str]) -> Tuple[Dict[str, object], Tuple]:
+    """Validate ``params`` and return the echoed filters plus a hashable cache key."""
+    query = _parse_autores_query(params)
+    filters = _build_filters(
+        query["nombre"], query["min_obras"], query["max_obras"], query["limit"]
+    )
+    return filters, _query_key(filters, query)
+
+
+def _query_key(filters: Mapping[str, object], query: Mapping[str, Any]) -> Tuple:
+    return (*sorted(filters.items()), ("offset", query["offset"]), ("count", query["count"]))
+
 
-    conn = get_connection()
+def get_autores(params: Mapping[str, str], *, as_json: bool = False) -> Dict[str, object]:
+    """Return autores list with pagination metadata based on filters.
+
+    Concurrent calls with the same normalized query share one execution.
+    """
+    query = _parse_autores_query(params)
+    filters = _build_filters(
+        query["nombre"], query["min_obras"], query["max_obras"], query["limit"]
+    )
+    key = ("autores", _query_key(filters, query), as_json, primary_pinned())
+    return _flight.do(key, lambda: _load_autores(query, as_json))
+
+
+def _load_autores(query: Mapping[str, Any], as_json: bool) -> Dict[str, object]:
+    limit = query["limit"]
+    offset = query["offset"]
+    nombre = query["nombre"]
+    min_obras = query["min_obras"]
+    max_obras = query["max_obras"]
+    count_mode = query["count"]
+
+    conn = get_read_connection()
     try:
         rows, total = list_autores(
             conn,
             nombre=nombre,
             min_obras=min_obras,
             max_obras=max_obras,
-            limit=limit,
+            limit=limit if count_mode == "exact" else limit + 1,
             offset=offset,
+            count=count_mode,
         )
     finally:
         conn.close()
 
-    items = [
-        {"id": autor_id, "nombre": nombre_row, "total_obras": total_obras}
-        for autor_id, nombre_row, total_obras in rows
-    ]
-    meta = _build_meta(total, limit, offset, len(items))
+    rows, has_more = page_window(rows, limit, count_mode)
+
+    items = Autor.to_json(rows) if as_json else rows
+    meta = build_meta(
+        total, limit, offset, len(rows), count_mode=count_mode, has_more=has_more
+    )
     filters = _build_filters(nombre, min_obras, max_obras, limit)
 
     return {"items": items, "meta": meta, "filters": filters}
 
 
-def get_autor_detail(autor_id: int, query_params: Mapping[str, str]) -> Dict[str, object]:
-    """Return author metadata and paginated obras."""
-    conn = get_connection()
+def get_autor_detail(
+    autor_id: int, query_params: Mapping[str, str], *, as_json: bool = False
+) -> Dict[str, object]:
+    """Return author metadata and paginated obras.
+
+    Both come from one read connection; the author's obra count doubles as
+    the total of an unfiltered listing, so that page needs no ``COUNT(*)``.
+    """
+    query = parse_obras_by_autor_query(query_params)
+    key = ("detail", autor_id, obras_by_autor_key(query), as_json, primary_pinned())
+    return _flight.do(key, lambda: _load_autor_detail(autor_id, query, as_json))
+
+
+def _load_autor_detail(
+    autor_id: int, query: Mapping[str, Any], as_json: bool
+) -> Dict[str, object]:
+    conn = get_read_connection()
     try:
-        autor_row = get_autor(conn, autor_id)
+        autor_row = get_autor(conn, autor_id, with_total=True)
+        if not autor_row:
+            raise LookupError("Autor no encontrado")
+        obras = load_obras_by_autor(
+            conn, autor_id, query, as_json=as_json, total=autor_row.total_obras
+        )
     finally:
         conn.close()
 
-    if not autor_row:
-        raise LookupError("Autor no encontrado")
-
-    obras = get_obras_by_autor(autor_id, query_params)
-
     return {
-        "autor": {"id": autor_row[0], "nombre": autor_row[1]},
+        "autor": autor_row.to_dict(("id", "nombre")),
         "obras": obras,
     }
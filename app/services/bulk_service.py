@@ -0,0 +1,190 @@
+"""Bulk upserts of obras and autores streamed from JSON or NDJSON request bodies."""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Any, BinaryIO, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app import settings
+from app.repositories.autores_repository import upsert_autores
+from app.repositories.dataset_repository import bump_dataset_version
+from app.repositories.obras_repository import upsert_obras
+from app.services.dataset_service import set_version
+from app.utils import geohash
+from app.utils.database import get_write_connection
+from app.utils.record_stream import iter_records
+
+OBRA_FIELDS = frozenset(
+    {
+        "id",
+        "nombre",
+        "autor",
+        "autor_id",
+        "anio",
+        "tipo",
+        "comuna",
+        "barrio",
+        "direccion",
+        "descripcion",
+        "lat",
+        "lon",
+    }
+)
+AUTOR_FIELDS = frozenset({"id", "nombre"})
+
+Upsert = Callable[[Any, Sequence[Mapping[str, Any]]], List[Tuple[str, Any]]]
+
+
+def bulk_upsert_obras(stream: BinaryIO, content_type: Optional[str]) -> Dict[str, object]:
+    """Upsert every obra in the body; see :func:`obras_repository.upsert_obras`."""
+    return _bulk(stream, content_type, _obra_record, upsert_obras)
+
+
+def bulk_upsert_autores(stream: BinaryIO, content_type: Optional[str]) -> Dict[str, object]:
+    """Create or rename every autor in the body; see :func:`autores_repository.upsert_autores`."""
+    return _bulk(stream, content_type, _autor_record, upsert_autores)
+
+
+def _bulk(
+    stream: BinaryIO,
+    content_type: Optional[str],
+    parse: Callable[[Any], Dict[str, Any]],
+    upsert: Upsert,
+) -> Dict[str, object]:
+    """Validate records as they stream in and upsert them in batches, in one transaction.
+
+    Invalid records get an ``error`` item and are skipped; a malformed body or
+    one over ``BULK_MAX_RECORDS`` raises ValueError and nothing is written. The
+    dataset version is bumped once, at commit, and only if something changed.
+    """
+    items: List[Dict[str, object]] = []
+    batch: List[Tuple[Dict[str, object], Dict[str, Any]]] = []
+    version: Optional[int] = None
+    conn = get_write_connection()
+    try:
+        for index, raw in iter_records(stream, content_type):
+            if index >= settings.BULK_MAX_RECORDS:
+                raise ValueError(
+                    f"La petición supera el máximo de {settings.BULK_MAX_RECORDS} registros."
+                )
+            item: Dict[str, object] = {"index": index}
+            items.append(item)
+            try:
+                batch.append((item, parse(raw)))
+            except ValueError as exc:
+                item.update(status="error", error=str(exc))
+                continue
+            if len(batch) >= settings.BULK_BATCH_SIZE:
+                _flush(conn, batch, upsert)
+        if batch:
+            _flush(conn, batch, upsert)
+        statuses = Counter(item["status"] for item in items)
+        if statuses["created"] or statuses["updated"]:
+            version = bump_dataset_version(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if version is not None:
+        # Este worker invalida sus cachés ya; los demás lo sabrán por NOTIFY o al expirar el TTL.
+        set_version(version)
+    return {
+        "version": version,
+        "summary": {
+            "total": len(items),
+            "created": statuses["created"],
+            "updated": statuses["updated"],
+            "unchanged": statuses["unchanged"],
+            "errors": statuses["error"],
+        },
+        "items": items,
+    }
+
+
+def _flush(conn, batch: List[Tuple[Dict[str, object], Dict[str, Any]]], upsert: Upsert) -> None:
+    outcomes = upsert(conn, [record for _, record in batch])
+    for (item, _), (status, value) in zip(batch, outcomes):
+        item["status"] = status
+        item["error" if status == "error" else "id"] = value
+    batch.clear()
+
+
+def _check_fields(raw: Any, allowed: frozenset) -> Mapping[str, Any]:
+    if not isinstance(raw, dict):
+        raise ValueError("Cada registro debe ser un objeto JSON.")
+    unknown = sorted(set(raw) - allowed)
+    if unknown:
+        raise ValueError(f"Campo desconocido: '{unknown[0]}'.")
+    return raw
+
+
+def _text(raw: Mapping[str, Any], field: str, *, required: bool = False) -> Optional[str]:
+    value = raw.get(field)
+    if isinstance(value, str):
+        value = value.strip() or None
+    elif value is not None:
+        raise ValueError(f"El campo '{field}' debe ser texto.")
+    if value is None and required:
+        raise ValueError(f"El campo '{field}' es obligatorio.")
+    return value
+
+
+def _integer(raw: Mapping[str, Any], field: str, *, positive: bool = False) -> Optional[int]:
+    value = raw.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"El campo '{field}' debe ser un entero.")
+    if positive and value < 1:
+        raise ValueError(f"El campo '{field}' debe ser mayor que cero.")
+    return value
+
+
+def _coordinate(raw: Mapping[str, Any], field: str, limit: float) -> Optional[float]:
+    value = raw.get(field)
+    if value is None:
+        return None
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (int, float))
+        or not math.isfinite(value)
+        or abs(value) > limit
+    ):
+        raise ValueError(f"El campo '{field}' debe ser un número entre -{limit:g} y {limit:g}.")
+    return float(value)
+
+
+def _obra_record(raw: Any) -> Dict[str, Any]:
+    raw = _check_fields(raw, OBRA_FIELDS)
+    record = {
+        "id": _integer(raw, "id", positive=True),
+        "nombre": _text(raw, "nombre", required=True),
+        "autor": _text(raw, "autor"),
+        "autor_id": _integer(raw, "autor_id", positive=True),
+        "anio": _integer(raw, "anio"),
+        "tipo": _text(raw, "tipo"),
+        "comuna": _text(raw, "comuna"),
+        "barrio": _text(raw, "barrio"),
+        "direccion": _text(raw, "direccion"),
+        "descripcion": _text(raw, "descripcion"),
+        "lat": _coordinate(raw, "lat", 90),
+        "lon": _coordinate(raw, "lon", 180),
+    }
+    if (record["autor"] is None) == (record["autor_id"] is None):
+        raise ValueError("Indica 'autor' o 'autor_id' (solo uno de los dos).")
+    if (record["lat"] is None) != (record["lon"] is None):
+        raise ValueError("Los campos 'lat' y 'lon' van juntos.")
+    located = record["lat"] is not None
+    record["geohash"] = geohash.encode(record["lat"], record["lon"]) if located else None
+    return record
+
+
+def _autor_record(raw: Any) -> Dict[str, Any]:
+    raw = _check_fields(raw, AUTOR_FIELDS)
+    return {
+        "id": _integer(raw, "id", positive=True),
+        "nombre": _text(raw, "nombre", required=True),
+    }
@@ -0,0 +1,92 @@
+"""Dataset version tracking shared by the in-process caches."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+import psycopg2
+
+from app import settings
+from app.repositories.dataset_repository import get_dataset_version
+from app.utils.database import get_read_connection
+
+logger = logging.getLogger(__name__)
+
+VersionListener = Callable[[int, int], None]
+
+_lock = threading.Lock()
+_version: Optional[int] = None
+_checked_at = 0.0
+_listeners: List[VersionListener] = []
+
+
+def on_version_change(callback: VersionListener) -> VersionListener:
+    """Register ``callback(old, new)`` to run when the dataset version changes."""
+    _listeners.append(callback)
+    return callback
+
+
+def set_version(version: int) -> None:
+    """Record ``version`` as current and notify listeners if it changed."""
+    global _version, _checked_at
+    previous = _version
+    _version = version
+    _checked_at = time.monotonic()
+    if previous is not None and previous != version:
+        for callback in list(_listeners):
+            try:
+                callback(previous, version)
+            except Exception:
+                logger.exception("Error notificando cambio de versión del dataset")
+
+
+def current_version() -> int:
+    """Return the dataset version, re-reading it at most every ``DATASET_VERSION_TTL`` s."""
+    if _version is not None and time.monotonic() - _checked_at < settings.DATASET_VERSION_TTL:
+        return _version
+
+    with _lock:
+        if _version is not None and time.monotonic() - _checked_at < settings.DATASET_VERSION_TTL:
+            return _version
+        try:
+            conn = get_read_connection()
+            try:
+                version = get_dataset_version(conn)
+            finally:
+                conn.close()
+        except psycopg2.Error:
+            logger.warning("No fue posible leer la versión del dataset", exc_info=True)
+            version = _version or 0
+        set_version(version)
+        return version
+
+
+def peek_version() -> Optional[int]:
+    """Return the version held by this worker without touching the database (None if unread)."""
+    return _version
+
+
+def apply_version(version: int) -> bool:
+    """Adopt a version pushed by a notification; True when it was newer."""
+    with _lock:
+        if _version is not None and version <= _version:
+            return False
+        set_version(version)
+        return True
+
+
+def refresh() -> int:
+    """Re-read the version now, ignoring ``DATASET_VERSION_TTL`` (polling fallback)."""
+    global _checked_at
+    _checked_at = float("-inf")
+    return current_version()
+
+
+def reset() -> None:
+    """Forget the cached version (used by tests and after forking)."""
+    global _version, _checked_at
+    with _lock:
+        _version = None
+        _checked_at = 0.0
@@ -0,0 +1,94 @@
+"""Obra counts per geohash cell for map heatmaps."""
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional
+
+from app import settings
+from app.repositories.obras_repository import count_obras_by_cell
+from app.services.dataset_service import current_version
+from app.utils import geohash, metrics
+from app.utils.cache import LRUCache
+from app.utils.database import get_read_connection, primary_pinned
+from app.utils.singleflight import SingleFlight
+
+# Clave: (versión del dataset, precisión, celda); las celdas identifican el viewport.
+_cache = LRUCache(settings.DENSITY_CACHE_SIZE)
+_flight = SingleFlight("density")
+
+
+def _parse_precision(value: Optional[str]) -> int:
+    if value is None or value == "":
+        return settings.DENSITY_DEFAULT_PRECISION
+    try:
+        precision = int(value)
+    except ValueError as exc:
+        raise ValueError("El parámetro 'precision' debe ser numérico.") from exc
+    if not 1 <= precision <= geohash.STORED_PRECISION:
+        raise ValueError(
+            f"El parámetro 'precision' debe estar entre 1 y {geohash.STORED_PRECISION}."
+        )
+    return precision
+
+
+def _parse_cell(value: Optional[str], precision: int) -> str:
+    cell = (value or "").strip().lower()
+    if not cell:
+        return ""
+    geohash.bbox(cell)  # Valida el alfabeto.
+    if len(cell) > precision:
+        raise ValueError("La celda 'cell' no puede ser más fina que 'precision'.")
+    return cell
+
+
+def _cell_dict(cell: str, count: int) -> Dict[str, object]:
+    south, west, north, east = geohash.bbox(cell)
+    return {
+        "cell": cell,
+        "count": count,
+        "lat": round((south + north) / 2, 6),
+        "lon": round((west + east) / 2, 6),
+        "bbox": [round(south, 6), round(west, 6), round(north, 6), round(east, 6)],
+    }
+
+
+def _load_density(precision: int, cell: str) -> Dict[str, object]:
+    conn = get_read_connection()
+    try:
+        rows = count_obras_by_cell(conn, precision, geohash.prefix_range(cell) if cell else None)
+    finally:
+        conn.close()
+    cells = [_cell_dict(cell_id, count) for cell_id, count in rows]
+    return {
+        "precision": precision,
+        "cell": cell,
+        "total": sum(item["count"] for item in cells),
+        "cells": cells,
+    }
+
+
+def get_density(params: Mapping[str, str]) -> Dict[str, object]:
+    """Return obra counts per geohash cell of ``precision`` characters.
+
+    ``cell`` restricts the result to one enclosing cell (a map viewport).
+    Results are cached per dataset version, precision and cell.
+    """
+    precision = _parse_precision(params.get("precision"))
+    cell = _parse_cell(params.get("cell"), precision)
+    if primary_pinned():
+        return _load_density(precision, cell)
+
+    key = (current_version(), precision, cell)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    result = _flight.do(("density", *key), lambda: _load_density(precision, cell))
+    _cache.set(key, result)
+    return result
+
+
+def reset() -> None:
+    """Drop cached densities (tests)."""
+    _cache.clear()
+
+
+metrics.register("obras_density", _cache.stats)
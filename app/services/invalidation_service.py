@@ -0,0 +1,154 @@
+"""Per-worker listener that applies dataset version changes pushed by the loaders."""
+from __future__ import annotations
+
+import json
+import logging
+import select
+import threading
+import time
+from typing import Dict, Optional
+
+import psycopg2
+
+from app import settings
+from app.repositories.dataset_repository import DATASET_CHANNEL
+from app.services import dataset_service
+from app.utils import metrics
+from app.utils.database import get_listen_connection
+
+logger = logging.getLogger(__name__)
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+_stats: Dict[str, object] = {
+    "mode": "stopped",
+    "notifications": 0,
+    "polls": 0,
+    "invalidations": 0,
+    "last_version": None,
+    "last_latency_ms": None,
+    "max_latency_ms": 0.0,
+    "listen_errors": 0,
+}
+
+
+def _rewarm() -> None:
+    """Map the new snapshot right away instead of on the next request."""
+    if settings.SNAPSHOT_ENABLED:
+        from app.services.snapshot_service import get_snapshot
+
+        get_snapshot()
+
+
+def handle_notification(payload: str, received_at: Optional[float] = None) -> bool:
+    """Apply a ``DATASET_CHANNEL`` payload; True when it moved the version forward.
+
+    Latency is measured from the loader's ``sent_at`` (its clock, so hosts
+    should be NTP-synchronized) to the moment this worker receives it.
+    """
+    received_at = time.time() if received_at is None else received_at
+    _stats["notifications"] += 1
+    try:
+        data = json.loads(payload)
+        version = int(data["version"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Notificación de versión inválida: %r", payload)
+        return False
+
+    sent_at = data.get("sent_at")
+    if isinstance(sent_at, (int, float)):
+        latency_ms = max(0.0, (received_at - sent_at) * 1000)
+        _stats["last_latency_ms"] = round(latency_ms, 3)
+        _stats["max_latency_ms"] = round(max(_stats["max_latency_ms"], latency_ms), 3)
+
+    if not dataset_service.apply_version(version):
+        return False
+    _stats["invalidations"] += 1
+    _stats["last_version"] = version
+    _rewarm()
+    return True
+
+
+def poll_once() -> bool:
+    """Re-read the version from the database; True when it changed."""
+    _stats["polls"] += 1
+    previous = _stats["last_version"]
+    version = dataset_service.refresh()
+    if previous is not None and version != previous:
+        _stats["invalidations"] += 1
+        _rewarm()
+    _stats["last_version"] = version
+    return previous is not None and version != previous
+
+
+def _listen() -> None:
+    conn = get_listen_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {DATASET_CHANNEL}")
+        _stats["mode"] = "listen"
+        # Lo cambiado antes de empezar a escuchar no llegará como notificación.
+        poll_once()
+        while not _stop.is_set():
+            ready, _, _ = select.select([conn], [], [], settings.INVALIDATION_POLL_SECONDS)
+            if not ready:
+                continue
+            conn.poll()
+            received_at = time.time()
+            while conn.notifies:
+                handle_notification(conn.notifies.pop(0).payload, received_at)
+    finally:
+        conn.close()
+
+
+def _poll_until_retry() -> None:
+    _stats["mode"] = "poll"
+    retry_at = time.monotonic() + settings.INVALIDATION_LISTEN_RETRY_SECONDS
+    while not _stop.is_set() and time.monotonic() < retry_at:
+        try:
+            poll_once()
+        except psycopg2.Error:
+            logger.warning("No fue posible consultar la versión del dataset", exc_info=True)
+        _stop.wait(settings.INVALIDATION_POLL_SECONDS)
+
+
+def _run() -> None:
+    while not _stop.is_set():
+        if settings.INVALIDATION_USE_LISTEN:
+            try:
+                _listen()
+                continue
+            except (psycopg2.Error, OSError):
+                _stats["listen_errors"] += 1
+                logger.warning(
+                    "LISTEN no disponible; se consulta la versión periódicamente",
+                    exc_info=True,
+                )
+        _poll_until_retry()
+
+
+def start() -> bool:
+    """Start the listener thread for this process (once per worker)."""
+    global _thread
+    if not settings.INVALIDATION_ENABLED or (_thread is not None and _thread.is_alive()):
+        return False
+    _stop.clear()
+    _thread = threading.Thread(target=_run, name="dataset-listener", daemon=True)
+    _thread.start()
+    return True
+
+
+def stop() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=1.0)
+    _thread = None
+    _stats["mode"] = "stopped"
+
+
+def stats() -> Dict[str, object]:
+    return {**_stats, "poll_seconds": settings.INVALIDATION_POLL_SECONDS}
+
+
+metrics.register("invalidation", stats)
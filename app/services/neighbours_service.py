@@ -0,0 +1,193 @@
+"""Precomputed nearest obras, shared between workers through a mapped file."""
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import psycopg2
+
+from app import settings
+from app.repositories.dataset_repository import get_dataset_version
+from app.repositories.obras_repository import list_nearest_obras, list_obra_points
+from app.repositories.rutas_repository import list_route_candidates
+from app.services.dataset_service import current_version
+from app.services.spatial_service import get_catalog, nearest_obras
+from app.utils.database import get_read_connection
+from app.utils.file_lock import file_lock
+from app.utils.neighbours import (
+    KnnTable,
+    NeighbourIndex,
+    compute_knn,
+    read_header,
+    update_knn,
+    write_neighbours,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 5
+
+_lock = threading.Lock()
+_index: Optional[NeighbourIndex] = None
+
+
+def _path() -> Path:
+    return Path(settings.NEIGHBOURS_PATH)
+
+
+def _previous_table(path: Path, k: int) -> Optional[KnnTable]:
+    try:
+        index = NeighbourIndex(path)
+    except (OSError, ValueError):
+        return None
+    return index.table if index.k == k else None
+
+
+def build_neighbours(min_version: int = 0, *, full: bool = False) -> Dict[str, int]:
+    """Write the neighbours file for the current dataset version.
+
+    The existing file is updated incrementally (only rows whose
+    neighbourhood changed are recomputed) unless ``full`` is set or ``k``
+    changed. Returns the dataset version, number of obras and recomputed rows.
+    """
+    path = _path()
+    with file_lock(path):
+        header = read_header(path)
+        if header is not None and min_version and header[0] >= min_version and not full:
+            return {"version": header[0], "obras": header[1], "recalculadas": 0}
+
+        conn = get_read_connection()
+        try:
+            version = get_dataset_version(conn)
+            points = list_obra_points(conn)
+        finally:
+            conn.close()
+
+        ids = np.fromiter((row[0] for row in points), dtype=np.int64, count=len(points))
+        lat = np.fromiter((row[1] for row in points), dtype=np.float64, count=len(points))
+        lon = np.fromiter((row[2] for row in points), dtype=np.float64, count=len(points))
+        k = settings.NEIGHBOURS_K
+
+        previous = None if full else _previous_table(path, k)
+        if previous is None:
+            table, recomputed = compute_knn(ids, lat, lon, k), len(ids)
+        else:
+            table, recomputed = update_knn(previous, ids, lat, lon)
+        write_neighbours(path, version, table)
+        logger.info(
+            "Vecinos v%s escritos: %s obras, %s recalculadas", version, len(ids), recomputed
+        )
+        return {"version": version, "obras": len(ids), "recalculadas": recomputed}
+
+
+def refresh_after_load() -> Optional[Dict[str, int]]:
+    """Update the file after a loader commit; no-op when the feature is off."""
+    if not settings.NEIGHBOURS_ENABLED:
+        return None
+    return build_neighbours()
+
+
+def get_neighbours() -> Optional[NeighbourIndex]:
+    """Return the mapped index for the current dataset version, or None.
+
+    Like the dataset snapshot, a worker that sees a newer version rebuilds
+    (incrementally) or re-maps the file and keeps the previous mapping until
+    the new one is ready.
+    """
+    global _index
+    if not settings.NEIGHBOURS_ENABLED:
+        return None
+
+    version = current_version()
+    index = _index
+    if index is not None and index.version >= version:
+        return index
+
+    with _lock:
+        index = _index
+        if index is not None and index.version >= version:
+            return index
+        try:
+            header = read_header(_path())
+            if header is None or header[0] < version:
+                build_neighbours(min_version=version)
+            _index = NeighbourIndex(_path())
+        except (OSError, ValueError, psycopg2.Error):
+            logger.warning("Vecinos precalculados no disponibles", exc_info=True)
+            return index
+        return _index
+
+
+def reset() -> None:
+    """Drop the mapped index (tests and post-fork hooks)."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def _parse_limit(value: Optional[str]) -> int:
+    if value is None or value == "":
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError as exc:
+        raise ValueError("El parámetro 'limit' debe ser numérico.") from exc
+    if limit <= 0:
+        raise ValueError("El parámetro 'limit' debe ser mayor que 0.")
+    return min(limit, settings.NEIGHBOURS_K)
+
+
+def get_obras_cercanas(obra_id: int, params: Mapping[str, str]) -> Dict[str, object]:
+    """Return the obras closest to ``obra_id``, nearest first.
+
+    Uses the precomputed table when available, then the in-memory spatial
+    index, and a PostGIS KNN query otherwise; ``source`` tells which one
+    answered.
+    """
+    limit = _parse_limit(params.get("limit"))
+    index = get_neighbours()
+    catalog = get_catalog() if index is None else None
+    if catalog is not None:
+        found = nearest_obras(catalog, obra_id, limit)
+        if not found:
+            raise LookupError("Obra no encontrada o sin coordenadas")
+        return {"obra_id": obra_id, "items": _items(found), "source": "memory"}
+
+    conn = get_read_connection()
+    try:
+        if index is not None:
+            try:
+                pairs = index.neighbours(obra_id, limit)
+            except KeyError:
+                raise LookupError("Obra no encontrada o sin coordenadas") from None
+            ids = [pid for pid, _ in pairs]
+            rows = list_route_candidates(conn, ids=ids, limit=len(ids)) if ids else []
+            by_id = {row[0]: row for row in rows}
+            found = [(*by_id[pid], distance) for pid, distance in pairs if pid in by_id]
+            source = "precomputed"
+        else:
+            found = list_nearest_obras(conn, obra_id, limit)
+            if not found:
+                raise LookupError("Obra no encontrada o sin coordenadas")
+            source = "database"
+    finally:
+        conn.close()
+
+    return {"obra_id": obra_id, "items": _items(found), "source": source}
+
+
+def _items(found: Sequence[Sequence]) -> List[Dict[str, object]]:
+    return [
+        {
+            "id": row[0],
+            "nombre": row[1],
+            "autor": row[2],
+            "lat": row[3],
+            "lon": row[4],
+            "distancia_m": round(float(row[5]), 1),
+        }
+        for row in found
+    ]
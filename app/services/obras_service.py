@@ -1,14 +1,40 @@
 """Business logic for obras endpoints."""
 from __future__ import annotations
 
-import math
-from typing import Dict, Iterable, Mapping, Optional, Tuple
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+from app import settings
+from app.models.obra import Obra
 from app.repositories.obras_repository import list_obras, list_obras_by_autor
-from app.utils.database import get_connection
+from app.services.dataset_service import current_version, on_version_change, peek_version
+from app.services.paging import build_meta, page_window, parse_count_mode
+from app.services.snapshot_service import get_snapshot
+from app.services.spatial_service import get_catalog, list_obras_near
+from app.utils import metrics
+from app.utils.columnar import encode_columnar, pack_points
+from app.utils.database import get_read_connection, primary_pinned
+from app.utils.fast_json import RawJSON
+from app.utils.refresher import BackgroundRefresher
+from app.utils.singleflight import SingleFlight
 
 DEFAULT_LIMIT = 50
 MAX_LIMIT = 100
+GEO_LIMIT = 2000
+
+OBRA_COLUMNS = Obra.columns()
+GEO_FIELDS = ("id", "nombre", "autor", "anio", "tipo", "comuna", "lat", "lon")
+GEO_COLUMNS = Obra.columns(GEO_FIELDS)
+GEO_FORMATS = ("json", "columnar", "binary")
+GEO_DICTIONARY_FIELDS = ("autor", "tipo", "comuna")
+GEO_BINARY_STRINGS = (("nombre", 1), ("autor", 3), ("tipo", 5), ("comuna", 6))
+
+# Peticiones idénticas simultáneas comparten una sola consulta.
+_flight = SingleFlight("obras")
+
+# Payloads de /api/obras_geo en memoria, refrescados en segundo plano.
+_geo_holder: Optional[BackgroundRefresher] = None
+_geo_holder_lock = threading.Lock()
 
 
 def _parse_int(value: Optional[str], *, field: str) -> Optional[int]:
@@ -74,42 +100,6 @@ def _parse_geolocation(params: Mapping[str, str]) -> Tuple[Optional[Dict[str, fl
     return near, lat, lon, radius
 
 
-def _rows_to_dicts(rows: Iterable) -> list[Dict[str, object]]:
-    obras = []
-    for row in rows:
-        (
-            obra_id,
-            nombre,
-            autor_id,
-            autor_nombre,
-            anio,
-            tipo,
-            comuna,
-            barrio,
-            direccion,
-            descripcion,
-            lat,
-            lon,
-        ) = row
-        obras.append(
-            {
-                "id": obra_id,
-                "nombre": nombre,
-                "autor_id": autor_id,
-                "autor": autor_nombre,
-                "anio": anio,
-                "tipo": tipo,
-                "comuna": comuna,
-                "barrio": barrio,
-                "direccion": direccion,
-                "descripcion": descripcion,
-                "lat": lat,
-                "lon": lon,
-            }
-        )
-    return obras
-
-
 def _build_filters(
     *,
     autor: Optional[str],
@@ -133,68 +123,137 @@ def _build_filters(
     }
 
 
-def _build_meta(total: int, limit: int, offset: int, page_items: int) -> Dict[str, object]:
-    total_pages = max(1, math.ceil(total / limit)) if limit else 1
-    page = 1
-    if limit:
-        page = (offset // limit) + 1
-        page = min(max(1, page), total_pages)
-    has_prev = page > 1
-    has_next = page < total_pages
-    prev_offset = (page - 2) * limit if has_prev else None
-    next_offset = page * limit if has_next else None
+def _parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse ``fields=a,b`` against the Obra fields; None selects every field."""
+    if value is None or value.strip() == "":
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in Obra._fields]
+    if unknown or not fields:
+        raise ValueError(
+            f"El parámetro 'fields' admite: {', '.join(Obra._fields)}."
+            + (f" Campo desconocido: '{unknown[0]}'." if unknown else "")
+        )
+    return fields
+
+
+def _serialize_rows(
+    rows: List[Obra], as_json: bool, fields: Optional[Tuple[str, ...]] = None
+) -> List[Obra] | RawJSON:
+    # Las plantillas leen atributos, así que reciben los modelos tal cual.
+    if as_json:
+        return Obra.to_json(rows, fields)
+    return rows
+
+
+def _parse_obras_query(params: Mapping[str, str]) -> Dict[str, Any]:
+    near, lat, lon, radius = _parse_geolocation(params)
     return {
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "page": page,
-        "total_pages": total_pages,
-        "count": page_items,
-        "has_prev": has_prev,
-        "has_next": has_next,
-        "prev_offset": prev_offset,
-        "next_offset": next_offset,
+        "limit": _parse_limit(params.get("limit")),
+        "offset": _parse_offset(params.get("offset")),
+        "anio": _parse_int(params.get("anio"), field="anio"),
+        "near": near,
+        "lat": lat,
+        "lon": lon,
+        "radius": radius,
+        "autor": params.get("autor") or None,
+        "comuna": params.get("comuna") or None,
+        "tipo": params.get("tipo") or None,
+        "count": parse_count_mode(params.get("count")),
+        "fields": _parse_fields(params.get("fields")),
     }
 
 
-def get_obras(params: Mapping[str, str]) -> Dict[str, object]:
-    """Return obras list with pagination metadata based on query parameters."""
-    limit = _parse_limit(params.get("limit"))
-    offset = _parse_offset(params.get("offset"))
-    anio = _parse_int(params.get("anio"), field="anio")
-    near, lat, lon, radius = _parse_geolocation(params)
-    autor = params.get("autor")
-    comuna = params.get("comuna")
-    tipo = params.get("tipo")
+def _query_filters(query: Mapping[str, Any]) -> Dict[str, object]:
+    return _build_filters(
+        autor=query["autor"],
+        comuna=query["comuna"],
+        tipo=query["tipo"],
+        anio=query["anio"],
+        limit=query["limit"],
+        lat=query["lat"],
+        lon=query["lon"],
+        radius=query["radius"],
+    )
 
-    conn = get_connection()
-    try:
-        rows, total = list_obras(
-            conn,
-            autor=autor,
-            comuna=comuna,
-            tipo=tipo,
-            anio=anio,
-            near=near,
-            limit=limit,
-            offset=offset,
-        )
-    finally:
-        conn.close()
 
-    items = _rows_to_dicts(rows)
-    meta = _build_meta(total, limit, offset, len(items))
-    filters = _build_filters(
-        autor=autor,
-        comuna=comuna,
-        tipo=tipo,
-        anio=anio,
-        limit=limit,
-        lat=lat,
-        lon=lon,
-        radius=radius,
+def normalize_obras_query(params: Mapping[str, str]) -> Tuple[Dict[str, object], Tuple]:
+    """Validate ``params`` and return the echoed filters plus a hashable cache key."""
+    query = _parse_obras_query(params)
+    filters = _query_filters(query)
+    return filters, _query_key(filters, query)
+
+
+def _query_key(filters: Mapping[str, object], query: Mapping[str, Any]) -> Tuple:
+    return (
+        *sorted(filters.items()),
+        ("offset", query["offset"]),
+        ("count", query["count"]),
+        ("fields", query["fields"]),
     )
 
+
+def get_obras(params: Mapping[str, str], *, as_json: bool = False) -> Dict[str, object]:
+    """Return obras list with pagination metadata based on query parameters.
+
+    Items are :class:`Obra` models, or with ``as_json`` a JSON array encoded
+    straight from them. ``fields=a,b`` limits both the selected columns and
+    the encoded keys (unselected model fields are None). Concurrent calls
+    with the same normalized query share one execution.
+    """
+    query = _parse_obras_query(params)
+    key = ("obras", _query_key(_query_filters(query), query), as_json, primary_pinned())
+    return _flight.do(key, lambda: _load_obras(query, as_json))
+
+
+def _load_obras(query: Mapping[str, Any], as_json: bool) -> Dict[str, object]:
+    count_mode = query["count"]
+    fetch_limit = query["limit"] if count_mode == "exact" else query["limit"] + 1
+
+    # Los filtros por radio se resuelven en memoria cuando hay índice espacial.
+    catalog = get_catalog() if query["near"] else None
+    if catalog is not None:
+        rows, total = list_obras_near(
+            catalog,
+            near=query["near"],
+            autor=query["autor"],
+            comuna=query["comuna"],
+            tipo=query["tipo"],
+            anio=query["anio"],
+            limit=fetch_limit,
+            offset=query["offset"],
+            count=count_mode,
+        )
+    else:
+        conn = get_read_connection()
+        try:
+            rows, total = list_obras(
+                conn,
+                autor=query["autor"],
+                comuna=query["comuna"],
+                tipo=query["tipo"],
+                anio=query["anio"],
+                near=query["near"],
+                limit=fetch_limit,
+                offset=query["offset"],
+                count=count_mode,
+                fields=query["fields"],
+            )
+        finally:
+            conn.close()
+
+    rows, has_more = page_window(rows, query["limit"], count_mode)
+    items = _serialize_rows(rows, as_json, query["fields"])
+    meta = build_meta(
+        total,
+        query["limit"],
+        query["offset"],
+        len(rows),
+        count_mode=count_mode,
+        has_more=has_more,
+    )
+    filters = _query_filters(query)
+
     return {
         "items": items,
         "meta": meta,
@@ -202,30 +261,86 @@ def get_obras(params: Mapping[str, str]) -> Dict[str, object]:
     }
 
 
-def get_obras_by_autor(autor_id: int, params: Mapping[str, str]) -> Dict[str, object]:
+def parse_obras_by_autor_query(params: Mapping[str, str]) -> Dict[str, Any]:
+    """Validate the query of an author's obras listing (ValueError on bad input)."""
+    return {
+        "limit": _parse_limit(params.get("limit")),
+        "offset": _parse_offset(params.get("offset")),
+        "anio": _parse_int(params.get("anio"), field="anio"),
+        "comuna": params.get("comuna") or None,
+        "tipo": params.get("tipo") or None,
+        "count": parse_count_mode(params.get("count")),
+        "fields": _parse_fields(params.get("fields")),
+    }
+
+
+def obras_by_autor_key(query: Mapping[str, Any]) -> Tuple:
+    return tuple(
+        query[name] for name in ("limit", "offset", "anio", "comuna", "tipo", "count", "fields")
+    )
+
+
+def get_obras_by_autor(
+    autor_id: int, params: Mapping[str, str], *, as_json: bool = False
+) -> Dict[str, object]:
     """Return obras for a specific author with pagination metadata."""
-    limit = _parse_limit(params.get("limit"))
-    offset = _parse_offset(params.get("offset"))
-    anio = _parse_int(params.get("anio"), field="anio")
-    comuna = params.get("comuna")
-    tipo = params.get("tipo")
+    query = parse_obras_by_autor_query(params)
+    key = ("autor", autor_id, obras_by_autor_key(query), as_json, primary_pinned())
+    return _flight.do(key, lambda: _load_obras_by_autor(autor_id, query, as_json))
+
 
-    conn = get_connection()
+def _load_obras_by_autor(
+    autor_id: int, query: Mapping[str, Any], as_json: bool
+) -> Dict[str, object]:
+    conn = get_read_connection()
     try:
-        rows, total = list_obras_by_autor(
-            conn,
-            autor_id,
-            comuna=comuna,
-            tipo=tipo,
-            anio=anio,
-            limit=limit,
-            offset=offset,
-        )
+        return load_obras_by_autor(conn, autor_id, query, as_json=as_json)
     finally:
         conn.close()
 
-    items = _rows_to_dicts(rows)
-    meta = _build_meta(total, limit, offset, len(items))
+
+def load_obras_by_autor(
+    conn,
+    autor_id: int,
+    query: Mapping[str, Any],
+    *,
+    as_json: bool = False,
+    total: Optional[int] = None,
+) -> Dict[str, object]:
+    """Run an author's obras page on ``conn``.
+
+    ``total`` is the author's obra count when the caller already has it; an
+    exact, unfiltered listing then skips its ``COUNT(*)``.
+    """
+    limit = query["limit"]
+    offset = query["offset"]
+    anio = query["anio"]
+    comuna = query["comuna"]
+    tipo = query["tipo"]
+    count_mode = query["count"]
+    fields = query["fields"]
+
+    filtered = anio is not None or comuna is not None or tipo is not None
+    known = total is not None and count_mode == "exact" and not filtered
+    rows, counted = list_obras_by_autor(
+        conn,
+        autor_id,
+        comuna=comuna,
+        tipo=tipo,
+        anio=anio,
+        limit=limit if count_mode == "exact" else limit + 1,
+        offset=offset,
+        count="none" if known else count_mode,
+        fields=fields,
+    )
+    if not known:
+        total = counted
+
+    rows, has_more = page_window(rows, limit, count_mode)
+    items = _serialize_rows(rows, as_json, fields)
+    meta = build_meta(
+        total, limit, offset, len(rows), count_mode=count_mode, has_more=has_more
+    )
     filters = _build_filters(
         autor=None,
         comuna=comuna,
@@ -242,3 +357,106 @@ def get_obras_by_autor(autor_id: int, params: Mapping[str, str]) -> Dict[str, ob
         "meta": meta,
         "filters": filters,
     }
+
+
+def _parse_geo_format(value: Optional[str]) -> str:
+    fmt = (value or "json").lower()
+    if fmt not in GEO_FORMATS:
+        raise ValueError("El parámetro 'format' debe ser 'json', 'columnar' o 'binary'.")
+    return fmt
+
+
+def get_obras_geo(fmt: Optional[str] = None) -> Dict[str, object] | bytes:
+    """Return georeferenced obras for the map in the requested format.
+
+    ``json`` keeps one object per point, ``columnar`` returns one array per
+    field with dictionary-encoded ``autor``/``tipo``/``comuna`` and ``binary``
+    packs float32 coordinates plus a string table (see ``pack_points``).
+    """
+    fmt = _parse_geo_format(fmt)
+    if settings.GEO_REFRESH_ENABLED and not primary_pinned():
+        return _geo_refresher().get()[fmt]
+    return _flight.do(("geo", fmt, primary_pinned()), lambda: _encode_geo(_located_obras(), fmt))
+
+
+def _geo_refresher() -> BackgroundRefresher:
+    global _geo_holder
+    if _geo_holder is None:
+        with _geo_holder_lock:
+            if _geo_holder is None:
+                _geo_holder = BackgroundRefresher(
+                    "obras_geo",
+                    _geo_payloads,
+                    version=current_version,
+                    peek=peek_version,
+                    interval=settings.GEO_REFRESH_INTERVAL,
+                    jitter=settings.GEO_REFRESH_JITTER,
+                    max_stale=settings.GEO_MAX_STALENESS,
+                    check_interval=settings.DATASET_VERSION_TTL,
+                )
+    return _geo_holder
+
+
+def _geo_payloads() -> Dict[str, Dict[str, object] | bytes]:
+    located = _located_obras()
+    return {fmt: _encode_geo(located, fmt) for fmt in GEO_FORMATS}
+
+
+def reset_geo_cache() -> None:
+    """Stop the background refresh and drop the held payloads (tests)."""
+    global _geo_holder
+    with _geo_holder_lock:
+        if _geo_holder is not None:
+            _geo_holder.stop()
+        _geo_holder = None
+
+
+@on_version_change
+def _refresh_geo_on_change(old: int, new: int) -> None:
+    holder = _geo_holder
+    if holder is not None:
+        holder.trigger()
+
+
+def _geo_stats() -> Dict[str, object]:
+    holder = _geo_holder
+    return holder.stats() if holder is not None else {}
+
+
+metrics.register("obras_geo", _geo_stats)
+
+
+def _located_obras() -> list:
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        located = [
+            snapshot.obra(index)
+            for index in snapshot.located_indexes()
+            if index < GEO_LIMIT
+        ]
+    else:
+        conn = get_read_connection()
+        try:
+            rows, _ = list_obras(
+                conn, limit=GEO_LIMIT, offset=0, count="none", fields=GEO_FIELDS
+            )
+        finally:
+            conn.close()
+        located = [obra for obra in rows if obra.lat is not None and obra.lon is not None]
+    return located
+
+
+def _encode_geo(located: list, fmt: str) -> Dict[str, object] | bytes:
+    if fmt == "binary":
+        return pack_points(
+            located,
+            id_index=0,
+            lat_index=10,
+            lon_index=11,
+            year_index=4,
+            string_columns=GEO_BINARY_STRINGS,
+        )
+    if fmt == "columnar":
+        encoded = encode_columnar(located, GEO_COLUMNS, GEO_DICTIONARY_FIELDS)
+        return {"format": "columnar", "total": len(located), **encoded}
+    return {"items": Obra.to_json(located, GEO_FIELDS), "total": len(located)}
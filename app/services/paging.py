@@ -0,0 +1,70 @@
+"""Pagination metadata shared by the listing services (``count`` modes included)."""
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional, Tuple
+
+from app.repositories.counts import COUNT_MODES
+
+
+def parse_count_mode(value: Optional[str]) -> str:
+    """Validate the ``count`` query parameter (``exact`` by default)."""
+    mode = (value or "exact").lower()
+    if mode not in COUNT_MODES:
+        raise ValueError("El parámetro 'count' debe ser 'exact', 'estimate' o 'none'.")
+    return mode
+
+
+def build_meta(
+    total: Optional[int],
+    limit: int,
+    offset: int,
+    page_items: int,
+    *,
+    count_mode: str = "exact",
+    has_more: bool = False,
+) -> Dict[str, object]:
+    """Pagination ``meta`` for a page of ``page_items`` rows.
+
+    With ``count_mode="exact"`` the pages come from ``total``; otherwise the
+    next page is known from ``has_more`` (see :func:`page_window`) and an
+    estimated ``total`` is raised to at least the rows already seen.
+    """
+    if count_mode == "exact":
+        total_pages = max(1, math.ceil(total / limit)) if limit else 1
+        page = 1
+        if limit:
+            page = (offset // limit) + 1
+            page = min(max(1, page), total_pages)
+        has_next = page < total_pages
+    else:
+        # Sin total exacto, "siguiente" se decide con la fila extra de la consulta.
+        page = (offset // limit) + 1 if limit else 1
+        has_next = has_more
+        total_pages = None
+        if total is not None:
+            total = max(total, offset + page_items + int(has_more))
+            total_pages = max(page, math.ceil(total / limit)) if limit else 1
+    has_prev = page > 1
+    prev_offset = (page - 2) * limit if has_prev else None
+    next_offset = page * limit if has_next else None
+    return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "page": page,
+        "total_pages": total_pages,
+        "count": page_items,
+        "has_prev": has_prev,
+        "has_next": has_next,
+        "prev_offset": prev_offset,
+        "next_offset": next_offset,
+        "count_mode": count_mode,
+    }
+
+
+def page_window(rows: list, limit: int, count_mode: str) -> Tuple[list, bool]:
+    """Trim the probe row fetched when the total is not exact."""
+    if count_mode == "exact":
+        return rows, False
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,162 @@
+"""Business logic for walking routes between obras."""
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app import settings
+from app.models.ruta import Parada
+from app.repositories.rutas_repository import list_located_ids, list_route_candidates
+from app.utils.database import get_read_connection
+from app.utils.tour import haversine_matrix, leg_distances, solve
+
+TRUE_VALUES = {"1", "true", "si", "sí"}
+FALSE_VALUES = {"", "0", "false", "no"}
+
+
+def _parse_float(value: Optional[str], *, field: str) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise ValueError(f"El parámetro '{field}' debe ser numérico.") from exc
+
+
+def _parse_start(params: Mapping[str, str]) -> tuple[float, float]:
+    lat = _parse_float(params.get("lat"), field="lat")
+    lon = _parse_float(params.get("lon"), field="lon")
+    if lat is None or lon is None:
+        raise ValueError("Debe proporcionar el punto de partida 'lat' y 'lon'.")
+    if not -90 <= lat <= 90:
+        raise ValueError("El parámetro 'lat' debe estar entre -90 y 90.")
+    if not -180 <= lon <= 180:
+        raise ValueError("El parámetro 'lon' debe estar entre -180 y 180.")
+    return lat, lon
+
+
+def _parse_ids(value: Optional[str]) -> Optional[List[int]]:
+    if value is None or value.strip() == "":
+        return None
+    try:
+        ids = list(dict.fromkeys(int(part) for part in value.split(",") if part.strip()))
+    except ValueError as exc:
+        raise ValueError(
+            "El parámetro 'obras' debe ser una lista de ids separados por comas."
+        ) from exc
+    if len(ids) > settings.RUTAS_MAX_PARADAS:
+        raise ValueError(f"Una ruta admite como máximo {settings.RUTAS_MAX_PARADAS} obras.")
+    return ids
+
+
+def _parse_bool(value: Optional[str], *, field: str) -> bool:
+    normalized = (value or "").strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValueError(f"El parámetro '{field}' debe ser 'true' o 'false'.")
+
+
+def _fetch_stops(ids, comuna, near) -> Tuple[List[Parada], List[int], List[int]]:
+    """Return the stops plus the requested ids left out: ``(stops, missing, filtered)``.
+
+    ``missing`` do not exist or have no coordinates; ``filtered`` exist but
+    fall outside ``comuna`` or ``radius``.
+    """
+    conn = get_read_connection()
+    try:
+        rows = list_route_candidates(
+            conn, ids=ids, comuna=comuna, near=near, limit=settings.RUTAS_MAX_PARADAS + 1
+        )
+        if len(rows) > settings.RUTAS_MAX_PARADAS:
+            raise ValueError(
+                f"Hay más de {settings.RUTAS_MAX_PARADAS} obras en la zona; "
+                "reduce 'radius' o indica 'obras'."
+            )
+        found = {row[0] for row in rows}
+        left_out = [obra_id for obra_id in ids or () if obra_id not in found]
+        # Solo con filtros hace falta distinguir "no existe" de "quedó fuera del filtro".
+        located = list_located_ids(conn, left_out) if left_out and (comuna or near) else set()
+    finally:
+        conn.close()
+    missing = [obra_id for obra_id in left_out if obra_id not in located]
+    filtered = [obra_id for obra_id in left_out if obra_id in located]
+    return [Parada(*row) for row in rows], missing, filtered
+
+
+def _stop_dict(position: int, stop: Parada, leg: float) -> Dict[str, object]:
+    return {
+        "orden": position,
+        "id": stop.id,
+        "nombre": stop.nombre,
+        "autor": stop.autor,
+        "lat": stop.lat,
+        "lon": stop.lon,
+        "distancia_desde_anterior_m": round(leg, 1),
+    }
+
+
+def get_ruta(params: Mapping[str, str]) -> Dict[str, object]:
+    """Order the requested obras into a walking tour from the start point.
+
+    Stops are chosen by ``obras`` (comma-separated ids) and/or ``comuna`` and
+    ``radius`` (metres around the start). With ``circular=true`` the tour
+    returns to the start. Requested ids that do not exist or have no
+    coordinates are listed under ``meta.omitidas``; those that exist but fall
+    outside ``comuna`` or ``radius`` under ``meta.fuera_de_filtro``.
+    """
+    lat, lon = _parse_start(params)
+    ids = _parse_ids(params.get("obras"))
+    comuna = (params.get("comuna") or "").strip() or None
+    radius = _parse_float(params.get("radius"), field="radius")
+    if radius is not None and radius <= 0:
+        raise ValueError("El parámetro 'radius' debe ser mayor que 0.")
+    if ids is None and comuna is None and radius is None:
+        raise ValueError("Debe indicar 'obras', 'comuna' o 'radius'.")
+    circular = _parse_bool(params.get("circular"), field="circular")
+
+    near = {"lat": lat, "lon": lon, "radius": radius} if radius is not None else None
+    stops, omitted, filtered = _fetch_stops(ids, comuna, near)
+
+    nodes = [Parada(None, "Inicio", None, lat, lon), *stops]
+    started = time.perf_counter()
+    dist = haversine_matrix(
+        np.fromiter((node.lat for node in nodes), dtype=np.float64, count=len(nodes)),
+        np.fromiter((node.lon for node in nodes), dtype=np.float64, count=len(nodes)),
+    )
+    tour = solve(dist, closed=circular, time_budget=settings.RUTAS_TIME_BUDGET)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    legs = leg_distances(tour.order, dist, closed=circular)
+    paradas = [
+        _stop_dict(position, nodes[node], legs[position])
+        for position, node in enumerate(tour.order[1:], start=1)
+    ]
+    distance_km = tour.distance / 1000
+    improvement = (
+        (tour.initial_distance - tour.distance) / tour.initial_distance * 100
+        if tour.initial_distance
+        else 0.0
+    )
+    return {
+        "inicio": {"lat": lat, "lon": lon},
+        "paradas": paradas,
+        "regreso_m": round(legs[-1], 1) if circular and paradas else None,
+        "distancia_total_m": round(tour.distance, 1),
+        "duracion_estimada_min": round(distance_km / settings.RUTAS_WALKING_SPEED_KMH * 60, 1),
+        "meta": {
+            "paradas": len(paradas),
+            "circular": circular,
+            "omitidas": omitted,
+            "fuera_de_filtro": filtered,
+            "optimizacion": {
+                "distancia_inicial_m": round(tour.initial_distance, 1),
+                "mejora_pct": round(improvement, 2),
+                "tiempo_ms": round(elapsed_ms, 3),
+                "completa": tour.converged,
+            },
+        },
+    }
@@ -0,0 +1,95 @@
+"""Build and share the read-only dataset snapshot between gunicorn workers."""
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+
+from app import settings
+from app.repositories.autores_repository import list_all_autores
+from app.repositories.dataset_repository import get_dataset_version
+from app.repositories.obras_repository import list_all_obras
+from app.services.dataset_service import current_version
+from app.utils.database import get_read_connection
+from app.utils.file_lock import file_lock
+from app.utils.snapshot import Snapshot, read_header, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_snapshot: Optional[Snapshot] = None
+
+
+def _path() -> Path:
+    return Path(settings.SNAPSHOT_PATH)
+
+
+def build_snapshot(min_version: int = 0) -> Path:
+    """Write a fresh snapshot unless the file already covers ``min_version``.
+
+    Meant to run in the gunicorn master before forking (see
+    ``gunicorn.conf.py``) and, after a reload, in whichever worker notices the
+    new dataset version first.
+    """
+    path = _path()
+    # Serializa entre procesos: solo un worker consulta la base de datos.
+    with file_lock(path):
+        header = read_header(path)
+        if header is not None and min_version and header[0] >= min_version:
+            return path
+
+        conn = get_read_connection()
+        try:
+            version = get_dataset_version(conn)
+            obras = list_all_obras(conn)
+            autores = list_all_autores(conn)
+        finally:
+            conn.close()
+
+        write_snapshot(path, version, obras, autores)
+        logger.info(
+            "Snapshot v%s escrito: %s obras, %s autores", version, len(obras), len(autores)
+        )
+        return path
+
+
+def get_snapshot() -> Optional[Snapshot]:
+    """Return the mapped snapshot for the current dataset version, or None.
+
+    The file is swapped with ``os.replace``; workers re-map it when the dataset
+    version moves past the one they hold, and keep serving the previous
+    mapping until the new one is ready.
+    """
+    global _snapshot
+    if not settings.SNAPSHOT_ENABLED:
+        return None
+
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version >= version:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot.version >= version:
+            return snapshot
+        try:
+            header = read_header(_path())
+            if header is None or header[0] < version:
+                build_snapshot(min_version=version)
+            _snapshot = Snapshot(_path())
+        except (OSError, ValueError, psycopg2.Error):
+            logger.warning("Snapshot no disponible; se consulta la base de datos", exc_info=True)
+            return snapshot
+        # La versión anterior se libera cuando no queden referencias activas.
+        return _snapshot
+
+
+def reset() -> None:
+    """Drop the mapped snapshot (tests and post-fork hooks)."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
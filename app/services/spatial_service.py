@@ -0,0 +1,179 @@
+"""In-memory evaluator for spatial obra queries, rebuilt per dataset version."""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import psycopg2
+
+from app import settings
+from app.models.obra import Obra
+from app.repositories.obras_repository import list_all_obras
+from app.services.dataset_service import current_version
+from app.services.snapshot_service import get_snapshot
+from app.utils import metrics
+from app.utils.database import get_read_connection, primary_pinned
+from app.utils.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+class SpatialCatalog(NamedTuple):
+    """Index plus the rows it points into (catalog order, as in the snapshot)."""
+
+    version: int
+    index: SpatialIndex
+    ids: np.ndarray
+    id_order: np.ndarray
+    obra: Callable[[int], Obra]
+    build_ms: float
+
+    def position(self, obra_id: int) -> Optional[int]:
+        slot = int(np.searchsorted(self.ids, obra_id, sorter=self.id_order))
+        if slot < len(self.ids) and self.ids[self.id_order[slot]] == obra_id:
+            return int(self.id_order[slot])
+        return None
+
+
+_lock = threading.Lock()
+_catalog: Optional[SpatialCatalog] = None
+
+
+def build_catalog(version: int) -> SpatialCatalog:
+    """Index the snapshot columns when mapped, otherwise every obra loaded from the DB."""
+    started = time.perf_counter()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        lat = np.asarray(snapshot.lat, dtype=np.float64)
+        lon = np.asarray(snapshot.lon, dtype=np.float64)
+        ids = np.asarray(snapshot.ids, dtype=np.int64)
+        obra = snapshot.obra
+    else:
+        conn = get_read_connection()
+        try:
+            obras = list_all_obras(conn)
+        finally:
+            conn.close()
+        nan = math.nan
+        lat = np.array([nan if o.lat is None else o.lat for o in obras], dtype=np.float64)
+        lon = np.array([nan if o.lon is None else o.lon for o in obras], dtype=np.float64)
+        ids = np.array([o.id for o in obras], dtype=np.int64)
+        obra = obras.__getitem__
+    index = SpatialIndex(lat, lon, cell_deg=settings.SPATIAL_INDEX_CELL_DEG)
+    build_ms = (time.perf_counter() - started) * 1000
+    return SpatialCatalog(version, index, ids, np.argsort(ids, kind="stable"), obra, build_ms)
+
+
+def get_catalog() -> Optional[SpatialCatalog]:
+    """Return the index for the current dataset version, or None to use PostGIS.
+
+    None when the feature is off, when reads are pinned to the primary, or
+    when no index could be built; a failed rebuild keeps the previous one.
+    """
+    global _catalog
+    if not settings.SPATIAL_INDEX_ENABLED or primary_pinned():
+        return None
+
+    version = current_version()
+    catalog = _catalog
+    if catalog is not None and catalog.version >= version:
+        return catalog
+
+    with _lock:
+        catalog = _catalog
+        if catalog is not None and catalog.version >= version:
+            return catalog
+        try:
+            _catalog = build_catalog(version)
+        except (OSError, ValueError, psycopg2.Error):
+            logger.warning("Índice espacial no disponible", exc_info=True)
+            return catalog
+        logger.info(
+            "Índice espacial v%s: %s obras en %.1f ms",
+            version,
+            len(_catalog.index),
+            _catalog.build_ms,
+        )
+        return _catalog
+
+
+def reset() -> None:
+    """Drop the index (tests and post-fork hooks)."""
+    global _catalog
+    with _lock:
+        _catalog = None
+
+
+def list_obras_near(
+    catalog: SpatialCatalog,
+    *,
+    near: Dict[str, float],
+    autor: Optional[str] = None,
+    comuna: Optional[str] = None,
+    tipo: Optional[str] = None,
+    anio: Optional[int] = None,
+    limit: int,
+    offset: int,
+    count: str = "exact",
+) -> Tuple[List[Obra], Optional[int]]:
+    """Evaluate ``list_obras`` in memory for queries with a ``near`` filter.
+
+    Same filters, order and ``count`` semantics as the repository (``autor``
+    is a case-insensitive literal substring on both paths); the radius is
+    tested with the spherical haversine distance. The total is always exact
+    here, except with ``count="none"``.
+    """
+    positions, _ = catalog.index.within_radius(near["lat"], near["lon"], near["radius"])
+    needle = autor.lower() if autor else None
+    matches: List[Obra] = []
+    for position in positions.tolist():
+        obra = catalog.obra(position)
+        if needle is not None and needle not in (obra.autor or "").lower():
+            continue
+        if comuna and obra.comuna != comuna:
+            continue
+        if tipo and obra.tipo != tipo:
+            continue
+        if anio is not None and obra.anio != anio:
+            continue
+        matches.append(obra)
+    total = None if count == "none" else len(matches)
+    return matches[offset : offset + limit], total
+
+
+def nearest_obras(
+    catalog: SpatialCatalog, obra_id: int, limit: int
+) -> List[Tuple[int, str, Optional[str], float, float, float]]:
+    """In-memory counterpart of ``list_nearest_obras``; empty if ``obra_id`` has no point."""
+    position = catalog.position(obra_id)
+    if position is None:
+        return []
+    origin = catalog.obra(position)
+    if origin.lat is None or origin.lon is None:
+        return []
+    positions, distances = catalog.index.nearest(origin.lat, origin.lon, limit + 1)
+    found = []
+    for neighbour, distance in zip(positions.tolist(), distances.tolist()):
+        if neighbour == position:
+            continue
+        obra = catalog.obra(neighbour)
+        found.append((obra.id, obra.nombre, obra.autor, obra.lat, obra.lon, distance))
+    return found[:limit]
+
+
+def _stats() -> Dict[str, object]:
+    catalog = _catalog
+    if catalog is None:
+        return {}
+    return {
+        "version": catalog.version,
+        "obras": len(catalog.index),
+        "build_ms": round(catalog.build_ms, 3),
+    }
+
+
+metrics.register("spatial_index", _stats)
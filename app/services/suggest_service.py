@@ -0,0 +1,127 @@
+"""Search-as-you-type suggestions for autores and obras."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+import psycopg2
+
+from app.repositories.autores_repository import list_all_autores
+from app.repositories.obras_repository import list_all_obras
+from app.services.dataset_service import current_version, on_version_change
+from app.services.snapshot_service import get_snapshot
+from app.utils.database import get_read_connection
+from app.utils.prefix_index import PrefixIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# El índice guarda los modelos; cada respuesta proyecta solo estos campos.
+SUGGEST_FIELDS = {
+    "autores": ("id", "nombre", "total_obras"),
+    "obras": ("id", "nombre", "autor_id", "autor"),
+}
+
+
+class SuggestIndexes(NamedTuple):
+    version: int
+    autores: PrefixIndex
+    obras: PrefixIndex
+
+
+_indexes: Optional[SuggestIndexes] = None
+_build_lock = threading.Lock()
+
+
+def _load_rows():
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return list(snapshot.autores()), list(snapshot.obras())
+    conn = get_read_connection()
+    try:
+        return list_all_autores(conn), list_all_obras(conn)
+    finally:
+        conn.close()
+
+
+def build_indexes(version: int) -> SuggestIndexes:
+    """Build both indexes; obras are weighted by their author's ``total_obras``."""
+    autores, obras = _load_rows()
+    totals = {autor.id: autor.total_obras for autor in autores}
+    autores_index = PrefixIndex((autor.nombre, autor.total_obras, autor) for autor in autores)
+    obras_index = PrefixIndex((obra.nombre, totals.get(obra.autor_id, 0), obra) for obra in obras)
+    return SuggestIndexes(version, autores_index, obras_index)
+
+
+def _rebuild(version: int) -> None:
+    global _indexes
+    with _build_lock:
+        if _indexes is not None and _indexes.version >= version:
+            return
+        try:
+            _indexes = build_indexes(version)
+        except psycopg2.Error:
+            logger.warning("No fue posible reconstruir el índice de sugerencias", exc_info=True)
+
+
+@on_version_change
+def _schedule_rebuild(old_version: int, new_version: int) -> None:
+    # Mientras se reconstruye se sigue respondiendo con el índice anterior.
+    if _indexes is not None:
+        threading.Thread(
+            target=_rebuild, args=(new_version,), name="suggest-index", daemon=True
+        ).start()
+
+
+def _get_indexes() -> SuggestIndexes:
+    global _indexes
+    version = current_version()
+    if _indexes is None:
+        with _build_lock:
+            if _indexes is None:
+                _indexes = build_indexes(version)
+    return _indexes
+
+
+def _parse_limit(value: Optional[str]) -> int:
+    if value is None or value == "":
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError as exc:
+        raise ValueError("El parámetro 'limit' debe ser numérico.") from exc
+    if limit <= 0:
+        raise ValueError("El parámetro 'limit' debe ser mayor que 0.")
+    return min(limit, MAX_LIMIT)
+
+
+def _suggest(params: Mapping[str, str], field: str) -> Dict[str, object]:
+    query = (params.get("q") or "").strip()
+    limit = _parse_limit(params.get("limit"))
+    items: List[Dict[str, Any]] = []
+    if query:
+        fields = SUGGEST_FIELDS[field]
+        items = [
+            item.to_dict(fields) for item in getattr(_get_indexes(), field).search(query, limit)
+        ]
+    return {"q": query, "items": items}
+
+
+def suggest_autores(params: Mapping[str, str]) -> Dict[str, object]:
+    """Return autores whose name (or a word in it) starts with ``q``, most prolific first."""
+    return _suggest(params, "autores")
+
+
+def suggest_obras(params: Mapping[str, str]) -> Dict[str, object]:
+    """Return obras whose name (or a word in it) starts with ``q``."""
+    return _suggest(params, "obras")
+
+
+def reset() -> None:
+    """Drop the built indexes (tests)."""
+    global _indexes
+    with _build_lock:
+        _indexes = None
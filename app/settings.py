@@ -0,0 +1,164 @@
+"""Runtime settings read from environment variables (.env supported)."""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value
+
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = _env_str(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise ValueError(f"La variable de entorno '{name}' debe ser numérica.") from exc
+
+
+def _env_float(name: str, default: Optional[float] = None) -> Optional[float]:
+    value = _env_str(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise ValueError(f"La variable de entorno '{name}' debe ser numérica.") from exc
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = _env_str(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on", "si", "sí")
+
+
+# -------- Slow query log --------
+# Umbral en milisegundos; si no se define, el registro queda deshabilitado.
+SLOW_QUERY_THRESHOLD_MS = _env_float("SLOW_QUERY_THRESHOLD_MS")
+SLOW_QUERY_LOG_PATH = _env_str("SLOW_QUERY_LOG_PATH", "logs/slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = _env_int("SLOW_QUERY_LOG_MAX_BYTES", 5 * 1024 * 1024)
+SLOW_QUERY_LOG_BACKUPS = _env_int("SLOW_QUERY_LOG_BACKUPS", 5)
+# none: parámetros tal cual · strings: oculta textos · all: oculta todos los valores
+SLOW_QUERY_REDACT = _env_str("SLOW_QUERY_REDACT", "strings")
+# analyze: EXPLAIN (ANALYZE, BUFFERS) · plain: solo plan estimado · off: sin plan
+SLOW_QUERY_EXPLAIN = _env_str("SLOW_QUERY_EXPLAIN", "analyze")
+# Depuración por petición: cuenta conexiones, sentencias y filas (cabeceras X-Query-*)
+# y registra las sentencias idénticas repetidas; solo para desarrollo.
+QUERY_DEBUG = _env_bool("QUERY_DEBUG", False)
+
+# -------- Compresión de respuestas --------
+COMPRESSION_ENABLED = _env_bool("COMPRESSION_ENABLED", True)
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 1024)
+COMPRESSION_GZIP_LEVEL = _env_int("COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _env_int("COMPRESSION_BROTLI_QUALITY", 5)
+
+# -------- Versión del dataset y cachés de plantillas --------
+# Segundos que un worker reutiliza la versión leída antes de consultarla de nuevo.
+DATASET_VERSION_TTL = _env_float("DATASET_VERSION_TTL", 5.0)
+FRAGMENT_CACHE_ENABLED = _env_bool("FRAGMENT_CACHE_ENABLED", True)
+FRAGMENT_CACHE_SIZE = _env_int("FRAGMENT_CACHE_SIZE", 512)
+FRAGMENT_CACHE_TTL = _env_float("FRAGMENT_CACHE_TTL", 600.0)
+JINJA_BYTECODE_CACHE_DIR = _env_str("JINJA_BYTECODE_CACHE_DIR", ".cache/jinja")
+JINJA_PRECOMPILE = _env_bool("JINJA_PRECOMPILE", True)
+
+# -------- Snapshot compartido entre workers --------
+SNAPSHOT_ENABLED = _env_bool("SNAPSHOT_ENABLED", False)
+SNAPSHOT_PATH = _env_str("SNAPSHOT_PATH", ".cache/snapshot/dataset.bin")
+
+# -------- Réplicas de lectura --------
+# Lista "host[:puerto]" separada por comas; vacía = todas las lecturas al primario.
+POSTGRES_READ_HOSTS = _env_str("POSTGRES_READ_HOSTS", "")
+POSTGRES_READ_DB = _env_str("POSTGRES_READ_DB")
+POSTGRES_READ_USER = _env_str("POSTGRES_READ_USER")
+POSTGRES_READ_PASSWORD = _env_str("POSTGRES_READ_PASSWORD")
+POSTGRES_READ_SSLMODE = _env_str("POSTGRES_READ_SSLMODE")
+# Segundos que una réplica caída queda fuera de la rotación.
+POSTGRES_READ_RETRY_SECONDS = _env_float("POSTGRES_READ_RETRY_SECONDS", 30.0)
+# Retraso máximo de replicación tolerado (segundos) y frecuencia de medición.
+POSTGRES_READ_MAX_LAG = _env_float("POSTGRES_READ_MAX_LAG", 5.0)
+POSTGRES_READ_LAG_CHECK_SECONDS = _env_float("POSTGRES_READ_LAG_CHECK_SECONDS", 5.0)
+# Ventana (segundos) en la que un cliente que escribió lee del primario.
+READ_YOUR_WRITES_WINDOW = _env_float("READ_YOUR_WRITES_WINDOW", 10.0)
+
+# -------- Pool de conexiones y sentencias preparadas --------
+# Conexiones inactivas que cada proceso conserva por servidor; 0 desactiva el pool.
+POSTGRES_POOL_SIZE = _env_int("POSTGRES_POOL_SIZE", 0)
+PREPARED_STATEMENTS = _env_bool("PREPARED_STATEMENTS", True)
+# Combinaciones de filtros cuyo SQL se guarda en memoria / sentencias por conexión.
+PREPARED_CACHE_SIZE = _env_int("PREPARED_CACHE_SIZE", 64)
+
+# -------- Control de admisión (por worker) --------
+ADMISSION_ENABLED = _env_bool("ADMISSION_ENABLED", True)
+# Peticiones atendidas a la vez por worker; el resto espera o recibe 503.
+ADMISSION_MAX_CONCURRENT = _env_int("ADMISSION_MAX_CONCURRENT", 8)
+ADMISSION_MAX_QUEUE = _env_int("ADMISSION_MAX_QUEUE", 16)
+# Espera máxima (segundos) por un cupo antes de responder 503.
+ADMISSION_QUEUE_TIMEOUT = _env_float("ADMISSION_QUEUE_TIMEOUT", 0.5)
+# Cupos reservados a prioridad alta y fracción disponible para prioridad baja.
+ADMISSION_RESERVED_HIGH = _env_int("ADMISSION_RESERVED_HIGH", 2)
+ADMISSION_LOW_SHARE = _env_float("ADMISSION_LOW_SHARE", 0.5)
+ADMISSION_RETRY_AFTER = _env_int("ADMISSION_RETRY_AFTER", 2)
+# Token Bearer exigido por /api/metrics; vacío la deja abierta (solo en red interna).
+METRICS_TOKEN = _env_str("METRICS_TOKEN")
+
+# -------- Coalescencia de consultas idénticas --------
+SINGLE_FLIGHT_ENABLED = _env_bool("SINGLE_FLIGHT_ENABLED", True)
+
+# -------- /api/obras_geo en memoria (stale-while-revalidate) --------
+GEO_REFRESH_ENABLED = _env_bool("GEO_REFRESH_ENABLED", True)
+# Segundos entre recargas en segundo plano y variación aleatoria (fracción).
+GEO_REFRESH_INTERVAL = _env_float("GEO_REFRESH_INTERVAL", 300.0)
+GEO_REFRESH_JITTER = _env_float("GEO_REFRESH_JITTER", 0.2)
+# Antigüedad máxima servida; pasado este límite la petición espera la recarga.
+GEO_MAX_STALENESS = _env_float("GEO_MAX_STALENESS", 1800.0)
+
+# -------- Invalidación entre workers (LISTEN/NOTIFY) --------
+INVALIDATION_ENABLED = _env_bool("INVALIDATION_ENABLED", True)
+# Sin LISTEN (p. ej. detrás de PgBouncer en modo transacción) se consulta la versión.
+INVALIDATION_USE_LISTEN = _env_bool("INVALIDATION_USE_LISTEN", True)
+# Intervalo de consulta en modo polling: cota de la latencia de invalidación.
+INVALIDATION_POLL_SECONDS = _env_float("INVALIDATION_POLL_SECONDS", 5.0)
+# Segundos en modo polling antes de reintentar LISTEN.
+INVALIDATION_LISTEN_RETRY_SECONDS = _env_float("INVALIDATION_LISTEN_RETRY_SECONDS", 60.0)
+
+# -------- Rutas a pie --------
+# Paradas máximas por ruta y segundos de optimización (2-opt/Or-opt) por petición.
+RUTAS_MAX_PARADAS = _env_int("RUTAS_MAX_PARADAS", 500)
+RUTAS_TIME_BUDGET = _env_float("RUTAS_TIME_BUDGET", 0.3)
+RUTAS_WALKING_SPEED_KMH = _env_float("RUTAS_WALKING_SPEED_KMH", 4.5)
+
+# -------- Vecinos más cercanos precalculados --------
+# Tabla k-NN de obras con coordenadas, mapeada en memoria por los workers.
+NEIGHBOURS_ENABLED = _env_bool("NEIGHBOURS_ENABLED", False)
+NEIGHBOURS_PATH = _env_str("NEIGHBOURS_PATH", ".cache/snapshot/neighbours.bin")
+NEIGHBOURS_K = _env_int("NEIGHBOURS_K", 16)
+
+# -------- Celdas geohash --------
+# Prefiltro por rangos de obras.geohash antes de ST_DWithin en búsquedas por radio.
+GEOHASH_PREFILTER = _env_bool("GEOHASH_PREFILTER", True)
+# Precisión por defecto de /api/obras_density y entradas de su caché por worker.
+DENSITY_DEFAULT_PRECISION = _env_int("DENSITY_DEFAULT_PRECISION", 5)
+DENSITY_CACHE_SIZE = _env_int("DENSITY_CACHE_SIZE", 256)
+
+# -------- Índice espacial en memoria --------
+# Resuelve filtros por radio y obras cercanas sin PostGIS (rejilla de celdas en grados).
+SPATIAL_INDEX_ENABLED = _env_bool("SPATIAL_INDEX_ENABLED", False)
+SPATIAL_INDEX_CELL_DEG = _env_float("SPATIAL_INDEX_CELL_DEG", 0.01)
+
+# -------- API de escritura masiva --------
+# Token Bearer de POST /obras/bulk y /autores/bulk; sin token la API queda deshabilitada.
+BULK_API_TOKEN = _env_str("BULK_API_TOKEN")
+# Registros por sentencia multi-fila y máximo de registros por petición.
+BULK_BATCH_SIZE = _env_int("BULK_BATCH_SIZE", 500)
+BULK_MAX_RECORDS = _env_int("BULK_MAX_RECORDS", 50_000)
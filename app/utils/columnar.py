@@ -0,0 +1,113 @@
+"""Columnar and packed-binary encodings for point datasets."""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.fast_json import Column
+
+BINARY_MAGIC = b"PMG1"
+NULL_INDEX = 0xFFFFFFFF
+NULL_YEAR = -1
+
+
+def _dictionary_encode(values: Sequence[Optional[str]]) -> Tuple[List[str], List[Optional[int]]]:
+    dictionary: List[str] = []
+    positions: Dict[str, int] = {}
+    codes: List[Optional[int]] = []
+    for value in values:
+        if value is None:
+            codes.append(None)
+            continue
+        code = positions.get(value)
+        if code is None:
+            code = positions[value] = len(dictionary)
+            dictionary.append(value)
+        codes.append(code)
+    return dictionary, codes
+
+
+def encode_columnar(
+    rows: Sequence[Sequence[Any]],
+    columns: Sequence[Column],
+    dictionary_fields: Sequence[str] = (),
+) -> Dict[str, object]:
+    """Return one array per field; ``dictionary_fields`` become integer codes.
+
+    Each dictionary-encoded field gets its distinct values in ``dictionaries``
+    and ``null`` codes for missing values.
+    """
+    data: Dict[str, object] = {}
+    dictionaries: Dict[str, List[str]] = {}
+    for key, index in columns:
+        values = [row[index] for row in rows]
+        if key in dictionary_fields:
+            dictionaries[key], data[key] = _dictionary_encode(values)
+        else:
+            data[key] = values
+    return {"columns": data, "dictionaries": dictionaries}
+
+
+def _year(value: Optional[int]) -> int:
+    if value is None or not -(2**31) < value < 2**31:
+        return NULL_YEAR
+    return value
+
+
+def pack_points(
+    rows: Sequence[Sequence[Any]],
+    *,
+    id_index: int,
+    lat_index: int,
+    lon_index: int,
+    year_index: int,
+    string_columns: Sequence[Column],
+) -> bytes:
+    """Pack points into a little-endian binary buffer.
+
+    Layout (every section starts 4-byte aligned)::
+
+        magic "PMG1" | uint32 count | uint32 string_count | uint32 field_count
+        float32 lat[count] | float32 lon[count] | uint32 id[count] | int32 year[count]
+        uint32 string_index[field_count][count]   (0xFFFFFFFF = null)
+        uint32 string_offsets[string_count + 1]    (byte offsets into the blob)
+        utf-8 blob
+
+    String fields follow the order of ``string_columns`` and share one
+    deduplicated string table; a missing year is encoded as ``-1``.
+    """
+    count = len(rows)
+    lat = array("f", (row[lat_index] for row in rows))
+    lon = array("f", (row[lon_index] for row in rows))
+    ids = array("I", (row[id_index] for row in rows))
+    years = array("i", (_year(row[year_index]) for row in rows))
+
+    strings: List[str] = []
+    positions: Dict[str, int] = {}
+    indexes = array("I")
+    for _, index in string_columns:
+        for row in rows:
+            value = row[index]
+            if value is None:
+                indexes.append(NULL_INDEX)
+                continue
+            code = positions.get(value)
+            if code is None:
+                code = positions[value] = len(strings)
+                strings.append(value)
+            indexes.append(code)
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = array("I", [0])
+    for chunk in encoded:
+        offsets.append(offsets[-1] + len(chunk))
+
+    sections = [lat, lon, ids, years, indexes, offsets]
+    if sys.byteorder == "big":
+        for section in sections:
+            section.byteswap()
+
+    header = BINARY_MAGIC + struct.pack("<III", count, len(strings), len(string_columns))
+    return b"".join([header, *(section.tobytes() for section in sections), *encoded])
@@ -1,11 +1,106 @@
-import psycopg2
+import itertools
+import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
 from dotenv import load_dotenv
 
+from app import settings
+from app.utils.prepared import PreparingConnection
+from app.utils.query_stats import wrap_connection
+
 load_dotenv()
 
-def get_connection():
-    return psycopg2.connect(
+logger = logging.getLogger(__name__)
+
+# Consulta de retraso: 0 si la réplica ya aplicó todo lo recibido.
+_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_pin_primary: ContextVar[bool] = ContextVar("pin_primary", default=False)
+
+
+class ConnectionPool:
+    """Keeps up to ``size`` idle connections to one server for reuse."""
+
+    def __init__(self, connect: Callable[[], Any], size: int) -> None:
+        self._connect = connect
+        self.size = size
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> "PooledConnection":
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if not conn.closed:
+                    return PooledConnection(self, conn)
+        return PooledConnection(self, self._connect())
+
+    def release(self, conn) -> None:
+        if conn.closed:
+            return
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+class PooledConnection:
+    """Connection proxy whose ``close()`` hands the connection back to the pool."""
+
+    def __init__(self, pool: ConnectionPool, conn) -> None:
+        self._pool = pool
+        self._conn = conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already closed")
+        return getattr(self._conn, name)
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(**kwargs: Any):
+    size = settings.POSTGRES_POOL_SIZE or 0
+    if size <= 0:
+        # Conexión de un solo uso: preparar costaría un viaje más sin reutilizar el plan.
+        return wrap_connection(psycopg2.connect(**kwargs))
+
+    kwargs["connection_factory"] = PreparingConnection
+
+    # Se incluye el pid: un worker nunca reutiliza conexiones heredadas del master.
+    key = (os.getpid(), *(str(kwargs.get(name)) for name in ("host", "port", "dbname", "user")))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(lambda: psycopg2.connect(**kwargs), size)
+    return wrap_connection(pool.acquire())
+
+
+def _primary_kwargs() -> Dict[str, Any]:
+    return dict(
         dbname=os.getenv("POSTGRES_DB"),
         user=os.getenv("POSTGRES_USER"),
         password=os.getenv("POSTGRES_PASSWORD"),
@@ -14,3 +109,162 @@ def get_connection():
         sslmode=os.getenv("POSTGRES_SSLMODE", "require")
     )
 
+
+def get_connection():
+    """Return a connection to the primary (read-write) database."""
+    return _connect(**_primary_kwargs())
+
+
+def get_listen_connection():
+    """Return a dedicated, never pooled, autocommit connection to the primary.
+
+    ``NOTIFY`` is not relayed to replicas, so listeners must use the primary.
+    """
+    conn = psycopg2.connect(**_primary_kwargs())
+    conn.autocommit = True
+    return conn
+
+
+def get_write_connection():
+    """Return a connection to the primary; loaders and writes must use it."""
+    return get_connection()
+
+
+class Replica:
+    """Health and lag bookkeeping for one read replica."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.down_until = 0.0
+        self.lag = 0.0
+        self.lag_checked_at = 0.0
+
+    def __repr__(self) -> str:
+        return f"Replica({self.host}:{self.port})"
+
+    def connect(self):
+        return _connect(
+            dbname=settings.POSTGRES_READ_DB or os.getenv("POSTGRES_DB"),
+            user=settings.POSTGRES_READ_USER or os.getenv("POSTGRES_USER"),
+            password=settings.POSTGRES_READ_PASSWORD or os.getenv("POSTGRES_PASSWORD"),
+            host=self.host,
+            port=self.port,
+            sslmode=settings.POSTGRES_READ_SSLMODE or os.getenv("POSTGRES_SSLMODE", "require"),
+        )
+
+
+def parse_hosts(value: str) -> List[Tuple[str, int]]:
+    """Parse ``"host[:port],host[:port]"`` into ``(host, port)`` pairs."""
+    hosts = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        hosts.append((host, int(port) if port else 5432))
+    return hosts
+
+
+class ReadRouter:
+    """Round-robin over healthy replicas, skipping lagging or failed ones."""
+
+    def __init__(self, hosts: List[Tuple[str, int]]) -> None:
+        self.replicas = [Replica(host, port) for host, port in hosts]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _lagging(self, replica: Replica, conn) -> bool:
+        now = time.monotonic()
+        if now - replica.lag_checked_at >= settings.POSTGRES_READ_LAG_CHECK_SECONDS:
+            with conn.cursor() as cur:
+                cur.execute(_LAG_SQL)
+                replica.lag = float(cur.fetchone()[0] or 0)
+            conn.rollback()
+            replica.lag_checked_at = now
+        return replica.lag > settings.POSTGRES_READ_MAX_LAG
+
+    def connect(self):
+        """Return a replica connection, or None when no replica is usable."""
+        if not self.replicas:
+            return None
+        with self._lock:
+            start = next(self._counter)
+        total = len(self.replicas)
+        for step in range(total):
+            replica = self.replicas[(start + step) % total]
+            if replica.down_until > time.monotonic():
+                continue
+            try:
+                conn = replica.connect()
+            except psycopg2.OperationalError:
+                logger.warning("Réplica %s no disponible", replica)
+                replica.down_until = time.monotonic() + settings.POSTGRES_READ_RETRY_SECONDS
+                continue
+            try:
+                lagging = self._lagging(replica, conn)
+            except psycopg2.Error:
+                logger.warning("No se pudo medir el retraso de %s", replica)
+                conn.close()
+                replica.down_until = time.monotonic() + settings.POSTGRES_READ_RETRY_SECONDS
+                continue
+            if lagging:
+                logger.info("Réplica %s con %.1fs de retraso; se omite", replica, replica.lag)
+                conn.close()
+                continue
+            return conn
+        return None
+
+
+_router: Optional[ReadRouter] = None
+_router_hosts: Optional[str] = None
+_router_lock = threading.Lock()
+
+
+def _get_router() -> ReadRouter:
+    global _router, _router_hosts
+    hosts = settings.POSTGRES_READ_HOSTS or ""
+    with _router_lock:
+        if _router is None or _router_hosts != hosts:
+            _router = ReadRouter(parse_hosts(hosts))
+            _router_hosts = hosts
+        return _router
+
+
+def get_read_connection():
+    """Return a connection for read-only queries.
+
+    Goes to a healthy replica when ``POSTGRES_READ_HOSTS`` is set, and to the
+    primary when none is usable or the current context pinned the primary
+    (read-your-writes).
+    """
+    if _pin_primary.get() or not settings.POSTGRES_READ_HOSTS:
+        return get_write_connection()
+    conn = _get_router().connect()
+    if conn is None:
+        return get_write_connection()
+    return conn
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Route every read in this context to the primary."""
+    token = _pin_primary.set(True)
+    try:
+        yield
+    finally:
+        _pin_primary.reset(token)
+
+
+def pin_primary() -> object:
+    """Pin reads to the primary until :func:`unpin_primary` is called with the token."""
+    return _pin_primary.set(True)
+
+
+def unpin_primary(token: object) -> None:
+    _pin_primary.reset(token)
+
+
+def primary_pinned() -> bool:
+    """Return True when reads in the current context go to the primary."""
+    return _pin_primary.get()
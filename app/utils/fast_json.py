@@ -0,0 +1,121 @@
+"""JSON encoding helpers: fast encoder selection and tuple-to-JSON rows."""
+from __future__ import annotations
+
+import json
+import operator
+from json.encoder import encode_basestring
+from typing import Any, Callable, Iterable, Sequence, Tuple
+
+try:  # Dependencia opcional: acelera la serialización si está instalada.
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+Column = Tuple[str, int]
+# Filas por lote en el camino orjson: acota los dicts temporales que existen a la vez.
+ROWS_CHUNK = 1024
+
+
+class RawJSON(str):
+    """Already-encoded JSON text that must be embedded verbatim."""
+
+
+def _default(value: Any) -> str:
+    return str(value)
+
+
+def _dumps_base(obj: Any, default: Callable[[Any], Any]) -> str:
+    if _orjson is not None:
+        return _orjson.dumps(obj, default=default, option=_orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def dumps(obj: Any, *, default: Callable[[Any], Any] = _default) -> str:
+    """Serialize ``obj`` embedding any :class:`RawJSON` values without re-encoding."""
+    if isinstance(obj, RawJSON):
+        return str(obj)
+    if isinstance(obj, dict):
+        if not any(isinstance(value, (RawJSON, dict)) for value in obj.values()):
+            return _dumps_base(obj, default)
+        parts = [
+            encode_basestring(str(key)) + ":" + dumps(value, default=default)
+            for key, value in obj.items()
+        ]
+        return "{" + ",".join(parts) + "}"
+    return _dumps_base(obj, default)
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON text with the active backend."""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def _encode_value(value: Any) -> str:
+    if value is None:
+        return "null"
+    kind = type(value)
+    if kind is str:
+        return encode_basestring(value)
+    if kind is int:
+        return int.__repr__(value)
+    if kind is float:
+        if value != value or value in (float("inf"), float("-inf")):
+            return "null"
+        return float.__repr__(value)
+    if kind is bool:
+        return "true" if value else "false"
+    return _dumps_base(value, _default)
+
+
+def _rows_to_json_orjson(rows: Iterable[Sequence[Any]], columns: Sequence[Column]) -> RawJSON:
+    keys = tuple(key for key, _ in columns)
+    indexes = tuple(index for _, index in columns)
+    if indexes == tuple(range(len(indexes))):
+        pick = None  # Columnas en orden: zip recorta la fila sin copiarla.
+    elif len(indexes) == 1:
+        pick = lambda row, index=indexes[0]: (row[index],)  # noqa: E731
+    else:
+        pick = operator.itemgetter(*indexes)
+    parts = []
+    chunk = []
+    for row in rows:
+        chunk.append(dict(zip(keys, row if pick is None else pick(row))))
+        if len(chunk) >= ROWS_CHUNK:
+            parts.append(_orjson.dumps(chunk, default=_default)[1:-1])
+            chunk = []
+    if chunk:
+        parts.append(_orjson.dumps(chunk, default=_default)[1:-1])
+    return RawJSON("[" + b",".join(parts).decode() + "]")
+
+
+def rows_to_json(rows: Iterable[Sequence[Any]], columns: Sequence[Column]) -> RawJSON:
+    """Encode cursor tuples as a JSON array of objects.
+
+    ``columns`` pairs each output key with its position in the row tuple.
+    With orjson the rows are encoded in batches of short-lived dicts, which
+    is several times faster than building the text in Python; otherwise
+    each object is assembled from pre-encoded key prefixes without dicts.
+    """
+    if not columns:
+        return RawJSON("[" + ",".join("{}" for _ in rows) + "]")
+    if _orjson is not None:
+        return _rows_to_json_orjson(rows, columns)
+    prefixes = [
+        ("{" if position == 0 else ",") + encode_basestring(key) + ":"
+        for position, (key, _) in enumerate(columns)
+    ]
+    indexes = [index for _, index in columns]
+    encode = _encode_value
+    chunks = []
+    for row in rows:
+        chunks.append(
+            "".join(prefix + encode(row[index]) for prefix, index in zip(prefixes, indexes)) + "}"
+        )
+    return RawJSON("[" + ",".join(chunks) + "]")
+
+
+def encoder_name() -> str:
+    """Return the name of the active JSON backend."""
+    return "orjson" if _orjson is not None else "json"
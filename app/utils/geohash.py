@@ -0,0 +1,128 @@
+"""Geohash cells: encoding, bounding boxes and circle covers for prefix pre-filters.
+
+A geohash interleaves longitude and latitude bits and writes them in base 32,
+so every prefix of a cell id is the enclosing cell at a coarser precision.
+Stored as a ``COLLATE "C"`` column, the obras inside a cell form one index
+range: ``cell <= geohash < cell || '{'`` (``{`` sorts right after ``z``).
+"""
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: value for value, char in enumerate(BASE32)}
+# Precisión guardada en obras.geohash (~4.8 m × 4.8 m); cualquier prefijo es una celda.
+STORED_PRECISION = 9
+# Cotas inferiores (WGS84) de metros por grado: los cubrimientos nunca se quedan cortos.
+METRES_PER_DEGREE_LAT = 110_574.0
+METRES_PER_DEGREE_LON = 111_319.0
+RANGE_END = "{"
+
+BBox = Tuple[float, float, float, float]  # sur, oeste, norte, este
+
+
+def encode(lat: float, lon: float, precision: int = STORED_PRECISION) -> str:
+    """Return the geohash of ``(lat, lon)`` with ``precision`` characters."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # Los bits pares son de longitud.
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = value * 2 + 1
+                lon_lo = mid
+            else:
+                value *= 2
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = value * 2 + 1
+                lat_lo = mid
+            else:
+                value *= 2
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def bbox(cell: str) -> BBox:
+    """Return ``(south, west, north, east)`` of ``cell``; ValueError if malformed."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in cell:
+        value = _DECODE.get(char)
+        if value is None:
+            raise ValueError(f"Celda geohash inválida: '{cell}'.")
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def center(cell: str) -> Tuple[float, float]:
+    south, west, north, east = bbox(cell)
+    return (south + north) / 2, (west + east) / 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Return the ``(height, width)`` in degrees of cells with ``precision`` characters."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def prefix_range(cell: str) -> Tuple[str, str]:
+    """Half-open ``[low, high)`` range of stored geohashes inside ``cell``."""
+    return cell, cell + RANGE_END
+
+
+def cover(lat: float, lon: float, radius_m: float) -> Tuple[str, ...]:
+    """Return the 3×3 block of cells that contains the circle around ``(lat, lon)``.
+
+    Picks the finest precision whose cells are at least ``radius_m`` tall and
+    wide, so the circle cannot reach beyond the neighbours of the centre
+    cell. Returns an empty tuple when no precision qualifies (huge radii or
+    circles touching a pole); callers then skip the pre-filter.
+    """
+    dlat = radius_m / METRES_PER_DEGREE_LAT
+    reach = abs(lat) + dlat
+    if reach >= 90.0:
+        return ()
+    dlon = radius_m / (METRES_PER_DEGREE_LON * math.cos(math.radians(reach)))
+    precision = 0
+    for candidate in range(STORED_PRECISION, 0, -1):
+        height, width = cell_size(candidate)
+        if height >= dlat and width >= dlon:
+            precision = candidate
+            break
+    if precision == 0:
+        return ()
+
+    height, width = cell_size(precision)
+    south, west, _, _ = bbox(encode(lat, lon, precision))
+    mid_lat, mid_lon = south + height / 2, west + width / 2
+    cells = []
+    for row in (-1, 0, 1):
+        cell_lat = min(max(mid_lat + row * height, -89.999999), 89.999999)
+        for col in (-1, 0, 1):
+            cell_lon = (mid_lon + col * width + 180.0) % 360.0 - 180.0
+            cells.append(encode(cell_lat, cell_lon, precision))
+    return tuple(cells)
@@ -0,0 +1,23 @@
+"""Per-process registry of metric sources exported at ``/api/metrics``."""
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict
+
+MetricSource = Callable[[], Dict[str, Any]]
+
+_sources: Dict[str, MetricSource] = {}
+
+
+def register(name: str, source: MetricSource) -> MetricSource:
+    """Expose ``source()`` under ``name``; re-registering a name replaces it."""
+    _sources[name] = source
+    return source
+
+
+def collect() -> Dict[str, Any]:
+    """Return every registered source's current values for this process."""
+    data: Dict[str, Any] = {"pid": os.getpid()}
+    for name, source in list(_sources.items()):
+        data[name] = source()
+    return data
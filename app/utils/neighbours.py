@@ -0,0 +1,213 @@
+"""k-nearest-neighbour table of located obras, stored as a memory-mapped file."""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.utils.tour import haversine_cross
+
+NEIGHBOURS_MAGIC = b"PMK1"
+FORMAT_VERSION = 1
+# magic | formato | versión del dataset | n obras | k | relleno
+_HEADER = struct.Struct("=4sIQII4x")
+# Filas calculadas a la vez: acota la matriz temporal a BLOCK × n distancias.
+BLOCK = 512
+
+
+class KnnTable(NamedTuple):
+    """Obras sorted by id and, per row, neighbour positions and distances (metres).
+
+    Rows with fewer than ``k`` neighbours are padded with -1 / ``inf``.
+    """
+
+    ids: np.ndarray  # int64[n]
+    lat: np.ndarray  # float64[n]
+    lon: np.ndarray  # float64[n]
+    idx: np.ndarray  # int32[n, k]
+    dist: np.ndarray  # float32[n, k]
+
+    @property
+    def k(self) -> int:
+        return self.idx.shape[1]
+
+
+def compute_rows(
+    lat: np.ndarray, lon: np.ndarray, k: int, rows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``k`` nearest neighbours (positions, metres) of each row in ``rows``."""
+    n = len(lat)
+    idx = np.full((len(rows), k), -1, dtype=np.int32)
+    dist = np.full((len(rows), k), np.inf, dtype=np.float32)
+    take = min(k, n - 1)
+    if take <= 0:
+        return idx, dist
+    for start in range(0, len(rows), BLOCK):
+        block = rows[start : start + BLOCK]
+        matrix = haversine_cross(lat[block], lon[block], lat, lon)
+        matrix[np.arange(len(block)), block] = np.inf  # Una obra no es su propia vecina.
+        if take < n - 1:
+            nearest = np.argpartition(matrix, take - 1, axis=1)[:, :take]
+        else:
+            nearest = np.tile(np.arange(n), (len(block), 1))
+        near_dist = np.take_along_axis(matrix, nearest, axis=1)
+        order = np.argsort(near_dist, axis=1, kind="stable")[:, :take]
+        idx[start : start + len(block), :take] = np.take_along_axis(nearest, order, axis=1)
+        dist[start : start + len(block), :take] = np.take_along_axis(near_dist, order, axis=1)
+    return idx, dist
+
+
+def compute_knn(ids: np.ndarray, lat: np.ndarray, lon: np.ndarray, k: int) -> KnnTable:
+    """Full computation over every obra (``ids`` sorted ascending)."""
+    idx, dist = compute_rows(lat, lon, k, np.arange(len(ids)))
+    return KnnTable(ids, lat, lon, idx, dist)
+
+
+def update_knn(
+    previous: KnnTable, ids: np.ndarray, lat: np.ndarray, lon: np.ndarray
+) -> Tuple[KnnTable, int]:
+    """Carry ``previous`` over to the new coordinates, recomputing only what changed.
+
+    A row is recomputed when its obra is new or moved, when one of its
+    neighbours was removed or moved, or when a new/moved obra now lies closer
+    than its current k-th neighbour. Every other row keeps its neighbours,
+    remapped to the new positions. Returns the table and how many rows were
+    recomputed.
+    """
+    k = previous.k
+    n = len(ids)
+    old_pos = np.searchsorted(previous.ids, ids)
+    old_pos_clipped = np.minimum(old_pos, max(len(previous.ids) - 1, 0))
+    existed = (
+        (old_pos < len(previous.ids)) & (previous.ids[old_pos_clipped] == ids)
+        if len(previous.ids)
+        else np.zeros(n, dtype=bool)
+    )
+    same_place = existed.copy()
+    same_place[existed] = (previous.lat[old_pos[existed]] == lat[existed]) & (
+        previous.lon[old_pos[existed]] == lon[existed]
+    )
+    changed = ~same_place  # Nuevas o movidas, en posiciones nuevas.
+
+    # Posición nueva de cada fila anterior; -1 si se eliminó o se movió.
+    old_to_new = np.full(len(previous.ids) + 1, -1, dtype=np.int64)
+    old_to_new[old_pos[same_place]] = np.flatnonzero(same_place)
+
+    affected = changed.copy()
+    keep = np.flatnonzero(same_place)
+    if len(keep):
+        old_rows = old_pos[keep]
+        neighbours = previous.idx[old_rows]
+        # Vecino eliminado o movido (el relleno -1 apunta a la última casilla, también -1).
+        lost = ((old_to_new[neighbours] < 0) & (neighbours >= 0)).any(axis=1)
+        affected[keep[lost]] = True
+        moved = np.flatnonzero(changed)
+        if len(moved):
+            kth = previous.dist[old_rows, -1].astype(np.float64)
+            closer = np.zeros(len(keep), dtype=bool)
+            for start in range(0, len(moved), BLOCK):
+                block = moved[start : start + BLOCK]
+                matrix = haversine_cross(lat[block], lon[block], lat[keep], lon[keep])
+                closer |= (matrix < kth[None, :]).any(axis=0)
+            affected[keep[closer]] = True
+
+    idx = np.full((n, k), -1, dtype=np.int32)
+    dist = np.full((n, k), np.inf, dtype=np.float32)
+    carried = keep[~affected[keep]] if len(keep) else keep
+    if len(carried):
+        old_rows = old_pos[carried]
+        idx[carried] = old_to_new[previous.idx[old_rows]]
+        dist[carried] = previous.dist[old_rows]
+
+    recompute = np.flatnonzero(affected)
+    if len(recompute):
+        idx[recompute], dist[recompute] = compute_rows(lat, lon, k, recompute)
+    return KnnTable(ids, lat, lon, idx, dist), len(recompute)
+
+
+def write_neighbours(path: Path, dataset_version: int, table: KnnTable) -> Path:
+    """Write the table atomically (temp file + ``os.replace``)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n, k = table.idx.shape
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with tmp_path.open("wb") as handle:
+        handle.write(_HEADER.pack(NEIGHBOURS_MAGIC, FORMAT_VERSION, dataset_version, n, k))
+        handle.write(np.ascontiguousarray(table.ids, dtype=np.int64).tobytes())
+        handle.write(np.ascontiguousarray(table.lat, dtype=np.float64).tobytes())
+        handle.write(np.ascontiguousarray(table.lon, dtype=np.float64).tobytes())
+        handle.write(np.ascontiguousarray(table.idx, dtype=np.int32).tobytes())
+        handle.write(np.ascontiguousarray(table.dist, dtype=np.float32).tobytes())
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_header(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Return ``(dataset_version, n, k)`` or None if unreadable."""
+    try:
+        with Path(path).open("rb") as handle:
+            raw = handle.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    magic, fmt, version, n, k = _HEADER.unpack(raw)
+    if magic != NEIGHBOURS_MAGIC or fmt != FORMAT_VERSION:
+        return None
+    return version, n, k
+
+
+class NeighbourIndex:
+    """Read-only, memory-mapped view of a neighbours file shared by all workers."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, version, n, k = _HEADER.unpack_from(self._mmap, 0)
+        if magic != NEIGHBOURS_MAGIC or fmt != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} no es un archivo de vecinos válido")
+        self.version = version
+        pos = _HEADER.size
+
+        def take(dtype, count: int) -> np.ndarray:
+            nonlocal pos
+            section = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=pos)
+            pos += section.nbytes
+            return section
+
+        ids = take(np.int64, n)
+        lat = take(np.float64, n)
+        lon = take(np.float64, n)
+        idx = take(np.int32, n * k).reshape(n, k)
+        dist = take(np.float32, n * k).reshape(n, k)
+        self.table = KnnTable(ids, lat, lon, idx, dist)
+
+    @property
+    def k(self) -> int:
+        return self.table.k
+
+    def __len__(self) -> int:
+        return len(self.table.ids)
+
+    def position(self, obra_id: int) -> Optional[int]:
+        ids = self.table.ids
+        pos = int(np.searchsorted(ids, obra_id))
+        return pos if pos < len(ids) and ids[pos] == obra_id else None
+
+    def neighbours(self, obra_id: int, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Return ``(id, metres)`` of the nearest obras; KeyError if not located."""
+        pos = self.position(obra_id)
+        if pos is None:
+            raise KeyError(obra_id)
+        row_idx = self.table.idx[pos, :limit]
+        row_dist = self.table.dist[pos, :limit]
+        valid = row_idx >= 0
+        return [(int(self.table.ids[i]), float(d)) for i, d in zip(row_idx[valid], row_dist[valid])]
@@ -0,0 +1,71 @@
+"""Sorted-array prefix index over accent-folded names."""
+from __future__ import annotations
+
+import heapq
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# Mayor que cualquier carácter de un nombre: cierra el rango de un prefijo.
+_HIGH = "\U0010ffff"
+# Prefijos de hasta este largo abarcan rangos grandes; su resultado se memoriza.
+SHORT_PREFIX = 2
+
+
+def fold(text: str) -> str:
+    """Lowercase ``text`` and strip accents (``"Débora"`` -> ``"debora"``)."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class PrefixIndex:
+    """Match prefixes of a name or of any of its words, best weight first.
+
+    Every entry is stored once per suffix of words ("fernando botero" is
+    indexed as "fernando botero" and "botero"), so a lookup is a single
+    ``bisect`` over one sorted list followed by a scan of the matching range.
+    Results for very short prefixes, whose ranges are the widest, are
+    memoized since the index never changes after construction.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, float, Any]]) -> None:
+        self.items: List[Any] = []
+        self.weights: List[float] = []
+        keyed: List[Tuple[str, int]] = []
+        for text, weight, item in entries:
+            position = len(self.items)
+            self.items.append(item)
+            self.weights.append(weight)
+            words = fold(text).split(" ")
+            for start in range(len(words)):
+                key = " ".join(words[start:])
+                if key:
+                    keyed.append((key, position))
+        keyed.sort()
+        self.keys: List[str] = [key for key, _ in keyed]
+        self.positions: List[int] = [position for _, position in keyed]
+        self._short: Dict[Tuple[str, int], List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def search(self, prefix: str, limit: int) -> List[Any]:
+        """Return up to ``limit`` items whose name or a word in it starts with ``prefix``."""
+        folded = fold(prefix)
+        if not folded or limit <= 0:
+            return []
+        if len(folded) <= SHORT_PREFIX:
+            cached = self._short.get((folded, limit))
+            if cached is None:
+                cached = self._short[(folded, limit)] = self._search(folded, limit)
+            return list(cached)
+        return self._search(folded, limit)
+
+    def _search(self, folded: str, limit: int) -> List[Any]:
+        lo = bisect_left(self.keys, folded)
+        hi = bisect_left(self.keys, folded + _HIGH, lo)
+        matches = set(self.positions[lo:hi])
+        weights: Sequence[float] = self.weights
+        best = heapq.nsmallest(limit, matches, key=lambda pos: (-weights[pos], pos))
+        return [self.items[pos] for pos in best]
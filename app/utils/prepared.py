@@ -0,0 +1,86 @@
+"""Server-side prepared statements for repository queries."""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence, Tuple
+
+import psycopg2.extensions
+
+from app import settings
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has prepared."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: "OrderedDict[str, None]" = OrderedDict()
+
+
+_statements: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+_statements_lock = threading.Lock()
+
+
+def statement_for(sql: str) -> Tuple[str, str]:
+    """Return ``(name, PREPARE-ready sql)`` for ``sql``, cached in process.
+
+    The name is derived from the SQL text, so each filter combination keeps
+    the same identity in every worker and on every connection.
+    """
+    with _statements_lock:
+        cached = _statements.get(sql)
+        if cached is not None:
+            _statements.move_to_end(sql)
+            return cached
+
+    name = "pm_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    counter = iter(range(1, sql.count("%s") + 1))
+    converted = _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+    with _statements_lock:
+        _statements[sql] = (name, converted)
+        while len(_statements) > settings.PREPARED_CACHE_SIZE:
+            _statements.popitem(last=False)
+    return name, converted
+
+
+def sql_for(name: str) -> Optional[str]:
+    """Return the SQL prepared as ``name`` if it is still cached (debugging aid)."""
+    with _statements_lock:
+        for sql, (known, _) in _statements.items():
+            if known == name:
+                return sql
+    return None
+
+
+def execute(cur, sql: str, params: Sequence[Any]) -> None:
+    """Run ``sql`` as a prepared statement when the connection supports it.
+
+    Connections created without :class:`PreparingConnection` (or with
+    ``PREPARED_STATEMENTS`` disabled) run the plain statement.
+    """
+    prepared = getattr(cur.connection, "prepared_statements", None)
+    if prepared is None or not settings.PREPARED_STATEMENTS:
+        cur.execute(sql, params)
+        return
+
+    name, converted = statement_for(sql)
+    if name in prepared:
+        prepared.move_to_end(name)
+    else:
+        cur.execute(f"PREPARE {name} AS {converted}")
+        prepared[name] = None
+        while len(prepared) > settings.PREPARED_CACHE_SIZE:
+            oldest, _ = prepared.popitem(last=False)
+            cur.execute(f"DEALLOCATE {oldest}")
+
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name} ({placeholders})", list(params))
+    else:
+        cur.execute(f"EXECUTE {name}")
@@ -0,0 +1,148 @@
+"""Slow-query log with automatic EXPLAIN capture for repository statements."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from app import settings
+from app.utils import prepared, query_stats
+
+DEEP_OFFSET = 1000
+
+_EXPLAIN_PREFIX = {
+    "analyze": "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ",
+    "plain": "EXPLAIN (FORMAT JSON) ",
+}
+
+_logger = logging.getLogger("app.slow_queries")
+_logger.propagate = False
+_handler_lock = threading.Lock()
+_handler_path: Optional[str] = None
+
+
+def query_shape(filters: Mapping[str, Any], offset: int) -> str:
+    """Return a stable label for the active filter combination and offset depth."""
+    active = sorted(name for name, value in filters.items() if value not in (None, ""))
+    if offset >= DEEP_OFFSET:
+        active.append("offset:deep")
+    elif offset > 0:
+        active.append("offset")
+    return "+".join(active) or "sin_filtros"
+
+
+def redact_params(params: Optional[Sequence[Any]], mode: Optional[str] = None) -> List[Any]:
+    """Return parameters masked according to ``SLOW_QUERY_REDACT``."""
+    mode = (mode or settings.SLOW_QUERY_REDACT or "strings").lower()
+    values = list(params or [])
+    if mode == "none":
+        return values
+    if mode == "all":
+        return [f"<{type(value).__name__}>" for value in values]
+    return ["<str>" if isinstance(value, str) else value for value in values]
+
+
+def _get_logger() -> logging.Logger:
+    global _handler_path
+    path = settings.SLOW_QUERY_LOG_PATH
+    with _handler_lock:
+        if _handler_path != path:
+            for handler in list(_logger.handlers):
+                _logger.removeHandler(handler)
+                handler.close()
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+            _handler_path = path
+    return _logger
+
+
+def _explain(conn, sql: str, params: Sequence[Any]) -> Optional[Any]:
+    prefix = _EXPLAIN_PREFIX.get((settings.SLOW_QUERY_EXPLAIN or "").lower())
+    if prefix is None:
+        return None
+
+    # Un error en EXPLAIN no debe abortar la transacción de la consulta original.
+    use_savepoint = not getattr(conn, "autocommit", False)
+    # El plan es diagnóstico: no cuenta en presupuestos ni en X-Query-Statements.
+    with query_stats.paused(), conn.cursor() as cur:
+        if use_savepoint:
+            cur.execute("SAVEPOINT slow_query_explain")
+        try:
+            cur.execute(prefix + sql, params)
+            row = cur.fetchone()
+        except Exception:
+            if use_savepoint:
+                cur.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        if use_savepoint:
+            cur.execute("RELEASE SAVEPOINT slow_query_explain")
+    return row[0] if row else None
+
+
+def _capture(
+    cur,
+    sql: str,
+    params: Sequence[Any],
+    *,
+    source: str,
+    statement: str,
+    shape: str,
+    elapsed_ms: float,
+) -> None:
+    entry: Dict[str, Any] = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "source": source,
+        "statement": statement,
+        "shape": shape,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "sql": sql,
+        "params": redact_params(params),
+    }
+    try:
+        entry["plan"] = _explain(cur.connection, sql, params)
+    except Exception as exc:
+        entry["plan_error"] = str(exc)
+    _get_logger().info(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+def timed_execute(
+    cur,
+    sql: str,
+    params: Sequence[Any],
+    *,
+    source: str,
+    statement: str,
+    shape: str,
+) -> None:
+    """Execute ``sql`` on ``cur`` (prepared when possible) and log it when slow."""
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold is None:
+        prepared.execute(cur, sql, params)
+        return
+
+    started = time.perf_counter()
+    prepared.execute(cur, sql, params)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms >= threshold:
+        _capture(
+            cur,
+            sql,
+            params,
+            source=source,
+            statement=statement,
+            shape=shape,
+            elapsed_ms=elapsed_ms,
+        )
@@ -0,0 +1,220 @@
+"""Per-scope accounting of connections, statements and rows, with budgets for tests.
+
+Connections handed out by :mod:`app.utils.database` while a scope is open
+(``track()``/``budget()`` or a request under ``QUERY_DEBUG``) are wrapped so
+their cursors report each statement and fetched row to every open scope.
+Outside a scope connections are returned untouched.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.utils import prepared
+
+# Trabajo interno de las sentencias preparadas y sus savepoints, no consultas propias.
+# El EXPLAIN del log lento corre dentro de paused() y tampoco cuenta.
+_IGNORED_PREFIXES = (
+    "PREPARE ",
+    "DEALLOCATE ",
+    "SAVEPOINT ",
+    "RELEASE SAVEPOINT ",
+    "ROLLBACK TO SAVEPOINT ",
+)
+
+Statement = Tuple[str, Tuple[Any, ...]]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A tracked scope used more connections, statements or rows than allowed."""
+
+
+class QueryStats:
+    """Counters for one tracked scope; ``statements`` keeps ``(sql, params)`` in order."""
+
+    def __init__(self, label: str = "") -> None:
+        self.label = label
+        self.connections = 0
+        self.rows = 0
+        self.statements: List[Statement] = []
+        self._token: Optional[Token] = None
+
+    def repeated(self) -> Dict[Statement, int]:
+        """Statements run more than once with the same parameters (N+1 suspects)."""
+        return {key: count for key, count in Counter(self.statements).items() if count > 1}
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "connections": self.connections,
+            "statements": len(self.statements),
+            "rows": self.rows,
+        }
+
+    def describe(self) -> str:
+        lines = [
+            f"{self.label or 'consulta'}: {self.connections} conexiones, "
+            f"{len(self.statements)} sentencias, {self.rows} filas"
+        ]
+        lines.extend(f"  {display_sql(sql)}" for sql, _ in self.statements)
+        return "\n".join(lines)
+
+
+_scopes: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+def begin(label: str = "") -> QueryStats:
+    """Open a scope in the current context; close it with :func:`end`."""
+    stats = QueryStats(label)
+    stats._token = _scopes.set(_scopes.get() + (stats,))
+    return stats
+
+
+def end(stats: QueryStats) -> None:
+    if stats._token is not None:
+        _scopes.reset(stats._token)
+        stats._token = None
+
+
+@contextmanager
+def track(label: str = "") -> Iterator[QueryStats]:
+    """Count the database work done inside the ``with`` block."""
+    stats = begin(label)
+    try:
+        yield stats
+    finally:
+        end(stats)
+
+
+@contextmanager
+def paused() -> Iterator[None]:
+    """Hide the work done inside the block from every open scope (internal queries)."""
+    token = _scopes.set(())
+    try:
+        yield
+    finally:
+        _scopes.reset(token)
+
+
+@contextmanager
+def budget(
+    *,
+    connections: Optional[int] = None,
+    statements: Optional[int] = None,
+    rows: Optional[int] = None,
+    allow_repeats: bool = False,
+    label: str = "",
+) -> Iterator[QueryStats]:
+    """Like :func:`track`, raising QueryBudgetExceeded when a limit is passed.
+
+    Identical statements (same SQL and parameters) run twice also fail the
+    budget unless ``allow_repeats``: that is how N+1 loops show up.
+    """
+    with track(label) as stats:
+        yield stats
+    limits = {"connections": connections, "statements": statements, "rows": rows}
+    used = stats.as_dict()
+    problems = [
+        f"{name}: {used[name]} > {limit}"
+        for name, limit in limits.items()
+        if limit is not None and used[name] > limit
+    ]
+    if not allow_repeats:
+        problems.extend(
+            f"repetida {count} veces: {display_sql(sql)}"
+            for (sql, _), count in stats.repeated().items()
+        )
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems) + "\n" + stats.describe())
+
+
+def display_sql(sql: str) -> str:
+    """Show the original SQL behind ``EXECUTE pm_...`` when it is still known."""
+    if sql.startswith("EXECUTE "):
+        name = sql[len("EXECUTE ") :].split(" ", 1)[0]
+        return prepared.sql_for(name) or sql
+    return sql
+
+
+def _freeze(params: Any) -> Tuple[Any, ...]:
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(tuple(value) if isinstance(value, list) else value for value in params)
+
+
+class TrackedCursor:
+    """Cursor proxy reporting statements and fetched rows to the open scopes."""
+
+    def __init__(self, cursor) -> None:
+        self._cursor = cursor
+
+    def __enter__(self) -> "TrackedCursor":
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._cursor.__exit__(exc_type, exc, tb)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            _add_rows(1)
+            yield row
+
+    def execute(self, sql, params: Optional[Sequence[Any]] = None):
+        # execute_values envía bytes ya compuestos.
+        text = sql.decode("utf-8", "replace") if isinstance(sql, bytes) else str(sql)
+        if not text.startswith(_IGNORED_PREFIXES):
+            key = (text, _freeze(params))
+            for stats in _scopes.get():
+                stats.statements.append(key)
+        return self._cursor.execute(sql, params)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            _add_rows(1)
+        return row
+
+    def fetchmany(self, *args: Any, **kwargs: Any):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        _add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        _add_rows(len(rows))
+        return rows
+
+
+class TrackedConnection:
+    """Connection proxy whose cursors are :class:`TrackedCursor`."""
+
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    def cursor(self, *args: Any, **kwargs: Any) -> TrackedCursor:
+        return TrackedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+def _add_rows(count: int) -> None:
+    for stats in _scopes.get():
+        stats.rows += count
+
+
+def wrap_connection(conn):
+    """Count ``conn`` in the open scopes and return it tracked (unchanged if none)."""
+    scopes = _scopes.get()
+    if not scopes:
+        return conn
+    for stats in scopes:
+        stats.connections += 1
+    return TrackedConnection(conn)
@@ -0,0 +1,119 @@
+"""Incremental readers for request bodies holding many JSON records.
+
+Both a JSON array and NDJSON (one object per line) are decoded while the body
+is read, one record at a time, so a large upload is never held in memory as
+a single document.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+NDJSON_TYPES = frozenset(
+    {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+)
+_WHITESPACE = " \t\r\n"
+
+
+def iter_records(stream: BinaryIO, content_type: Optional[str]) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(index, value)`` for each record; ValueError on malformed input."""
+    if (content_type or "").lower() in NDJSON_TYPES:
+        return iter_ndjson(stream)
+    return iter_json_array(_text_chunks(stream))
+
+
+def _text_chunks(stream: BinaryIO, size: int = CHUNK_SIZE) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while True:
+            data = stream.read(size)
+            text = decoder.decode(data or b"", final=not data)
+            if text:
+                yield text
+            if not data:
+                return
+    except UnicodeDecodeError as exc:
+        raise ValueError("El cuerpo no es UTF-8 válido.") from exc
+
+
+def iter_ndjson(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    index = 0
+    for number, line in enumerate(iter(stream.readline, b""), start=1):
+        try:
+            text = line.decode("utf-8").strip()
+        except UnicodeDecodeError as exc:
+            raise ValueError(f"La línea {number} no es UTF-8 válido.") from exc
+        if not text:
+            continue
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"JSON inválido en la línea {number}: {exc.msg}.") from exc
+        yield index, value
+        index += 1
+
+
+def iter_json_array(chunks: Iterator[str]) -> Iterator[Tuple[int, Any]]:
+    """Decode the elements of a top-level JSON array spread over text ``chunks``."""
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+
+    def more() -> bool:
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def peek() -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not more():
+                return None
+
+    if peek() != "[":
+        raise ValueError("El cuerpo debe ser un arreglo JSON o NDJSON.")
+    pos += 1
+    index = 0
+    if peek() == "]":
+        pos += 1
+    else:
+        while True:
+            if peek() is None:
+                raise ValueError("El arreglo JSON está incompleto.")
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as exc:
+                    # El registro puede seguir en el siguiente bloque.
+                    if more():
+                        continue
+                    raise ValueError(f"JSON inválido en el registro {index}: {exc.msg}.") from exc
+                # Un número al final del bloque podría estar cortado ("12" de "123").
+                if end == len(buffer) and more():
+                    continue
+                break
+            pos = end
+            yield index, value
+            index += 1
+            separator = peek()
+            if separator is None:
+                raise ValueError("El arreglo JSON está incompleto.")
+            if separator == ",":
+                pos += 1
+                continue
+            if separator == "]":
+                pos += 1
+                break
+            raise ValueError(f"Se esperaba ',' o ']' después del registro {index - 1}.")
+    if peek() is not None:
+        raise ValueError("Hay datos después del arreglo JSON.")
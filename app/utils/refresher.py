@@ -0,0 +1,159 @@
+"""Stale-while-revalidate holder refreshed by a background thread."""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundRefresher(Generic[T]):
+    """Keep the result of ``load()`` in memory and refresh it off the request path.
+
+    ``get()`` returns the held value immediately and, when ``peek()`` (the
+    version already known to the process, read without I/O) moved on, asks
+    the background thread to refresh it. The thread also refreshes every
+    ``interval`` seconds with ``±jitter`` (a fraction of the interval) so
+    workers do not refresh in lockstep, and every ``check_interval`` seconds
+    asks ``version()``, which may query the database, whether the data
+    changed. Only the first load, or a value older than ``max_stale``
+    seconds, is loaded on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[], T],
+        *,
+        version: Callable[[], int],
+        peek: Optional[Callable[[], Optional[int]]] = None,
+        interval: float,
+        jitter: float,
+        max_stale: float,
+        check_interval: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self._load = load
+        self._version_of = version
+        self._peek = peek or version
+        self.check_interval = check_interval
+        self.interval = interval
+        self.jitter = jitter
+        self.max_stale = max_stale
+
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self.counters: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "blocking_loads": 0,
+            "refreshes": 0,
+            "failures": 0,
+        }
+
+    def get(self) -> T:
+        self._ensure_thread()
+        value = self._value
+        if value is None or time.monotonic() - self._loaded_at > self.max_stale:
+            self.counters["blocking_loads"] += 1
+            return self.refresh()
+        # Sin I/O: una base lenta no debe sumar latencia a la petición.
+        known = self._peek()
+        if known is not None and self._version != known:
+            self.counters["stale_hits"] += 1
+            self._wake.set()
+        else:
+            self.counters["hits"] += 1
+        return value
+
+    def refresh(self) -> T:
+        """Load now on this thread (one refresh at a time) and return the new value."""
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            if self._value is not None and self._loaded_at >= requested_at:
+                return self._value  # Otro hilo terminó la recarga mientras se esperaba.
+            version = self._version_of()
+            value = self._load()
+            self._value, self._version = value, version
+            self._loaded_at = time.monotonic()
+            self.counters["refreshes"] += 1
+            return value
+
+    def _next_delay(self) -> float:
+        spread = self.interval * self.jitter
+        return max(0.0, self.interval + random.uniform(-spread, spread))
+
+    def _run(self) -> None:
+        due = time.monotonic() + self._next_delay()
+        while not self._stop.is_set():
+            timeout = due - time.monotonic()
+            if self.check_interval:
+                timeout = min(timeout, self.check_interval)
+            if self._wake.wait(max(0.0, timeout)):
+                self._wake.clear()
+                # Tras un cambio de versión, cada worker espera un poco distinto.
+                if self._stop.wait(random.uniform(0, min(5.0, self.interval * self.jitter))):
+                    return
+            elif time.monotonic() < due and not self._version_changed():
+                continue
+            if self._stop.is_set():
+                return
+            try:
+                self.refresh()
+            except Exception:
+                self.counters["failures"] += 1
+                logger.warning(
+                    "No fue posible refrescar %s; se sirve la copia anterior",
+                    self.name,
+                    exc_info=True,
+                )
+            due = time.monotonic() + self._next_delay()
+
+    def _version_changed(self) -> bool:
+        try:
+            return self._version_of() != self._version
+        except Exception:
+            logger.warning("No fue posible leer la versión de %s", self.name, exc_info=True)
+            return False
+
+    def _ensure_thread(self) -> None:
+        # Los hilos no sobreviven a un fork: cada worker arranca el suyo.
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name=f"refresh-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def trigger(self) -> None:
+        """Ask the background thread to refresh soon (e.g. on a version notification)."""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self) -> Dict[str, object]:
+        age = time.monotonic() - self._loaded_at if self._value is not None else None
+        return {
+            **self.counters,
+            "version": self._version,
+            "age_seconds": None if age is None else round(age, 3),
+        }
@@ -0,0 +1,84 @@
+"""Coalesce identical concurrent calls into one execution (per process)."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from app import settings
+from app.utils import metrics
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run ``fn`` once per key while a call for that key is in flight.
+
+    Threads arriving while the first call runs wait for it and receive the
+    same result (or exception). Nothing is cached: once the call finishes,
+    the next request for the key executes again.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        _groups.append(self)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+_groups: List[SingleFlight] = []
+
+
+def _stats() -> Dict[str, Dict[str, int]]:
+    return {group.name: group.stats() for group in _groups}
+
+
+metrics.register("coalescing", _stats)
@@ -0,0 +1,154 @@
+"""Read-only, memory-mapped snapshot file of obras and autores rows."""
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Iterator, List, Sequence, Tuple
+
+from app.models.autor import Autor
+from app.models.obra import Obra
+from app.utils import fast_json
+
+SNAPSHOT_MAGIC = b"PMS1"
+FORMAT_VERSION = 1
+# magic | formato | versión del dataset | n obras | n autores | relleno
+# Orden de bytes nativo: el archivo solo se comparte entre procesos del mismo host.
+_HEADER = struct.Struct("=4sIQII4x")
+
+
+def write_snapshot(
+    path: Path,
+    dataset_version: int,
+    obras: Sequence[Sequence[Any]],
+    autores: Sequence[Sequence[Any]],
+    *,
+    id_index: int = 0,
+    lat_index: int = 10,
+    lon_index: int = 11,
+) -> Path:
+    """Write a snapshot atomically (temp file + ``os.replace``).
+
+    Layout: header, then ``float64`` lat/lon and ``int64`` id columns for the
+    obras, ``uint64`` offsets for obras and autores records, and finally a
+    blob with each row encoded as a compact JSON array.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    nan = math.nan
+    lat = array("d", (nan if row[lat_index] is None else row[lat_index] for row in obras))
+    lon = array("d", (nan if row[lon_index] is None else row[lon_index] for row in obras))
+    ids = array("q", (row[id_index] for row in obras))
+
+    blob: List[bytes] = []
+    offsets = array("Q", [0])
+    for row in [*obras, *autores]:
+        encoded = json.dumps(
+            list(row), ensure_ascii=False, separators=(",", ":"), default=str
+        ).encode()
+        blob.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with tmp_path.open("wb") as handle:
+        handle.write(
+            _HEADER.pack(
+                SNAPSHOT_MAGIC, FORMAT_VERSION, dataset_version, len(obras), len(autores)
+            )
+        )
+        for section in (lat, lon, ids, offsets):
+            handle.write(section.tobytes())
+        handle.writelines(blob)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_header(path: Path) -> Tuple[int, int, int] | None:
+    """Return ``(dataset_version, n_obras, n_autores)`` or None if unreadable."""
+    try:
+        with Path(path).open("rb") as handle:
+            raw = handle.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    magic, fmt, version, n_obras, n_autores = _HEADER.unpack(raw)
+    if magic != SNAPSHOT_MAGIC or fmt != FORMAT_VERSION:
+        return None
+    return version, n_obras, n_autores
+
+
+class Snapshot:
+    """Memory-mapped view over a snapshot file.
+
+    The mapping is shared through the OS page cache, so every worker reading
+    the same file adds no private copy of the dataset; rows are decoded only
+    when accessed.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, version, n_obras, n_autores = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or fmt != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} no es un snapshot válido")
+
+        self.version = version
+        self.obras_count = n_obras
+        self.autores_count = n_autores
+
+        view = memoryview(self._mmap)
+        pos = _HEADER.size
+        self._views = [view]
+
+        def take(typecode: str, count: int, size: int) -> memoryview:
+            nonlocal pos
+            section = view[pos : pos + count * size].cast(typecode)
+            pos += count * size
+            self._views.append(section)
+            return section
+
+        self.lat = take("d", n_obras, 8)
+        self.lon = take("d", n_obras, 8)
+        self.ids = take("q", n_obras, 8)
+        self._offsets = take("Q", n_obras + n_autores + 1, 8)
+        self._blob_start = pos
+
+    def _record(self, index: int) -> Any:
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return fast_json.loads(self._mmap[start:end])
+
+    def obra(self, index: int) -> Obra:
+        return Obra._make(self._record(index))
+
+    def autor(self, index: int) -> Autor:
+        return Autor._make(self._record(self.obras_count + index))
+
+    def obras(self) -> Iterator[Obra]:
+        for index in range(self.obras_count):
+            yield self.obra(index)
+
+    def autores(self) -> Iterator[Autor]:
+        for index in range(self.autores_count):
+            yield self.autor(index)
+
+    def located_indexes(self) -> List[int]:
+        """Return positions of obras with coordinates (reads only the lat/lon columns)."""
+        lat, lon = self.lat, self.lon
+        return [i for i in range(self.obras_count) if lat[i] == lat[i] and lon[i] == lon[i]]
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
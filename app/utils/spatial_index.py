@@ -0,0 +1,135 @@
+"""In-memory grid index over point coordinates: radius, bbox and k-nearest queries.
+
+Points are bucketed into square cells of ``cell_deg`` degrees and stored
+sorted by cell key (``row * columns + column``), so the cells of one grid row
+that overlap a query form a single contiguous slice found with two binary
+searches. Candidates are then refined exactly: haversine distance for
+radius and k-nearest queries, coordinate comparison for boxes.
+"""
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from app.utils.tour import EARTH_RADIUS_M
+
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_to(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in metres from one point to many."""
+    phi = math.radians(lat)
+    phis = np.radians(lats)
+    a = (
+        np.sin((phis - phi) / 2) ** 2
+        + math.cos(phi) * np.cos(phis) * np.sin(np.radians(lons - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """Static index over ``(lat, lon)`` arrays; results are positions into them.
+
+    Points with NaN coordinates are skipped. Positions returned by
+    :meth:`within_radius` and :meth:`within_bbox` are ascending, so they keep
+    the order of the source rows.
+    """
+
+    def __init__(self, lat: Iterable[float], lon: Iterable[float], *, cell_deg: float = 0.01):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        located = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        self.cell_deg = float(cell_deg)
+        self._columns = int(math.ceil(360.0 / self.cell_deg)) + 1
+        self._rows = int(math.ceil(180.0 / self.cell_deg)) + 1
+        keys = self._key(self._row(lat[located]), self._column(lon[located]))
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._positions = located[order]
+        self._lat = lat[self._positions]
+        self._lon = lon[self._positions]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90.0) / self.cell_deg), 0, self._rows - 1)
+
+    def _column(self, lon):
+        return np.clip(np.floor((np.asarray(lon) + 180.0) / self.cell_deg), 0, self._columns - 1)
+
+    def _key(self, row, column) -> np.ndarray:
+        return np.asarray(row, dtype=np.int64) * self._columns + np.asarray(column, dtype=np.int64)
+
+    def _candidates(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Slots (into the sorted arrays) of every cell overlapping the box."""
+        if west > east:  # Cruza el antimeridiano: dos franjas.
+            return np.concatenate(
+                (
+                    self._candidates(south, west, north, 180.0),
+                    self._candidates(south, -180.0, north, east),
+                )
+            )
+        row_lo, row_hi = int(self._row(south)), int(self._row(north))
+        col_lo, col_hi = int(self._column(west)), int(self._column(east))
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        starts = np.searchsorted(self._keys, rows * self._columns + col_lo, side="left")
+        ends = np.searchsorted(self._keys, rows * self._columns + col_hi, side="right")
+        slices: List[np.ndarray] = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _radius_box(
+        self, lat: float, lon: float, radius_m: float
+    ) -> Tuple[float, float, float, float]:
+        dlat = radius_m / METRES_PER_DEGREE
+        south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        reach = max(abs(south), abs(north))
+        if reach >= 90.0 or radius_m >= math.pi * EARTH_RADIUS_M / 2:
+            return south, -180.0, north, 180.0
+        dlon = radius_m / (METRES_PER_DEGREE * math.cos(math.radians(reach)))
+        if dlon >= 180.0:
+            return south, -180.0, north, 180.0
+        west = (lon - dlon + 180.0) % 360.0 - 180.0
+        east = (lon + dlon + 180.0) % 360.0 - 180.0
+        return south, west, north, east
+
+    def within_radius(
+        self, lat: float, lon: float, radius_m: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(positions, metres)`` of the points within ``radius_m``, by position."""
+        slots = self._candidates(*self._radius_box(lat, lon, radius_m))
+        distances = haversine_to(lat, lon, self._lat[slots], self._lon[slots])
+        inside = distances <= radius_m
+        positions, distances = self._positions[slots[inside]], distances[inside]
+        order = np.argsort(positions, kind="stable")
+        return positions[order], distances[order]
+
+    def within_bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Return ascending positions inside the box (``west > east`` wraps the antimeridian)."""
+        slots = self._candidates(south, west, north, east)
+        lat, lon = self._lat[slots], self._lon[slots]
+        inside = (lat >= south) & (lat <= north)
+        if west <= east:
+            inside &= (lon >= west) & (lon <= east)
+        else:
+            inside &= (lon >= west) | (lon <= east)
+        return np.sort(self._positions[slots[inside]])
+
+    def nearest(self, lat: float, lon: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(positions, metres)`` of the ``k`` nearest points, nearest first.
+
+        The search radius starts at one cell and doubles until it holds ``k``
+        points; every point inside it has been measured, so the answer is exact.
+        """
+        if k <= 0 or not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius = self.cell_deg * METRES_PER_DEGREE
+        while True:
+            positions, distances = self.within_radius(lat, lon, radius)
+            if len(positions) >= k or radius >= math.pi * EARTH_RADIUS_M:
+                break
+            radius *= 2
+        order = np.lexsort((positions, distances))[:k]
+        return positions[order], distances[order]
@@ -0,0 +1,161 @@
+"""Walking-tour ordering: haversine distance matrix plus 2-opt/Or-opt local search.
+
+Node 0 is always the start. Open tours end wherever is cheapest; closed
+tours return to the start. Both are handled by appending a terminal node to
+the order: the start itself for closed tours, or a dummy node at distance 0
+from everything for open ones, so every move only looks at real edges.
+"""
+from __future__ import annotations
+
+import time
+from typing import List, NamedTuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+# Mejoras menores (metros) se ignoran para no ciclar por errores de redondeo.
+EPSILON = 1e-6
+OR_OPT_SEGMENTS = (1, 2, 3)
+
+
+class Tour(NamedTuple):
+    order: List[int]
+    distance: float
+    initial_distance: float
+    converged: bool
+
+
+def haversine_cross(
+    lat_a: np.ndarray, lon_a: np.ndarray, lat_b: np.ndarray, lon_b: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances in metres from every point ``a`` to every point ``b``."""
+    phi_a = np.radians(np.asarray(lat_a, dtype=np.float64))[:, None]
+    phi_b = np.radians(np.asarray(lat_b, dtype=np.float64))[None, :]
+    dlam = (
+        np.radians(np.asarray(lon_a, dtype=np.float64))[:, None]
+        - np.radians(np.asarray(lon_b, dtype=np.float64))[None, :]
+    )
+    a = np.sin((phi_a - phi_b) / 2) ** 2 + np.cos(phi_a) * np.cos(phi_b) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances in metres (``float64``, ``n × n``)."""
+    return haversine_cross(lat, lon, lat, lon)
+
+
+def _with_terminal(dist: np.ndarray, closed: bool) -> tuple[np.ndarray, int]:
+    if closed:
+        return dist, 0
+    n = dist.shape[0]
+    extended = np.zeros((n + 1, n + 1), dtype=dist.dtype)
+    extended[:n, :n] = dist
+    return extended, n
+
+
+def path_length(order: np.ndarray, dist: np.ndarray) -> float:
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(dist: np.ndarray) -> np.ndarray:
+    """Greedy order starting at node 0."""
+    n = dist.shape[0]
+    order = np.empty(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    current = 0
+    for position in range(n):
+        order[position] = current
+        visited[current] = True
+        if position == n - 1:
+            break
+        row = np.where(visited, np.inf, dist[current])
+        current = int(row.argmin())
+    return order
+
+
+def _two_opt_pass(path: np.ndarray, dist: np.ndarray, deadline: float) -> bool:
+    """Apply improving segment reversals; ``path`` ends with the terminal node."""
+    improved = False
+    last = len(path) - 1  # Posición del nodo terminal.
+    for i in range(1, last - 1):
+        if time.monotonic() > deadline:
+            return improved
+        a, b = path[i - 1], path[i]
+        js = np.arange(i + 1, last)
+        c, d = path[js], path[js + 1]
+        delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        best = int(delta.argmin())
+        if delta[best] < -EPSILON:
+            j = int(js[best])
+            path[i : j + 1] = path[i : j + 1][::-1]
+            improved = True
+    return improved
+
+
+def _or_opt_pass(path: np.ndarray, dist: np.ndarray, deadline: float) -> np.ndarray:
+    """Move segments of 1–3 stops (optionally reversed) to their best position."""
+    for length in OR_OPT_SEGMENTS:
+        i = 1
+        while i + length < len(path):
+            if time.monotonic() > deadline:
+                return path
+            segment = path[i : i + length]
+            first, last = segment[0], segment[-1]
+            prev, nxt = path[i - 1], path[i + length]
+            removal = dist[prev, first] + dist[last, nxt] - dist[prev, nxt]
+
+            rest = np.concatenate((path[:i], path[i + length :]))
+            u, v = rest[:-1], rest[1:]
+            forward = dist[u, first] + dist[last, v] - dist[u, v]
+            backward = dist[u, last] + dist[first, v] - dist[u, v]
+            # El hueco original no cuenta como movimiento.
+            forward[i - 1] = backward[i - 1] = np.inf
+            k_fwd, k_bwd = int(forward.argmin()), int(backward.argmin())
+            reverse = backward[k_bwd] < forward[k_fwd]
+            k = k_bwd if reverse else k_fwd
+            gain = removal - (backward[k] if reverse else forward[k])
+            if gain > EPSILON:
+                moved = segment[::-1] if reverse else segment
+                path = np.concatenate((rest[: k + 1], moved, rest[k + 1 :]))
+            else:
+                i += 1
+    return path
+
+
+def solve(dist: np.ndarray, *, closed: bool = False, time_budget: float = 0.5) -> Tour:
+    """Order the nodes of ``dist`` starting at node 0 within ``time_budget`` seconds.
+
+    Nearest-neighbour construction is improved by alternating 2-opt and
+    Or-opt passes until neither finds a move or the budget runs out
+    (``converged`` tells which).
+    """
+    n = dist.shape[0]
+    if n <= 2:
+        order = np.arange(n)
+        path = np.append(order, 0) if closed and n > 1 else order
+        length = path_length(path, dist) if n > 1 else 0.0
+        return Tour(order.tolist(), length, length, True)
+
+    deadline = time.monotonic() + time_budget
+    matrix, terminal = _with_terminal(dist, closed)
+    path = np.append(nearest_neighbour(dist), terminal)
+    initial = path_length(path, matrix)
+
+    converged = False
+    while time.monotonic() <= deadline:
+        before = path_length(path, matrix)
+        _two_opt_pass(path, matrix, deadline)
+        path = _or_opt_pass(path, matrix, deadline)
+        if path_length(path, matrix) >= before - EPSILON:
+            converged = time.monotonic() <= deadline
+            break
+
+    return Tour(path[:-1].tolist(), path_length(path, matrix), initial, converged)
+
+
+def leg_distances(order: List[int], dist: np.ndarray, closed: bool = False) -> List[float]:
+    """Distance walked to reach each stop of ``order`` (0 for the start)."""
+    legs = [0.0] + [float(dist[a, b]) for a, b in zip(order, order[1:])]
+    if closed and len(order) > 1:
+        legs.append(float(dist[order[-1], order[0]]))
+    return legs
@@ -0,0 +1,142 @@
+"""Per-worker admission control: bounded concurrency, priorities and fast 503s."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Flask, Response, g, jsonify, request
+
+from app import settings
+from app.utils import metrics
+
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+PRIORITIES = (HIGH, NORMAL, LOW)
+
+# Endpoints JSON baratos primero; el volcado geográfico y las rutas son los más pesados.
+ROUTE_PRIORITIES: Dict[str, str] = {
+    "obras.obras_collection": HIGH,
+    "obras.obras_suggest": HIGH,
+    "autores.autores_collection": HIGH,
+    "autores.autores_detail": HIGH,
+    "autores.autores_suggest": HIGH,
+    "mapa.obras_geo": LOW,
+    "rutas.rutas_collection": LOW,
+    "obras.obras_bulk": LOW,
+    "autores.autores_bulk": LOW,
+}
+EXEMPT_ENDPOINTS = {"static", "assets", "metrics.metrics"}
+
+
+class AdmissionController:
+    """Counting limiter where lower priorities may only use part of the slots.
+
+    ``high`` can use every slot, ``normal`` leaves ``ADMISSION_RESERVED_HIGH``
+    free and ``low`` is capped at ``ADMISSION_LOW_SHARE`` of the total. Waiters
+    give up after ``timeout`` seconds, and nobody queues once
+    ``ADMISSION_MAX_QUEUE`` requests are already waiting.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = {priority: 0 for priority in PRIORITIES}
+        self.shed = {priority: 0 for priority in PRIORITIES}
+        self.shed_reasons = {"queue_full": 0, "timeout": 0}
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    @staticmethod
+    def capacity(priority: str) -> int:
+        limit = max(1, settings.ADMISSION_MAX_CONCURRENT)
+        if priority == HIGH:
+            return limit
+        if priority == LOW:
+            return max(1, int(limit * settings.ADMISSION_LOW_SHARE))
+        return max(1, limit - settings.ADMISSION_RESERVED_HIGH)
+
+    def acquire(self, priority: str, timeout: Optional[float] = None) -> bool:
+        """Take a slot for ``priority``; False means the request should be shed."""
+        if timeout is None:
+            timeout = settings.ADMISSION_QUEUE_TIMEOUT
+        cap = self.capacity(priority)
+        started = time.monotonic()
+        with self._cond:
+            if self.in_flight >= cap:
+                if timeout <= 0 or self.waiting >= settings.ADMISSION_MAX_QUEUE:
+                    return self._reject(priority, "queue_full")
+                deadline = started + timeout
+                self.waiting += 1
+                try:
+                    while self.in_flight >= cap:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return self._reject(priority, "timeout")
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            waited_ms = (time.monotonic() - started) * 1000
+            self.wait_ms_total += waited_ms
+            self.wait_ms_max = max(self.wait_ms_max, waited_ms)
+            return True
+
+    def _reject(self, priority: str, reason: str) -> bool:
+        self.shed[priority] += 1
+        self.shed_reasons[reason] += 1
+        return False
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            # Las capacidades difieren por prioridad: se despierta a todos.
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            admitted = sum(self.admitted.values())
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "limit": settings.ADMISSION_MAX_CONCURRENT,
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+                "shed_reasons": dict(self.shed_reasons),
+                "wait_ms_avg": round(self.wait_ms_total / admitted, 3) if admitted else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+            }
+
+
+controller = AdmissionController()
+metrics.register("admission", controller.stats)
+
+
+def route_priority(endpoint: Optional[str]) -> str:
+    return ROUTE_PRIORITIES.get(endpoint or "", NORMAL)
+
+
+def _admit() -> Optional[Response]:
+    if not settings.ADMISSION_ENABLED or request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+    if not controller.acquire(route_priority(request.endpoint)):
+        response = jsonify({"error": "Servicio saturado, intenta de nuevo en unos segundos."})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(settings.ADMISSION_RETRY_AFTER)
+        return response
+    g.admitted = True
+    return None
+
+
+def _release(exc: BaseException | None) -> None:
+    if g.pop("admitted", False):
+        controller.release()
+
+
+def init_admission(app: Flask) -> None:
+    """Register the limiter so it runs before any other request hook."""
+    app.before_request_funcs.setdefault(None, []).insert(0, _admit)
+    app.teardown_request(_release)
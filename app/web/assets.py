@@ -0,0 +1,130 @@
+"""Content-hashed, precompressed static assets served with immutable caching."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path, PurePosixPath
+from typing import Dict, NamedTuple, Optional, Set
+
+from flask import Flask, Response, abort, current_app, request, url_for
+
+try:  # Dependencia opcional: variante .br de los assets de texto.
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+logger = logging.getLogger(__name__)
+
+ASSETS_URL = "/assets"
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Nombres sin hash (p. ej. imágenes referenciadas desde leaflet.css) pueden cambiar.
+UNHASHED_CACHE = "public, max-age=300"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".json", ".map", ".svg", ".txt", ".html"}
+
+
+class Asset(NamedTuple):
+    name: str
+    hashed_name: str
+    digest: str
+    mimetype: str
+    body: bytes
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+
+
+def hashed_name(name: str, digest: str) -> str:
+    """``css/styles.css`` -> ``css/styles.<digest>.css``."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def _compressed(body: bytes, suffix: str) -> tuple[Optional[bytes], Optional[bytes]]:
+    if suffix not in COMPRESSIBLE_SUFFIXES:
+        return None, None
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    br = _brotli.compress(body, quality=11) if _brotli is not None else None
+    return (gz if len(gz) < len(body) else None), (br if br and len(br) < len(body) else None)
+
+
+class AssetManifest:
+    """Every file under ``root`` hashed and precompressed once, kept in memory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.by_name: Dict[str, Asset] = {}
+        self.by_hashed: Dict[str, Asset] = {}
+        # Archivos pedidos con fallback que no existen (se avisa una vez por archivo).
+        self.missing: Set[str] = set()
+        if self.root.is_dir():
+            for path in sorted(self.root.rglob("*")):
+                if path.is_file():
+                    self._add(path)
+
+    def _add(self, path: Path) -> None:
+        name = path.relative_to(self.root).as_posix()
+        body = path.read_bytes()
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        gz, br = _compressed(body, path.suffix.lower())
+        asset = Asset(name, hashed_name(name, digest), digest, mimetype, body, gz, br)
+        self.by_name[name] = asset
+        self.by_hashed[asset.hashed_name] = asset
+
+
+def asset_url(filename: str, fallback: Optional[str] = None) -> str:
+    """Return the fingerprinted URL for ``filename`` (a path under ``static/``).
+
+    Files that are not present (e.g. vendored libraries not downloaded yet)
+    resolve to ``fallback`` when given, with a warning logged once per file.
+    """
+    manifest: AssetManifest = current_app.extensions["assets"]
+    asset = manifest.by_name.get(filename)
+    if asset is None:
+        if fallback and filename not in manifest.missing:
+            manifest.missing.add(filename)
+            logger.warning("%s no está vendorizado; se sirve desde %s", filename, fallback)
+        return fallback or url_for("static", filename=filename)
+    return url_for("assets", filename=asset.hashed_name)
+
+
+def _accepts(encoding: str) -> bool:
+    header = request.headers.get("Accept-Encoding", "")
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() == encoding:
+            return params.strip().replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+def serve_asset(filename: str) -> Response:
+    manifest: AssetManifest = current_app.extensions["assets"]
+    asset = manifest.by_hashed.get(filename)
+    immutable = asset is not None
+    if asset is None:
+        asset = manifest.by_name.get(filename)
+    if asset is None:
+        abort(404)
+
+    body, encoding = asset.body, None
+    if asset.br is not None and _accepts("br"):
+        body, encoding = asset.br, "br"
+    elif asset.gzip is not None and _accepts("gzip"):
+        body, encoding = asset.gzip, "gzip"
+
+    response = Response(body, mimetype=asset.mimetype)
+    response.headers["Cache-Control"] = IMMUTABLE if immutable else UNHASHED_CACHE
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset.gzip is not None or asset.br is not None:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(f"{asset.digest}-{encoding or 'identity'}")
+    return response.make_conditional(request)
+
+
+def init_assets(app: Flask) -> None:
+    """Hash and precompress ``app.static_folder`` and expose ``asset_url`` to templates."""
+    app.extensions["assets"] = AssetManifest(Path(app.static_folder))
+    app.add_url_rule(f"{ASSETS_URL}/<path:filename>", "assets", serve_asset)
+    app.jinja_env.globals["asset_url"] = asset_url
@@ -0,0 +1,34 @@
+"""Bearer-token protection for the write endpoints."""
+from __future__ import annotations
+
+import hmac
+from functools import wraps
+from typing import Callable
+
+from flask import jsonify, request
+
+from app import settings
+
+
+def require_write_token(view: Callable) -> Callable:
+    """Reject requests without ``Authorization: Bearer <BULK_API_TOKEN>``.
+
+    Answers 403 while no token is configured, so the write API is off by default.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = settings.BULK_API_TOKEN
+        if not expected:
+            return jsonify({"error": "La API de escritura está deshabilitada."}), 403
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(
+            supplied.strip().encode("utf-8"), expected.encode("utf-8")
+        ):
+            response = jsonify({"error": "Token de escritura ausente o inválido."})
+            response.status_code = 401
+            response.headers["WWW-Authenticate"] = 'Bearer realm="proyecto-maestro"'
+            return response
+        return view(*args, **kwargs)
+
+    return wrapper
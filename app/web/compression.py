@@ -0,0 +1,85 @@
+"""Optional gzip/brotli compression for Flask responses."""
+from __future__ import annotations
+
+import gzip
+
+from flask import Flask, Response, request
+
+from app import settings
+
+try:  # Dependencia opcional: habilita Content-Encoding: br.
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/geo+json",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "application/javascript",
+    "text/javascript",
+    "image/svg+xml",
+    "application/vnd.pm.geo",
+}
+
+
+def _accepted_encodings() -> set[str]:
+    header = request.headers.get("Accept-Encoding", "")
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if token:
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+def choose_encoding() -> str | None:
+    """Return the best encoding supported by both the client and this process."""
+    accepted = _accepted_encodings()
+    if _brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+def _compress_response(response: Response) -> Response:
+    if not settings.COMPRESSION_ENABLED:
+        return response
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code >= 300
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < settings.COMPRESSION_MIN_SIZE:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Register the after-request hook that compresses eligible responses."""
+    app.after_request(_compress_response)
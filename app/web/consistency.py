@@ -0,0 +1,60 @@
+"""Per-request read-your-writes routing on top of the read replicas."""
+from __future__ import annotations
+
+import time
+
+from flask import Flask, Response, g, request
+
+from app import settings
+from app.utils.database import pin_primary, unpin_primary
+
+RYW_COOKIE = "pm_ryw"
+RYW_HEADER = "X-Read-Your-Writes"
+
+
+def _wants_primary() -> bool:
+    if request.headers.get(RYW_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    try:
+        until = float(request.cookies.get(RYW_COOKIE, "0"))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def mark_write() -> None:
+    """Pin the rest of this request, and the client's next reads, to the primary."""
+    g.wrote = True
+    if "ryw_token" not in g:
+        g.ryw_token = pin_primary()
+
+
+def _pin() -> None:
+    if _wants_primary():
+        g.ryw_token = pin_primary()
+
+
+def _remember_write(response: Response) -> Response:
+    if g.get("wrote") and settings.READ_YOUR_WRITES_WINDOW:
+        window = settings.READ_YOUR_WRITES_WINDOW
+        response.set_cookie(
+            RYW_COOKIE,
+            f"{time.time() + window:.3f}",
+            max_age=int(window) + 1,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def _unpin(exc: BaseException | None) -> None:
+    token = g.pop("ryw_token", None)
+    if token is not None:
+        unpin_primary(token)
+
+
+def init_consistency(app: Flask) -> None:
+    """Register the hooks that honour ``X-Read-Your-Writes`` and the RYW cookie."""
+    app.before_request(_pin)
+    app.after_request(_remember_write)
+    app.teardown_request(_unpin)
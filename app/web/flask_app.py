@@ -1,18 +1,37 @@
 from flask import Flask
 
+from app.web.admission import init_admission
+from app.web.assets import init_assets
+from app.web.compression import init_compression
+from app.web.consistency import init_consistency
+from app.web.json_provider import FastJSONProvider
+from app.web.query_debug import init_query_debug
 from app.web.routes.autores_routes import autores_bp
 from app.web.routes.home_routes import home_bp
 from app.web.routes.mapa_routes import mapa_bp
+from app.web.routes.metrics_routes import metrics_bp
 from app.web.routes.obras_routes import obras_bp
+from app.web.routes.rutas_routes import rutas_bp
+from app.web.template_cache import init_templates
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    init_admission(app)
+    init_compression(app)
+    init_consistency(app)
+    init_query_debug(app)
+    init_assets(app)
 
     # Registrar blueprints sin prefijos adicionales para respetar rutas declaradas
     app.register_blueprint(home_bp)
     app.register_blueprint(obras_bp)
     app.register_blueprint(autores_bp)
     app.register_blueprint(mapa_bp)
+    app.register_blueprint(rutas_bp)
+    app.register_blueprint(metrics_bp)
+
+    init_templates(app)
 
     return app
 
@@ -20,4 +39,7 @@ def create_app():
 app = create_app()
 
 if __name__ == "__main__":
+    from app.services import invalidation_service
+
+    invalidation_service.start()
     app.run(host="0.0.0.0", port=5002, debug=True)
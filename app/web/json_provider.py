@@ -0,0 +1,31 @@
+"""Flask JSON provider backed by the fast encoder in ``app.utils.fast_json``."""
+from __future__ import annotations
+
+from typing import Any
+
+from flask import Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils import fast_json
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Use orjson (when installed) and embed :class:`RawJSON` fragments as-is."""
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs.keys() - {"separators"}:
+            return super().dumps(obj, **kwargs)
+        return fast_json.dumps(obj, default=self.default)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return fast_json.loads(s)
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """Build a JSON response with the fast encoder regardless of the app provider."""
+    body = fast_json.dumps(payload, default=DefaultJSONProvider.default)
+    return current_app.response_class(body + "\n", status=status, mimetype="application/json")
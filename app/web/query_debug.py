@@ -0,0 +1,55 @@
+"""``QUERY_DEBUG``: per-request database accounting in headers and the log."""
+from __future__ import annotations
+
+import logging
+
+from flask import Flask, Response, g, request
+
+from app import settings
+from app.utils import query_stats
+
+logger = logging.getLogger("app.query_debug")
+
+
+def _begin() -> None:
+    if settings.QUERY_DEBUG:
+        g.query_stats = query_stats.begin(request.endpoint or request.path)
+
+
+def _report(response: Response) -> Response:
+    stats = g.get("query_stats")
+    if stats is None:
+        return response
+    used = stats.as_dict()
+    response.headers["X-Query-Connections"] = str(used["connections"])
+    response.headers["X-Query-Statements"] = str(used["statements"])
+    response.headers["X-Query-Rows"] = str(used["rows"])
+    logger.info(
+        "%s %s: %d conexiones, %d sentencias, %d filas",
+        request.method,
+        request.full_path.rstrip("?"),
+        used["connections"],
+        used["statements"],
+        used["rows"],
+    )
+    for (sql, _), count in stats.repeated().items():
+        logger.warning(
+            "Sentencia repetida %d veces en %s: %s",
+            count,
+            stats.label,
+            query_stats.display_sql(sql),
+        )
+    return response
+
+
+def _end(exc: BaseException | None) -> None:
+    stats = g.pop("query_stats", None)
+    if stats is not None:
+        query_stats.end(stats)
+
+
+def init_query_debug(app: Flask) -> None:
+    """Register the hooks; they do nothing unless ``QUERY_DEBUG`` is on."""
+    app.before_request(_begin)
+    app.after_request(_report)
+    app.teardown_request(_end)
@@ -1,21 +1,56 @@
 from urllib.parse import urlencode
 
 from flask import Blueprint, jsonify, render_template, request
+from markupsafe import Markup
 
-from app.services.autores_service import get_autor_detail, get_autores
+from app.services.autores_service import (
+    get_autor_detail,
+    get_autores,
+    normalize_autores_query,
+)
+from app.services.bulk_service import bulk_upsert_autores
+from app.services.suggest_service import suggest_autores
+from app.web.auth import require_write_token
+from app.web.consistency import mark_write
+from app.web.json_provider import json_response
+from app.web.template_cache import cached_fragment
 
 
 autores_bp = Blueprint("autores", __name__)
 
+PAGE_FILTERS = ("nombre", "min_obras", "max_obras")
+
 
 @autores_bp.route("/autores", methods=["GET"])
 def autores_collection():
     """Return authors with obra counts and pagination."""
     try:
-        data = get_autores(request.args)
+        data = get_autores(request.args, as_json=True)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return json_response(data)
+
+
+@autores_bp.route("/autores/suggest", methods=["GET"])
+def autores_suggest():
+    """Return author name suggestions for the ``q`` prefix."""
+    try:
+        data = suggest_autores(request.args)
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
-    return jsonify(data)
+    return json_response(data)
+
+
+@autores_bp.route("/autores/bulk", methods=["POST"])
+@require_write_token
+def autores_bulk():
+    """Create or rename autores from a JSON array or NDJSON body, one status per record."""
+    try:
+        data = bulk_upsert_autores(request.stream, request.mimetype)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    mark_write()
+    return json_response(data)
 
 
 def _build_page_url(base_params: dict[str, str], *, offset: int) -> str:
@@ -24,11 +59,54 @@ def _build_page_url(base_params: dict[str, str], *, offset: int) -> str:
     return "/autores/page?" + urlencode(params)
 
 
+def _page_args() -> dict[str, str]:
+    """Return the page query; unfiltered browses only show an approximate total."""
+    args = request.args.to_dict()
+    if "count" not in args and not any(args.get(name) for name in PAGE_FILTERS):
+        args["count"] = "estimate"
+    return args
+
+
+def _render_results(params) -> str:
+    data = get_autores(params)
+    items = data["items"]
+    filters = data["filters"]
+    meta = data["meta"]
+    empty_message = None
+    if not items:
+        empty_message = "No se encontraron autores con estos filtros."
+
+    base_params = {
+        "nombre": filters["nombre"],
+        "min_obras": filters["min_obras"],
+        "max_obras": filters["max_obras"],
+        "limit": str(filters["limit"]),
+    }
+
+    if meta.get("count_mode", "exact") != "exact":
+        base_params["count"] = meta["count_mode"]
+
+    pagination = {"prev": None, "next": None}
+    if meta.get("has_prev") and meta.get("prev_offset") is not None:
+        pagination["prev"] = _build_page_url(base_params, offset=meta["prev_offset"])
+    if meta.get("has_next") and meta.get("next_offset") is not None:
+        pagination["next"] = _build_page_url(base_params, offset=meta["next_offset"])
+
+    return render_template(
+        "partials/autores_results.html",
+        items=items,
+        meta=meta,
+        pagination=pagination,
+        empty_message=empty_message,
+    )
+
+
 @autores_bp.route("/autores/page", methods=["GET"])
 def autores_page():
     """Render autores list using server-side template."""
     try:
-        data = get_autores(request.args)
+        args = _page_args()
+        filters, cache_key = normalize_autores_query(args)
     except ValueError as exc:
         empty_state = {
             "items": [],
@@ -51,46 +129,32 @@ def autores_page():
                 "limit": 50,
             },
         }
-        return (
+        results = Markup(
             render_template(
-                "autores_list.html",
+                "partials/autores_results.html",
                 items=empty_state["items"],
-                filters=empty_state["filters"],
                 meta=empty_state["meta"],
                 pagination={"prev": None, "next": None},
                 empty_message="No pudimos interpretar los filtros. Ajusta los valores e intenta de nuevo.",
+            )
+        )
+        return (
+            render_template(
+                "autores_list.html",
+                filters=empty_state["filters"],
+                results=results,
                 error=str(exc),
             ),
             400,
         )
 
-    items = data["items"]
-    filters = data["filters"]
-    meta = data["meta"]
-    empty_message = None
-    if not items:
-        empty_message = "No se encontraron autores con estos filtros."
-
-    base_params = {
-        "nombre": filters["nombre"],
-        "min_obras": filters["min_obras"],
-        "max_obras": filters["max_obras"],
-        "limit": str(filters["limit"]),
-    }
-
-    pagination = {"prev": None, "next": None}
-    if meta.get("has_prev") and meta.get("prev_offset") is not None:
-        pagination["prev"] = _build_page_url(base_params, offset=meta["prev_offset"])
-    if meta.get("has_next") and meta.get("next_offset") is not None:
-        pagination["next"] = _build_page_url(base_params, offset=meta["next_offset"])
-
+    results = cached_fragment(
+        "autores_page", cache_key, lambda: _render_results(args)
+    )
     return render_template(
         "autores_list.html",
-        items=items,
         filters=filters,
-        meta=meta,
-        pagination=pagination,
-        empty_message=empty_message,
+        results=results,
         error=None,
     )
 
@@ -99,9 +163,9 @@ def autores_page():
 def autores_detail(autor_id: int):
     """Return single author detail and its obras."""
     try:
-        data = get_autor_detail(autor_id, request.args)
+        data = get_autor_detail(autor_id, request.args, as_json=True)
     except LookupError:
         return jsonify({"error": "Autor no encontrado"}), 404
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
-    return jsonify(data)
+    return json_response(data)
@@ -1,10 +1,13 @@
-from flask import Blueprint, jsonify, render_template
+from flask import Blueprint, Response, jsonify, render_template, request
 
-from app.repositories.obras_repository import list_obras
-from app.utils.database import get_connection
+from app.services.density_service import get_density
+from app.services.obras_service import get_obras_geo
+from app.web.json_provider import json_response
 
 mapa_bp = Blueprint("mapa", __name__)
 
+GEO_BINARY_MIMETYPE = "application/vnd.pm.geo"
+
 
 @mapa_bp.route("/mapa", methods=["GET"])
 def mapa_page():
@@ -15,43 +18,20 @@ def mapa_page():
 @mapa_bp.route("/api/obras_geo", methods=["GET"])
 def obras_geo():
     """Return obras with geographic coordinates for the map."""
-    conn = get_connection()
     try:
-        rows, _ = list_obras(conn, limit=2000, offset=0)
-    finally:
-        conn.close()
-
-    payload = []
-    for row in rows:
-        (
-            obra_id,
-            nombre,
-            autor_id,
-            autor_nombre,
-            anio,
-            tipo,
-            comuna,
-            barrio,
-            direccion,
-            descripcion,
-            lat,
-            lon,
-        ) = row
-
-        if lat is None or lon is None:
-            continue
-
-        payload.append(
-            {
-                "id": obra_id,
-                "nombre": nombre,
-                "autor": autor_nombre,
-                "anio": anio,
-                "tipo": tipo,
-                "comuna": comuna,
-                "lat": lat,
-                "lon": lon,
-            }
-        )
-
-    return jsonify({"items": payload, "total": len(payload)})
+        payload = get_obras_geo(request.args.get("format"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if isinstance(payload, bytes):
+        return Response(payload, mimetype=GEO_BINARY_MIMETYPE)
+    return json_response(payload)
+
+
+@mapa_bp.route("/api/obras_density", methods=["GET"])
+def obras_density():
+    """Return obra counts per geohash cell for heatmaps."""
+    try:
+        data = get_density(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return json_response(data)
@@ -0,0 +1,33 @@
+import hmac
+
+from flask import Blueprint, jsonify, request
+
+from app import settings
+from app.utils.metrics import collect
+from app.web.json_provider import json_response
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _authorized() -> bool:
+    expected = settings.METRICS_TOKEN
+    if not expected:
+        return True
+    scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        supplied.strip().encode("utf-8"), expected.encode("utf-8")
+    )
+
+
+@metrics_bp.route("/api/metrics", methods=["GET"])
+def metrics():
+    """Return this worker's internal counters (admission control, caches).
+
+    With ``METRICS_TOKEN`` set the caller must send it as a Bearer token.
+    """
+    if not _authorized():
+        response = jsonify({"error": "Token de métricas ausente o inválido."})
+        response.status_code = 401
+        response.headers["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+    return json_response(collect())
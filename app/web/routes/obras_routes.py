@@ -1,21 +1,67 @@
 from urllib.parse import urlencode
 
 from flask import Blueprint, jsonify, render_template, request
+from markupsafe import Markup
 
-from app.services.obras_service import get_obras
+from app.services.bulk_service import bulk_upsert_obras
+from app.services.neighbours_service import get_obras_cercanas
+from app.services.obras_service import get_obras, normalize_obras_query
+from app.services.suggest_service import suggest_obras
+from app.web.auth import require_write_token
+from app.web.consistency import mark_write
+from app.web.json_provider import json_response
+from app.web.template_cache import cached_fragment
 
 
 obras_bp = Blueprint("obras", __name__)
 
+PAGE_FILTERS = ("autor", "comuna", "tipo", "anio", "lat", "lon", "radius")
+# Columnas de la tabla HTML: la consulta no lee descripción ni coordenadas.
+PAGE_FIELDS = "id,nombre,autor,anio,tipo,comuna,barrio,direccion"
+
 
 @obras_bp.route("/obras", methods=["GET"])
 def obras_collection():
     """Return obras as JSON applying query filters."""
     try:
-        data = get_obras(request.args)
+        data = get_obras(request.args, as_json=True)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return json_response(data)
+
+
+@obras_bp.route("/obras/suggest", methods=["GET"])
+def obras_suggest():
+    """Return obra name suggestions for the ``q`` prefix."""
+    try:
+        data = suggest_obras(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return json_response(data)
+
+
+@obras_bp.route("/obras/bulk", methods=["POST"])
+@require_write_token
+def obras_bulk():
+    """Upsert obras from a JSON array or NDJSON body, one status per record."""
+    try:
+        data = bulk_upsert_obras(request.stream, request.mimetype)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    mark_write()
+    return json_response(data)
+
+
+@obras_bp.route("/obras/<int:obra_id>/cercanas", methods=["GET"])
+def obras_cercanas(obra_id: int):
+    """Return the obras closest to ``obra_id`` with their distance."""
+    try:
+        data = get_obras_cercanas(obra_id, request.args)
+    except LookupError as exc:
+        return jsonify({"error": str(exc)}), 404
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
-    return jsonify(data)
+    return json_response(data)
 
 
 def _build_page_url(base_params: dict[str, str], *, offset: int) -> str:
@@ -24,11 +70,62 @@ def _build_page_url(base_params: dict[str, str], *, offset: int) -> str:
     return "/obras/page?" + urlencode(params)
 
 
+def _page_args() -> dict[str, str]:
+    """Return the page query; unfiltered browses only show an approximate total."""
+    args = request.args.to_dict()
+    if "count" not in args and not any(args.get(name) for name in PAGE_FILTERS):
+        args["count"] = "estimate"
+    args["fields"] = PAGE_FIELDS
+    return args
+
+
+def _render_results(params) -> str:
+    data = get_obras(params)
+    items = data["items"]
+    filters = data["filters"]
+    meta = data["meta"]
+    empty_message = None
+    if not items:
+        empty_message = "No encontramos obras que coincidan con estos filtros."
+
+    base_params = {
+        "autor": filters["autor"],
+        "comuna": filters["comuna"],
+        "tipo": filters["tipo"],
+        "anio": filters["anio"],
+        "limit": str(filters["limit"]),
+    }
+    if filters.get("lat"):
+        base_params["lat"] = filters["lat"]
+    if filters.get("lon"):
+        base_params["lon"] = filters["lon"]
+    if filters.get("radius"):
+        base_params["radius"] = filters["radius"]
+
+    if meta.get("count_mode", "exact") != "exact":
+        base_params["count"] = meta["count_mode"]
+
+    pagination = {"prev": None, "next": None}
+    if meta.get("has_prev") and meta.get("prev_offset") is not None:
+        pagination["prev"] = _build_page_url(base_params, offset=meta["prev_offset"])
+    if meta.get("has_next") and meta.get("next_offset") is not None:
+        pagination["next"] = _build_page_url(base_params, offset=meta["next_offset"])
+
+    return render_template(
+        "partials/obras_results.html",
+        items=items,
+        meta=meta,
+        pagination=pagination,
+        empty_message=empty_message,
+    )
+
+
 @obras_bp.route("/obras/page", methods=["GET"])
 def obras_page():
     """Render obras list using server-side template."""
     try:
-        data = get_obras(request.args)
+        args = _page_args()
+        filters, cache_key = normalize_obras_query(args)
     except ValueError as exc:
         empty_state = {
             "items": [],
@@ -55,52 +152,31 @@ def obras_page():
                 "radius": "",
             },
         }
-        return (
+        results = Markup(
             render_template(
-                "obras_list.html",
+                "partials/obras_results.html",
                 items=empty_state["items"],
-                filters=empty_state["filters"],
                 meta=empty_state["meta"],
                 pagination={"prev": None, "next": None},
                 empty_message="No pudimos interpretar los filtros. Ajusta los valores e intenta de nuevo.",
+            )
+        )
+        return (
+            render_template(
+                "obras_list.html",
+                filters=empty_state["filters"],
+                results=results,
                 error=str(exc),
             ),
             400,
         )
 
-    items = data["items"]
-    filters = data["filters"]
-    meta = data["meta"]
-    empty_message = None
-    if not items:
-        empty_message = "No encontramos obras que coincidan con estos filtros."
-
-    base_params = {
-        "autor": filters["autor"],
-        "comuna": filters["comuna"],
-        "tipo": filters["tipo"],
-        "anio": filters["anio"],
-        "limit": str(filters["limit"]),
-    }
-    if filters.get("lat"):
-        base_params["lat"] = filters["lat"]
-    if filters.get("lon"):
-        base_params["lon"] = filters["lon"]
-    if filters.get("radius"):
-        base_params["radius"] = filters["radius"]
-
-    pagination = {"prev": None, "next": None}
-    if meta.get("has_prev") and meta.get("prev_offset") is not None:
-        pagination["prev"] = _build_page_url(base_params, offset=meta["prev_offset"])
-    if meta.get("has_next") and meta.get("next_offset") is not None:
-        pagination["next"] = _build_page_url(base_params, offset=meta["next_offset"])
-
+    results = cached_fragment(
+        "obras_page", cache_key, lambda: _render_results(args)
+    )
     return render_template(
         "obras_list.html",
-        items=items,
         filters=filters,
-        meta=meta,
-        pagination=pagination,
-        empty_message=empty_message,
+        results=results,
         error=None,
     )
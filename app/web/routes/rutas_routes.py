@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify, request
+
+from app.services.rutas_service import get_ruta
+from app.web.json_provider import json_response
+
+rutas_bp = Blueprint("rutas", __name__)
+
+
+@rutas_bp.route("/rutas", methods=["GET"])
+def rutas_collection():
+    """Return a walking tour through the selected obras."""
+    try:
+        data = get_ruta(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return json_response(data)
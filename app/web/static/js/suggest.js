@@ -0,0 +1,38 @@
+// Sugerencias mientras se escribe para los campos con data-suggest-url.
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('input[data-suggest-url]').forEach((input) => {
+    const list = document.createElement('datalist');
+    list.id = `${input.id}-sugerencias`;
+    input.setAttribute('list', list.id);
+    input.setAttribute('autocomplete', 'off');
+    input.after(list);
+
+    let timer = null;
+    let controller = null;
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (!q) {
+        list.replaceChildren();
+        return;
+      }
+      timer = setTimeout(() => {
+        if (controller) controller.abort();
+        controller = new AbortController();
+        const url = `${input.dataset.suggestUrl}?q=${encodeURIComponent(q)}`;
+        fetch(url, { signal: controller.signal })
+          .then((resp) => resp.json())
+          .then((data) => {
+            list.replaceChildren(
+              ...(data.items || []).map((item) => {
+                const option = document.createElement('option');
+                option.value = item.nombre;
+                return option;
+              })
+            );
+          })
+          .catch(() => {});
+      }, 120);
+    });
+  });
+});
@@ -0,0 +1,60 @@
+"""Rendered-fragment cache and Jinja bytecode cache for the HTML catalog."""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Callable, Hashable
+
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+from app import settings
+from app.services.dataset_service import current_version, on_version_change
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+fragment_cache = LRUCache(settings.FRAGMENT_CACHE_SIZE, settings.FRAGMENT_CACHE_TTL)
+
+
+@on_version_change
+def _drop_fragments(old_version: int, new_version: int) -> None:
+    fragment_cache.clear()
+
+
+def cached_fragment(namespace: str, key: Hashable, render: Callable[[], str]) -> Markup:
+    """Return the HTML for ``key`` from memory, rendering it on a miss.
+
+    Keys include the dataset version, so fragments rendered before a reload
+    are never served afterwards.
+    """
+    if not settings.FRAGMENT_CACHE_ENABLED:
+        return Markup(render())
+
+    full_key = (namespace, current_version(), key)
+    html = fragment_cache.get(full_key)
+    if html is None:
+        html = render()
+        fragment_cache.set(full_key, html)
+    return Markup(html)
+
+
+def init_templates(app: Flask) -> None:
+    """Enable the on-disk bytecode cache and optionally precompile every template.
+
+    Precompiling in ``create_app`` lets gunicorn workers (or the master with
+    ``--preload``) start with all templates already parsed.
+    """
+    cache_dir = settings.JINJA_BYTECODE_CACHE_DIR
+    if cache_dir:
+        path = Path(cache_dir)
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(path))
+        except OSError:
+            logger.warning("No fue posible usar %s como caché de plantillas", path)
+
+    if settings.JINJA_PRECOMPILE:
+        for name in app.jinja_env.list_templates(extensions=["html"]):
+            app.jinja_env.get_template(name)
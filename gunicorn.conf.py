@@ -0,0 +1,61 @@
+"""Gunicorn settings for Proyecto Maestro(s).
+
+The master process builds the dataset snapshot and the neighbours table
+before forking, so every worker maps the same files instead of loading its
+own copy.
+"""
+import logging
+import os
+
+from app import settings
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "3"))
+# Con más de un hilo gunicorn usa gthread; el control de admisión limita cuántos
+# de esos hilos trabajan a la vez (ADMISSION_MAX_CONCURRENT). Hacen falta hilos
+# también para las peticiones en espera (ADMISSION_MAX_QUEUE): si no, el exceso
+# se queda en el backlog de gunicorn sin prioridades ni 503 rápido.
+threads = int(os.getenv("GUNICORN_THREADS") or 8)
+if settings.ADMISSION_ENABLED:
+    threads = max(threads, settings.ADMISSION_MAX_CONCURRENT + settings.ADMISSION_MAX_QUEUE)
+preload_app = True
+
+
+def on_starting(server):
+    from app import settings
+
+    if settings.SNAPSHOT_ENABLED:
+        from app.services.snapshot_service import build_snapshot
+
+        try:
+            path = build_snapshot()
+            server.log.info("Snapshot del dataset listo en %s", path)
+        except Exception:
+            logging.getLogger(__name__).exception("No se pudo construir el snapshot inicial")
+
+    if settings.NEIGHBOURS_ENABLED:
+        from app.services.neighbours_service import build_neighbours
+
+        try:
+            result = build_neighbours()
+            server.log.info("Vecinos precalculados: %s obras", result["obras"])
+        except Exception:
+            logging.getLogger(__name__).exception("No se pudo precalcular la tabla de vecinos")
+
+
+def post_fork(server, worker):
+    from app.services import (
+        dataset_service,
+        invalidation_service,
+        neighbours_service,
+        snapshot_service,
+        spatial_service,
+    )
+
+    # Cada worker abre su propio mapeo y relee la versión tras el fork.
+    dataset_service.reset()
+    snapshot_service.reset()
+    neighbours_service.reset()
+    spatial_service.reset()
+    # Hilo que escucha las nuevas versiones publicadas por los cargadores.
+    invalidation_service.start()
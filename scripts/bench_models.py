@@ -0,0 +1,116 @@
+"""Compare per-row dicts against the Obra model: build time, memory and JSON encoding."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app.models.obra import Obra
+from app.utils import fast_json
+
+
+def sample_rows(n: int) -> List[tuple]:
+    """Cursor-like 12-tuples with realistic string and coordinate values."""
+    return [
+        (
+            i,
+            f"Obra número {i}",
+            i % 400,
+            f"Autor {i % 400}",
+            1900 + i % 120,
+            ("Escultura", "Mural", "Busto")[i % 3],
+            f"Comuna {i % 16}",
+            f"Barrio {i % 250}",
+            f"Calle {i % 90} # {i % 70}-{i % 50}",
+            None if i % 4 else "Descripción breve de la obra",
+            6.2 + (i % 1000) / 10000,
+            -75.6 + (i % 1000) / 10000,
+        )
+        for i in range(n)
+    ]
+
+
+def rows_to_dicts(rows: List[tuple]) -> List[Dict[str, object]]:
+    """The previous dict path: one fresh dict per row."""
+    fields = Obra._fields
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def rows_to_models(rows: List[tuple]) -> List[Obra]:
+    return list(map(Obra._make, rows))
+
+
+def measure(build: Callable[[List[tuple]], list], rows: List[tuple]) -> Tuple[float, int]:
+    """Return ``(seconds, bytes retained)`` for building the page from ``rows``."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(n: int, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    rows = sample_rows(n)
+    dict_time, dict_bytes = measure(rows_to_dicts, rows)
+    model_time, model_bytes = measure(rows_to_models, rows)
+    dicts, models = rows_to_dicts(rows), rows_to_models(rows)
+    return {
+        "dict": {
+            "build_s": _best(lambda: rows_to_dicts(rows), repeat) or dict_time,
+            "bytes": dict_bytes,
+            "json_s": _best(lambda: fast_json.dumps(dicts), repeat),
+        },
+        "obra": {
+            "build_s": _best(lambda: rows_to_models(rows), repeat) or model_time,
+            "bytes": model_bytes,
+            "json_s": _best(lambda: Obra.to_json(models), repeat),
+        },
+    }
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000, help="Filas simuladas")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones (se toma la mejor)")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado como JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"{args.rows} filas (backend JSON: {fast_json.encoder_name()})")
+    print(f"{'camino':<8}{'construir ms':>14}{'memoria KiB':>14}{'B/fila':>9}{'JSON ms':>10}")
+    for name, stats in result.items():
+        print(
+            f"{name:<8}{stats['build_s'] * 1000:>14.1f}{stats['bytes'] / 1024:>14.0f}"
+            f"{stats['bytes'] / args.rows:>9.0f}{stats['json_s'] * 1000:>10.1f}"
+        )
+    saved = 1 - result["obra"]["bytes"] / result["dict"]["bytes"]
+    print(f"Memoria retenida: {saved:.0%} menos con Obra")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
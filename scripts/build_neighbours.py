@@ -0,0 +1,34 @@
+"""Precompute the k-nearest-neighbour table of located obras."""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app import settings
+from app.services.neighbours_service import build_neighbours
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--full", action="store_true", help="Recalcular todo en vez de actualizar lo que cambió"
+    )
+    args = parser.parse_args(argv)
+
+    result = build_neighbours(full=args.full)
+    print(
+        f"Vecinos v{result['version']}: {result['obras']} obras, "
+        f"{result['recalculadas']} recalculadas (k={settings.NEIGHBOURS_K}) "
+        f"en {settings.NEIGHBOURS_PATH}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
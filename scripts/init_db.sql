@@ -4,6 +4,7 @@
 
 -- Extensiones necesarias
 CREATE EXTENSION IF NOT EXISTS postgis;
+CREATE EXTENSION IF NOT EXISTS pg_trgm; -- ILIKE '%texto%' indexado
 
 -- ===============================
 -- Tabla: autores
@@ -27,6 +28,7 @@ CREATE TABLE IF NOT EXISTS obras (
     direccion TEXT,
     descripcion TEXT,
     ubicacion GEOGRAPHY(POINT, 4326), -- lat/long
+    geohash TEXT COLLATE "C", -- celda de 9 caracteres; sus prefijos son celdas mayores
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
@@ -44,8 +46,36 @@ CREATE TABLE IF NOT EXISTS rutas (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- ===============================
+-- Tabla: dataset_version
+-- ===============================
+-- Fila única que los cargadores incrementan al confirmar cambios;
+-- las cachés de la aplicación se invalidan cuando cambia.
+CREATE TABLE IF NOT EXISTS dataset_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+INSERT INTO dataset_version (id, version) VALUES (TRUE, 1) ON CONFLICT (id) DO NOTHING;
+
 -- Índices útiles
-CREATE INDEX IF NOT EXISTS idx_obras_autor_id ON obras(autor_id);
-CREATE INDEX IF NOT EXISTS idx_obras_comuna ON obras(comuna);
-CREATE INDEX IF NOT EXISTS idx_obras_tipo ON obras(tipo);
+-- Orden del catálogo (anio DESC NULLS LAST, id) detrás de cada filtro de igualdad:
+-- una página se lee del índice sin ordenar todas las filas que cumplen el filtro.
+CREATE INDEX IF NOT EXISTS idx_obras_catalogo ON obras (anio DESC NULLS LAST, id);
+CREATE INDEX IF NOT EXISTS idx_obras_autor_catalogo ON obras (autor_id, anio DESC NULLS LAST, id);
+CREATE INDEX IF NOT EXISTS idx_obras_comuna_catalogo ON obras (comuna, anio DESC NULLS LAST, id);
+CREATE INDEX IF NOT EXISTS idx_obras_tipo_catalogo ON obras (tipo, anio DESC NULLS LAST, id);
 CREATE INDEX IF NOT EXISTS idx_obras_ubicacion ON obras USING GIST (ubicacion);
+-- Sustituidos por los índices compuestos anteriores (misma columna inicial)
+DROP INDEX IF EXISTS idx_obras_autor_id;
+DROP INDEX IF EXISTS idx_obras_comuna;
+DROP INDEX IF EXISTS idx_obras_tipo;
+
+-- Búsquedas ILIKE '%texto%' por nombre de autor
+CREATE INDEX IF NOT EXISTS idx_autores_nombre_trgm ON autores USING GIN (nombre gin_trgm_ops);
+
+-- Celdas geohash: bases existentes y obras con coordenadas sin celda aún
+ALTER TABLE obras ADD COLUMN IF NOT EXISTS geohash TEXT COLLATE "C";
+UPDATE obras SET geohash = ST_GeoHash(ubicacion::geometry, 9)
+WHERE ubicacion IS NOT NULL AND geohash IS NULL;
+CREATE INDEX IF NOT EXISTS idx_obras_geohash ON obras (geohash);
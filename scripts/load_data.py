@@ -13,7 +13,10 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from app.utils.database import get_connection
+from app.repositories.dataset_repository import bump_dataset_version
+from app.services.neighbours_service import refresh_after_load
+from app.utils import geohash
+from app.utils.database import get_write_connection
 
 load_dotenv()
 
@@ -47,7 +50,7 @@ def load_data() -> None:
     updated_obras = 0
     missing_coords = 0
 
-    with closing(get_connection()) as conn:
+    with closing(get_write_connection()) as conn:
         with conn.cursor() as cur, DATA_PATH.open(encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
@@ -73,9 +76,11 @@ def load_data() -> None:
                     missing_coords += 1
                     lat_db = None
                     lon_db = None
+                    cell = None
                 else:
                     lat_db = lat
                     lon_db = lon
+                    cell = geohash.encode(lat, lon)
 
                 cur.execute(
                     "SELECT id FROM obras WHERE nombre = %s AND autor_id = %s LIMIT 1",
@@ -101,7 +106,8 @@ def load_data() -> None:
                                 WHEN %s IS NOT NULL AND %s IS NOT NULL
                                     THEN ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
                                 ELSE NULL
-                            END
+                            END,
+                            geohash = %s
                         WHERE id = %s
                         """,
                         (
@@ -112,6 +118,7 @@ def load_data() -> None:
                             lat_db,
                             lon_db,
                             *ubicacion_args,
+                            cell,
                             obra_id,
                         ),
                     )
@@ -131,7 +138,8 @@ def load_data() -> None:
                             descripcion,
                             lat,
                             lon,
-                            ubicacion
+                            ubicacion,
+                            geohash
                         )
                         VALUES (
                             %s,
@@ -148,7 +156,8 @@ def load_data() -> None:
                                 WHEN %s IS NOT NULL AND %s IS NOT NULL
                                     THEN ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
                                 ELSE NULL
-                            END
+                            END,
+                            %s
                         )
                         """,
                         (
@@ -161,16 +170,23 @@ def load_data() -> None:
                             lat_db,
                             lon_db,
                             *ubicacion_args,
+                            cell,
                         ),
                     )
                     inserted_obras += 1
 
+        dataset_version = bump_dataset_version(conn)
         conn.commit()
 
+    neighbours = refresh_after_load()
+
     print("✅ Carga completada")
     print(f"Obras insertadas: {inserted_obras}")
     print(f"Obras actualizadas: {updated_obras}")
     print(f"Obras sin coordenadas: {missing_coords}")
+    print(f"Versión del dataset: {dataset_version}")
+    if neighbours is not None:
+        print(f"Vecinos recalculados: {neighbours['recalculadas']} de {neighbours['obras']}")
 
 
 if __name__ == "__main__":
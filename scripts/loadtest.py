@@ -0,0 +1,653 @@
+"""Replay a weighted mix of requests against the app and report latency percentiles per route."""
+from __future__ import annotations
+
+import argparse
+import csv
+import http.client
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+CSV_PATH = PROJECT_ROOT / "data" / "esculturas-publicas-medellin-limpio.csv"
+RESULTS_DIR = PROJECT_ROOT / ".cache" / "loadtest"
+
+# Peso relativo de cada ruta en la mezcla.
+DEFAULT_MIX = {
+    "obras": 30,
+    "obras_page": 15,
+    "autores": 15,
+    "autor_detail": 15,
+    "obras_geo": 15,
+    "mapa": 10,
+}
+PERCENTILES = (50, 95, 99)
+
+
+class Catalog(NamedTuple):
+    """Filter values seen in the real dataset, used to build realistic queries."""
+
+    comunas: List[str]
+    tipos: List[str]
+    autores: List[str]
+    years: List[int]
+    points: List[Tuple[float, float]]
+    rows: List[Dict[str, str]]
+
+
+def load_catalog(path: Path = CSV_PATH) -> Catalog:
+    with Path(path).open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+
+    def distinct(key: str) -> List[str]:
+        return sorted({row[key] for row in rows if row.get(key)})
+
+    points = []
+    for row in rows:
+        try:
+            points.append((float(row["latitude"]), float(row["longitude"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    years = sorted({int(row["year"]) for row in rows if (row.get("year") or "").isdigit()})
+    return Catalog(distinct("area"), distinct("type"), distinct("author"), years, points, rows)
+
+
+# -------- Peticiones --------
+
+
+def _maybe(rng: random.Random, probability: float) -> bool:
+    return rng.random() < probability
+
+
+def _obras_params(rng: random.Random, catalog: Catalog) -> Dict[str, object]:
+    params: Dict[str, object] = {}
+    if _maybe(rng, 0.3):
+        params["comuna"] = rng.choice(catalog.comunas)
+    if _maybe(rng, 0.2):
+        params["tipo"] = rng.choice(catalog.tipos)
+    if _maybe(rng, 0.15):
+        params["autor"] = rng.choice(catalog.autores).split()[0]
+    if _maybe(rng, 0.1) and catalog.years:
+        params["anio"] = rng.choice(catalog.years)
+    if _maybe(rng, 0.15) and catalog.points:
+        lat, lon = rng.choice(catalog.points)
+        params["lat"] = round(lat + rng.uniform(-0.005, 0.005), 6)
+        params["lon"] = round(lon + rng.uniform(-0.005, 0.005), 6)
+        params["radius"] = rng.choice((200, 500, 1000, 2000))
+    params["limit"] = rng.choice((10, 20, 50, 50, 100))
+    params["offset"] = rng.choice((0, 0, 0, 0, 50, 100))
+    return params
+
+
+def _obras(rng: random.Random, catalog: Catalog) -> str:
+    params = _obras_params(rng, catalog)
+    params["count"] = rng.choices(("exact", "estimate", "none"), (6, 3, 1))[0]
+    if _maybe(rng, 0.2):
+        params["fields"] = "id,nombre,lat,lon"
+    return "/obras?" + urlencode(params)
+
+
+def _obras_page(rng: random.Random, catalog: Catalog) -> str:
+    return "/obras/page?" + urlencode(_obras_params(rng, catalog))
+
+
+def _autores(rng: random.Random, catalog: Catalog) -> str:
+    params: Dict[str, object] = {}
+    if _maybe(rng, 0.3):
+        params["nombre"] = rng.choice(catalog.autores).split()[0]
+    if _maybe(rng, 0.2):
+        params["min_obras"] = rng.choice((1, 2, 3))
+    params["limit"] = rng.choice((20, 50, 100))
+    params["offset"] = rng.choice((0, 0, 0, 50))
+    return "/autores?" + urlencode(params)
+
+
+def _autor_detail(rng: random.Random, catalog: Catalog) -> str:
+    autor_id = rng.randint(1, max(1, len(catalog.autores)))
+    return f"/autores/{autor_id}?" + urlencode({"limit": rng.choice((10, 20, 50))})
+
+
+def _obras_geo(rng: random.Random, catalog: Catalog) -> str:
+    fmt = rng.choices(("json", "columnar", "binary"), (5, 3, 2))[0]
+    return "/api/obras_geo?" + urlencode({"format": fmt})
+
+
+def _mapa(rng: random.Random, catalog: Catalog) -> str:
+    return "/mapa"
+
+
+BUILDERS: Dict[str, Callable[[random.Random, Catalog], str]] = {
+    "obras": _obras,
+    "obras_page": _obras_page,
+    "autores": _autores,
+    "autor_detail": _autor_detail,
+    "obras_geo": _obras_geo,
+    "mapa": _mapa,
+}
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, float]:
+    """Parse ``obras=3,mapa=1``; routes left out get weight 0."""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix: Dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in BUILDERS:
+            raise ValueError(f"Ruta desconocida en la mezcla: '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def generate_plan(mix: Dict[str, float], catalog: Catalog, seed: int) -> Iterator[Tuple[str, str]]:
+    """Endless ``(route, path)`` sequence; the same seed replays the same requests."""
+    rng = random.Random(seed)
+    routes = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in routes]
+    while True:
+        route = rng.choices(routes, weights)[0]
+        yield route, BUILDERS[route](rng, catalog)
+
+
+def read_plan(path: Path) -> List[Tuple[str, str]]:
+    with Path(path).open(encoding="utf-8") as handle:
+        return [tuple(json.loads(line)) for line in handle if line.strip()]
+
+
+# -------- Ejecución --------
+
+
+class Recorder:
+    """Thread-safe latencies (ms) and status codes per route."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+
+    def add(self, route: str, status: str, latency_ms: float) -> None:
+        with self._lock:
+            self.latencies.setdefault(route, []).append(latency_ms)
+            self.statuses.setdefault(route, Counter())[status] += 1
+
+
+class Client:
+    """One keep-alive HTTP connection per thread."""
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.factory = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.factory(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def get(self, path: str) -> str:
+        """Return the status code, or the exception class name on failure."""
+        conn = self._connection()
+        try:
+            conn.request("GET", self.prefix + path, headers={"Accept-Encoding": "gzip, br"})
+            response = conn.getresponse()
+            response.read()
+            return str(response.status)
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            self._local.conn = None
+            return type(exc).__name__
+
+
+def _issue(client: Client, recorder: Recorder, route: str, path: str, intended: float) -> None:
+    status = client.get(path)
+    # Latencia desde el instante previsto: incluye la espera si el cliente va atrasado.
+    recorder.add(route, status, (time.perf_counter() - intended) * 1000)
+
+
+def run_closed(
+    client: Client,
+    plan: Iterator[Tuple[str, str]],
+    *,
+    concurrency: int,
+    requests: Optional[int],
+    duration: Optional[float],
+) -> Tuple[Recorder, float]:
+    """Each of ``concurrency`` workers sends its next request as soon as the last one ends."""
+    recorder = Recorder()
+    source = itertools.islice(plan, requests) if requests else plan
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration if duration else math.inf
+
+    def worker() -> None:
+        while time.perf_counter() < deadline:
+            with lock:
+                item = next(source, None)
+            if item is None:
+                return
+            _issue(client, recorder, item[0], item[1], time.perf_counter())
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - started
+
+
+def run_open(
+    client: Client,
+    plan: Iterator[Tuple[str, str]],
+    *,
+    rate: float,
+    concurrency: int,
+    requests: Optional[int],
+    duration: Optional[float],
+) -> Tuple[Recorder, float]:
+    """Send requests at ``rate`` per second regardless of how fast responses come back."""
+    recorder = Recorder()
+    total = requests if requests else int(rate * (duration or 0))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for position, (route, path) in enumerate(itertools.islice(plan, total)):
+            intended = started + position / rate
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(_issue, client, recorder, route, path, intended)
+    return recorder, time.perf_counter() - started
+
+
+# -------- Informe --------
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _route_summary(latencies: List[float], statuses: Counter) -> Dict[str, Any]:
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    summary: Dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "max_ms": round(max(latencies), 3) if latencies else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(_percentile(latencies, pct), 3) if latencies else 0.0
+    return summary
+
+
+def summarize(recorder: Recorder, elapsed: float, config: Dict[str, Any]) -> Dict[str, Any]:
+    routes = {
+        route: _route_summary(latencies, recorder.statuses[route])
+        for route, latencies in sorted(recorder.latencies.items())
+    }
+    every = [value for latencies in recorder.latencies.values() for value in latencies]
+    statuses = sum(recorder.statuses.values(), Counter())
+    return {
+        "config": config,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(every) / elapsed, 2) if elapsed else 0.0,
+        "total": _route_summary(every, statuses),
+        "routes": routes,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-route percentile deltas (ms and %) of ``current`` against ``baseline``."""
+    rows = []
+    names = sorted(set(current["routes"]) | set(baseline["routes"])) + ["total"]
+    for name in names:
+        now = current["total"] if name == "total" else current["routes"].get(name)
+        before = baseline["total"] if name == "total" else baseline["routes"].get(name)
+        if now is None or before is None:
+            continue
+        row: Dict[str, Any] = {"route": name}
+        for key in [f"p{pct}_ms" for pct in PERCENTILES] + ["error_rate"]:
+            delta = now[key] - before[key]
+            row[key] = now[key]
+            row[f"{key}_delta"] = round(delta, 3)
+            row[f"{key}_pct"] = round(delta / before[key] * 100, 1) if before[key] else None
+        rows.append(row)
+    return rows
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['total']['requests']} peticiones en {result['elapsed_s']} s "
+        f"({result['throughput_rps']} req/s)"
+    )
+    header = f"{'ruta':<14}{'n':>7}{'errores':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    for name, stats in [*result["routes"].items(), ("total", result["total"])]:
+        print(
+            f"{name:<14}{stats['requests']:>7}{stats['errors']:>9}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'ruta':<14}{'p50 Δ%':>10}{'p95 Δ%':>10}{'p99 Δ%':>10}{'errores Δ':>11}")
+
+    def pct(value: Optional[float]) -> str:
+        return "—" if value is None else f"{value:+.1f}"
+
+    for row in rows:
+        print(
+            f"{row['route']:<14}{pct(row['p50_ms_pct']):>10}{pct(row['p95_ms_pct']):>10}"
+            f"{pct(row['p99_ms_pct']):>10}{row['error_rate_delta']:>+11.4f}"
+        )
+
+
+# -------- Repositorio simulado --------
+
+
+class _StubConnection:
+    closed = False
+
+    def rollback(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+    def cursor(self):
+        raise RuntimeError("El repositorio simulado no ejecuta SQL")
+
+
+def stub_patches(
+    catalog: Catalog, *, scale: int = 1, latency_ms: float = 0.0
+) -> List[Tuple[Any, str, Any]]:
+    """Return ``(module, name, replacement)`` triples that serve the CSV from memory.
+
+    The repository functions used by the services are replaced so the app
+    runs without PostgreSQL; ``latency_ms`` simulates the database round trip.
+    The LISTEN thread is disabled since there is no server to notify it.
+    """
+    import app.services.autores_service as autores_service
+    import app.services.dataset_service as dataset_service
+    import app.services.obras_service as obras_service
+    import app.utils.database as database
+    from app import settings
+    from app.models import Autor, Obra
+
+    def number(value: Optional[str], kind: Callable) -> Any:
+        try:
+            return kind(value) if value not in (None, "") else None
+        except ValueError:
+            return None
+
+    autor_ids: Dict[str, int] = {}
+    obras: List[Obra] = []
+    for copy in range(scale):
+        for row in catalog.rows:
+            nombre = row.get("author") or "Autor desconocido"
+            autor_id = autor_ids.setdefault(nombre, len(autor_ids) + 1)
+            obras.append(
+                Obra(
+                    len(obras) + 1,
+                    row.get("name") if copy == 0 else f"{row.get('name')} {copy + 1}",
+                    autor_id,
+                    nombre,
+                    number(row.get("year"), int),
+                    row.get("type") or None,
+                    row.get("area") or None,
+                    None,
+                    row.get("general-direction") or None,
+                    None,
+                    number(row.get("latitude"), float),
+                    number(row.get("longitude"), float),
+                )
+            )
+    obras.sort(key=lambda obra: (obra.anio is None, -(obra.anio or 0), obra.id))
+    totals = Counter(obra.autor_id for obra in obras)
+    autores = sorted(
+        (Autor(autor_id, nombre, totals[autor_id]) for nombre, autor_id in autor_ids.items()),
+        key=lambda autor: autor.nombre,
+    )
+    by_id = {autor.id: autor for autor in autores}
+
+    def wait() -> None:
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+    def page(rows: list, limit: int, offset: int, count: str) -> Tuple[list, Optional[int]]:
+        return rows[offset : offset + limit], None if count == "none" else len(rows)
+
+    def matches(obra: Obra, comuna, tipo, anio, near) -> bool:
+        if comuna and obra.comuna != comuna or tipo and obra.tipo != tipo:
+            return False
+        if anio is not None and obra.anio != anio:
+            return False
+        if near:
+            if obra.lat is None or obra.lon is None:
+                return False
+            dlat = math.radians(obra.lat - near["lat"])
+            dlon = math.radians(obra.lon - near["lon"]) * math.cos(math.radians(near["lat"]))
+            return 6_371_008.8 * math.hypot(dlat, dlon) <= near["radius"]
+        return True
+
+    def list_obras(
+        conn,
+        *,
+        autor=None,
+        comuna=None,
+        tipo=None,
+        anio=None,
+        near=None,
+        limit,
+        offset,
+        count="exact",
+        fields=None,
+    ):
+        wait()
+        needle = autor.lower() if autor else None
+        rows = [
+            obra
+            for obra in obras
+            if (needle is None or needle in obra.autor.lower())
+            and matches(obra, comuna, tipo, anio, near)
+        ]
+        return page(rows, limit, offset, count)
+
+    def list_obras_by_autor(
+        conn,
+        autor_id,
+        *,
+        comuna=None,
+        tipo=None,
+        anio=None,
+        limit,
+        offset,
+        count="exact",
+        fields=None,
+    ):
+        wait()
+        rows = [
+            obra
+            for obra in obras
+            if obra.autor_id == autor_id and matches(obra, comuna, tipo, anio, None)
+        ]
+        return page(rows, limit, offset, count)
+
+    def list_autores(
+        conn, *, nombre=None, min_obras=None, max_obras=None, limit, offset, count="exact"
+    ):
+        wait()
+        needle = nombre.lower() if nombre else None
+        rows = [
+            autor
+            for autor in autores
+            if (needle is None or needle in autor.nombre.lower())
+            and (min_obras is None or autor.total_obras >= min_obras)
+            and (max_obras is None or autor.total_obras <= max_obras)
+        ]
+        return page(rows, limit, offset, count)
+
+    def get_autor(conn, autor_id, *, with_total=False):
+        wait()
+        autor = by_id.get(autor_id)
+        if autor is None or with_total:
+            return autor
+        return Autor(autor.id, autor.nombre)
+
+    return [
+        (settings, "INVALIDATION_ENABLED", False),
+        (database.psycopg2, "connect", lambda *args, **kwargs: _StubConnection()),
+        (dataset_service, "get_dataset_version", lambda conn: 1),
+        (obras_service, "list_obras", list_obras),
+        (obras_service, "list_obras_by_autor", list_obras_by_autor),
+        (autores_service, "list_autores", list_autores),
+        (autores_service, "get_autor", get_autor),
+    ]
+
+
+def serve_stub(catalog: Catalog, *, scale: int, latency_ms: float):
+    """Start ``create_app()`` on the stubbed repository; returns the werkzeug server."""
+    import logging
+
+    from werkzeug.serving import make_server
+
+    for module, name, value in stub_patches(catalog, scale=scale, latency_ms=latency_ms):
+        setattr(module, name, value)
+    from app.web.flask_app import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-app", daemon=True).start()
+    return server
+
+
+# -------- CLI --------
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base de la app, p. ej. http://127.0.0.1:8000")
+    target.add_argument(
+        "--stub", action="store_true", help="Levantar la app local con el repositorio simulado"
+    )
+    parser.add_argument("--mix", help="Pesos por ruta, p. ej. obras=3,mapa=1")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conexiones simultáneas")
+    parser.add_argument("--rate", type=float, help="Peticiones por segundo (carga abierta)")
+    parser.add_argument("--requests", type=int, help="Número de peticiones")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos (sin --requests)")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de la mezcla reproducible")
+    parser.add_argument("--plan", type=Path, help="Reproducir un plan guardado con --save-plan")
+    parser.add_argument("--save-plan", type=Path, help="Guardar las peticiones generadas (JSONL)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout por petición")
+    parser.add_argument("--stub-scale", type=int, default=20, help="Copias del CSV en --stub")
+    parser.add_argument(
+        "--stub-latency-ms", type=float, default=1.0, help="Latencia simulada de la BD en --stub"
+    )
+    parser.add_argument("--out", type=Path, help="Archivo JSON de resultados")
+    parser.add_argument("--compare", type=Path, help="Resultados previos con los que comparar")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    catalog = load_catalog()
+    requests = args.requests
+    duration = None if requests else args.duration
+
+    if args.plan:
+        saved = read_plan(args.plan)
+        plan: Iterator[Tuple[str, str]] = iter(saved)
+        requests = requests or len(saved)
+        duration = None
+    else:
+        plan = generate_plan(mix, catalog, args.seed)
+    if args.save_plan:
+        count = requests or int((args.rate or 0) * (duration or 0)) or 10_000
+        saved = list(itertools.islice(plan, count))
+        args.save_plan.parent.mkdir(parents=True, exist_ok=True)
+        args.save_plan.write_text(
+            "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in saved),
+            encoding="utf-8",
+        )
+        plan = iter(saved)
+
+    server = None
+    base_url = args.url
+    if args.stub:
+        server = serve_stub(catalog, scale=args.stub_scale, latency_ms=args.stub_latency_ms)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    client = Client(base_url, args.timeout)
+    config = {
+        "target": "stub" if args.stub else args.url,
+        "mode": "open" if args.rate else "closed",
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "requests": requests,
+        "duration": duration,
+        "seed": None if args.plan else args.seed,
+        "plan": str(args.plan) if args.plan else None,
+        "mix": mix,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    try:
+        if args.rate:
+            recorder, elapsed = run_open(
+                client,
+                plan,
+                rate=args.rate,
+                concurrency=args.concurrency,
+                requests=requests,
+                duration=duration,
+            )
+        else:
+            recorder, elapsed = run_closed(
+                client, plan, concurrency=args.concurrency, requests=requests, duration=duration
+            )
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    result = summarize(recorder, elapsed, config)
+    print_report(result)
+
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Resultados guardados en {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print(f"\nComparación con {args.compare}")
+        print_comparison(compare(result, baseline))
+    return 1 if result["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
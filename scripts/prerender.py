@@ -0,0 +1,188 @@
+"""Pre-render the public catalog to static HTML/JSON with .gz/.br siblings.
+
+Pages are produced by the real Flask app (test client), so the output matches
+what the server would return. A manifest keeps the dataset version and a hash
+per file: when the version did not change nothing is rendered. When it did,
+the whole catalog is rendered again (cost proportional to the catalog, not to
+what changed) and only files whose content changed are rewritten and
+recompressed.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app.repositories.dataset_repository import get_dataset_version
+from app.services.autores_service import MAX_LIMIT as AUTORES_MAX_LIMIT
+from app.services.obras_service import DEFAULT_LIMIT
+from app.utils.database import get_read_connection
+
+try:  # Dependencia opcional: genera los hermanos .br.
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+DEFAULT_OUT = PROJECT_ROOT / "dist" / "static"
+MANIFEST = "manifest.json"
+SIBLINGS = (".gz", ".br")
+# Formatos ya comprimidos: no se generan hermanos.
+PRECOMPRESSED_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".woff2"}
+
+
+def _get(client, url: str) -> bytes:
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} respondió {response.status_code}")
+    return response.get_data()
+
+
+def _get_json(client, url: str) -> dict:
+    return json.loads(_get(client, url))
+
+
+def _paged_html(client, api_url: str, page_url: str, prefix: str) -> Iterator[Tuple[str, bytes]]:
+    total = _get_json(client, f"{api_url}?limit=1&count=exact")["meta"]["total"]
+    pages = max(1, math.ceil(total / DEFAULT_LIMIT))
+    for page in range(pages):
+        offset = page * DEFAULT_LIMIT
+        yield (
+            f"{prefix}/offset-{offset}.html",
+            _get(client, f"{page_url}?offset={offset}&count=exact"),
+        )
+
+
+def _autor_ids(client) -> Iterator[int]:
+    offset = 0
+    while True:
+        data = _get_json(client, f"/autores?limit={AUTORES_MAX_LIMIT}&offset={offset}&count=none")
+        for item in data["items"]:
+            yield item["id"]
+        if not data["meta"]["has_next"]:
+            return
+        offset = data["meta"]["next_offset"]
+
+
+def iter_pages(client) -> Iterator[Tuple[str, bytes]]:
+    """Yield ``(relative path, body)`` for every public page and static asset."""
+    yield from _paged_html(client, "/obras", "/obras/page", "obras/page")
+    yield from _paged_html(client, "/autores", "/autores/page", "autores/page")
+    for autor_id in list(_autor_ids(client)):
+        yield f"autores/{autor_id}.json", _get(client, f"/autores/{autor_id}")
+    yield "api/obras_geo.json", _get(client, "/api/obras_geo")
+    yield "api/obras_geo.columnar.json", _get(client, "/api/obras_geo?format=columnar")
+    yield "api/obras_geo.bin", _get(client, "/api/obras_geo?format=binary")
+    # Assets con y sin hash: las páginas enlazan los primeros y leaflet.css los segundos.
+    for asset in client.application.extensions["assets"].by_name.values():
+        yield f"assets/{asset.hashed_name}", asset.body
+        yield f"assets/{asset.name}", asset.body
+
+
+def _write(path: Path, body: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    if path.suffix.lower() in PRECOMPRESSED_SUFFIXES:
+        return
+    # mtime=0: el .gz no cambia si el contenido no cambia.
+    Path(f"{path}.gz").write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+    if _brotli is not None:
+        Path(f"{path}.br").write_bytes(_brotli.compress(body, quality=11))
+
+
+def _remove(path: Path) -> None:
+    for candidate in (path, *(Path(f"{path}{suffix}") for suffix in SIBLINGS)):
+        candidate.unlink(missing_ok=True)
+
+
+def _read_manifest(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _current_version() -> int:
+    conn = get_read_connection()
+    try:
+        return get_dataset_version(conn)
+    finally:
+        conn.close()
+
+
+def build(out_dir: Path, *, force: bool = False, app=None) -> Dict[str, int]:
+    """Render the catalog into ``out_dir`` and return written/unchanged/removed counts.
+
+    Incremental only on output: any new dataset version (or ``force``)
+    renders every page through the app, O(catalog) requests, and the hashes
+    in the manifest then skip the disk writes and compression of unchanged
+    files. There is no per-page dependency tracking.
+    """
+    out_dir = Path(out_dir)
+    manifest = _read_manifest(out_dir)
+    previous: Dict[str, str] = manifest.get("files", {})
+    version = _current_version()
+    if not force and previous and manifest.get("dataset_version") == version:
+        return {"written": 0, "unchanged": len(previous), "removed": 0}
+
+    if app is None:
+        from app.web.flask_app import create_app
+
+        app = create_app()
+    client = app.test_client()
+
+    files: Dict[str, str] = {}
+    written = 0
+    for relpath, body in iter_pages(client):
+        digest = hashlib.sha256(body).hexdigest()
+        files[relpath] = digest
+        if previous.get(relpath) == digest and (out_dir / relpath).exists():
+            continue
+        _write(out_dir / relpath, body)
+        written += 1
+
+    stale = set(previous) - set(files)
+    for relpath in stale:
+        _remove(out_dir / relpath)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / MANIFEST).write_text(
+        json.dumps({"dataset_version": version, "files": files}, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
+    return {"written": written, "unchanged": len(files) - written, "removed": len(stale)}
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        epilog=(
+            "Cada versión nueva del dataset vuelve a renderizar el catálogo completo "
+            "(costo proporcional al número de páginas); solo se omiten la escritura y "
+            "la compresión de los archivos cuyo contenido no cambió."
+        ),
+    )
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Directorio de salida")
+    parser.add_argument(
+        "--force", action="store_true", help="Renderizar aunque la versión no haya cambiado"
+    )
+    args = parser.parse_args(argv)
+
+    result = build(args.out, force=args.force)
+    print(
+        f"{result['written']} archivos escritos, {result['unchanged']} sin cambios, "
+        f"{result['removed']} eliminados en {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
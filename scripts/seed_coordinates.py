@@ -9,7 +9,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from contextlib import closing
 
-from app.utils.database import get_connection
+from app.repositories.dataset_repository import bump_dataset_version
+from app.services.neighbours_service import refresh_after_load
+from app.utils import geohash
+from app.utils.database import get_write_connection
 
 OBRAS_COORDS = [
     {"nombre": "cacique nutibara - cerro nutibara", "lat": 6.2447, "lon": -75.5794},
@@ -25,24 +28,33 @@ OBRAS_COORDS = [
 def update_coordinates() -> None:
     update_sql = """
         UPDATE obras
-        SET ubicacion = ST_SetSRID(ST_MakePoint(%(lon)s, %(lat)s), 4326)::GEOGRAPHY
+        SET ubicacion = ST_SetSRID(ST_MakePoint(%(lon)s, %(lat)s), 4326)::GEOGRAPHY,
+            geohash = %(geohash)s
         WHERE nombre = %(nombre)s
     """
 
     updated = 0
     missing: list[str] = []
 
-    with closing(get_connection()) as conn, closing(conn.cursor()) as cur:
+    with closing(get_write_connection()) as conn, closing(conn.cursor()) as cur:
         for obra in OBRAS_COORDS:
-            cur.execute(update_sql, obra)
+            cur.execute(update_sql, {**obra, "geohash": geohash.encode(obra["lat"], obra["lon"])})
             if cur.rowcount == 0:
                 missing.append(obra["nombre"])
             else:
                 updated += cur.rowcount
+        dataset_version = bump_dataset_version(conn) if updated else None
         conn.commit()
 
+    # Solo se recalculan los vecindarios de las obras que se movieron.
+    neighbours = refresh_after_load() if updated else None
+
     print("✅ Coordenadas aplicadas.")
     print(f"   Obras actualizadas: {updated}")
+    if dataset_version is not None:
+        print(f"   Versión del dataset: {dataset_version}")
+    if neighbours is not None:
+        print(f"   Vecinos recalculados: {neighbours['recalculadas']} de {neighbours['obras']}")
     if missing:
         print("   No se encontró registro para:")
         for nombre in missing:
@@ -0,0 +1,121 @@
+"""Summarize the slow-query log by query shape (filter combination)."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app import settings
+
+SORT_KEYS = ("total", "max", "p95", "count")
+
+
+def _log_files(path: Path) -> List[Path]:
+    """Return the active log plus its rotated backups (oldest first)."""
+    rotated = sorted(
+        path.parent.glob(path.name + ".*"),
+        key=lambda item: int(item.suffix[1:]) if item.suffix[1:].isdigit() else 0,
+        reverse=True,
+    )
+    return [item for item in [*rotated, path] if item.exists()]
+
+
+def read_entries(path: Path) -> Iterator[Dict[str, object]]:
+    """Yield JSON entries from the log and its backups, skipping broken lines."""
+    for log_file in _log_files(path):
+        with log_file.open(encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _plan_cost(entry: Dict[str, object]) -> float | None:
+    plan = entry.get("plan")
+    if isinstance(plan, list) and plan and isinstance(plan[0], dict):
+        return plan[0].get("Plan", {}).get("Total Cost")
+    return None
+
+
+def summarize(
+    entries: Iterable[Dict[str, object]], *, sort: str = "total"
+) -> List[Dict[str, object]]:
+    """Group entries by source, statement and shape with latency statistics."""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, object]]] = {}
+    for entry in entries:
+        key = (
+            str(entry.get("source", "?")),
+            str(entry.get("statement", "?")),
+            str(entry.get("shape", "?")),
+        )
+        groups.setdefault(key, []).append(entry)
+
+    summary = []
+    for (source, statement, shape), items in groups.items():
+        elapsed = [float(item.get("elapsed_ms", 0.0)) for item in items]
+        costs = [cost for cost in (_plan_cost(item) for item in items) if cost is not None]
+        summary.append(
+            {
+                "source": source,
+                "statement": statement,
+                "shape": shape,
+                "count": len(items),
+                "total": round(sum(elapsed), 3),
+                "mean": round(sum(elapsed) / len(elapsed), 3),
+                "p95": round(_percentile(elapsed, 95), 3),
+                "max": round(max(elapsed), 3),
+                "max_cost": max(costs) if costs else None,
+            }
+        )
+
+    summary.sort(key=lambda row: row[sort], reverse=True)
+    return summary
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--log", default=settings.SLOW_QUERY_LOG_PATH, help="Ruta del log")
+    parser.add_argument("--top", type=int, default=20, help="Cantidad de formas a mostrar")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="total")
+    args = parser.parse_args(argv)
+
+    path = Path(args.log)
+    if not _log_files(path):
+        print(f"No se encontró el log en {path}")
+        return 1
+
+    rows = summarize(read_entries(path), sort=args.sort)[: args.top]
+    header = (
+        f"{'fuente':<20} {'sentencia':<9} {'n':>5} {'total ms':>10} "
+        f"{'p95 ms':>9} {'max ms':>9} {'costo':>10}  forma"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        cost = "-" if row["max_cost"] is None else f"{row['max_cost']:.0f}"
+        print(
+            f"{row['source']:<20} {row['statement']:<9} {row['count']:>5} "
+            f"{row['total']:>10.1f} {row['p95']:>9.1f} {row['max']:>9.1f} "
+            f"{cost:>10}  {row['shape']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""Download pinned third-party front-end libraries into app/web/static/vendor.
+
+Files with a known Subresource Integrity hash are verified before being
+written, so the vendored copy is byte-identical to the one the templates
+declare in their ``integrity`` attributes. ``--check`` only verifies an
+existing copy; the Docker build runs both so an image never ships without it.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import urllib.request
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+VENDOR_DIR = PROJECT_ROOT / "app" / "web" / "static" / "vendor"
+
+LEAFLET_VERSION = "1.9.4"
+LEAFLET_BASE = f"https://unpkg.com/leaflet@{LEAFLET_VERSION}/"
+
+# (archivo en el paquete, destino bajo vendor/, sha256 SRI o None)
+FILES: Sequence[Tuple[str, str, Optional[str]]] = (
+    (
+        "dist/leaflet.js",
+        "leaflet/leaflet.js",
+        "sha256-20nQCchB9co0qIjJZRGuk2/Z9VM+kNiyxNV1lvTlZBo=",
+    ),
+    (
+        "dist/leaflet.css",
+        "leaflet/leaflet.css",
+        "sha256-p4NxAoJBhIIN+hmNHrzRCf9tD/miZyoHS5obTRR9BMY=",
+    ),
+    ("dist/images/layers.png", "leaflet/images/layers.png", None),
+    ("dist/images/layers-2x.png", "leaflet/images/layers-2x.png", None),
+    ("dist/images/marker-icon.png", "leaflet/images/marker-icon.png", None),
+    ("dist/images/marker-icon-2x.png", "leaflet/images/marker-icon-2x.png", None),
+    ("dist/images/marker-shadow.png", "leaflet/images/marker-shadow.png", None),
+    ("LICENSE", "leaflet/LICENSE", None),
+)
+
+
+def sri(body: bytes) -> str:
+    return "sha256-" + base64.b64encode(hashlib.sha256(body).digest()).decode()
+
+
+def fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def vendor(target: Path = VENDOR_DIR) -> int:
+    for source, destination, integrity in FILES:
+        body = fetch(LEAFLET_BASE + source)
+        if integrity is not None and sri(body) != integrity:
+            raise RuntimeError(f"{source}: hash {sri(body)} no coincide con {integrity}")
+        path = target / destination
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        print(f"{destination} ({len(body)} bytes)")
+    return len(FILES)
+
+
+def check(target: Path = VENDOR_DIR) -> list:
+    """Return the problems of the vendored copy under ``target`` (empty when complete)."""
+    problems = []
+    for _, destination, integrity in FILES:
+        path = target / destination
+        if not path.is_file():
+            problems.append(f"{destination}: falta")
+        elif integrity is not None and sri(path.read_bytes()) != integrity:
+            problems.append(f"{destination}: hash distinto de {integrity}")
+    return problems
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", type=Path, default=VENDOR_DIR, help="Directorio vendor/")
+    parser.add_argument(
+        "--check", action="store_true", help="Solo verifica la copia existente, sin descargar"
+    )
+    args = parser.parse_args(argv)
+    if not args.check:
+        vendor(args.target)
+    problems = check(args.target)
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
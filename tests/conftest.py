@@ -0,0 +1,144 @@
+import pytest
+
+from app.utils import query_stats
+
+
+class MockCursor:
+    """Cursor of :class:`MockConnection`; ``sql``/``params`` hold the last statement."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.sql = ""
+        self.params = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def mogrify(self, template, args):
+        # Suficiente para psycopg2.extras.execute_values: los valores quedan legibles en el SQL.
+        return repr(tuple(args)).encode("utf-8")
+
+    def execute(self, sql, params=None):
+        if isinstance(sql, bytes):
+            sql = sql.decode("utf-8")
+        self.sql, self.params = sql, params
+        self.connection.queries.append((sql, params))
+
+    def fetchone(self):
+        return self.connection.answer("fetchone", self)
+
+    def fetchall(self):
+        return self.connection.answer("fetchall", self)
+
+    def close(self):
+        return None
+
+
+class MockConnection:
+    """psycopg2 stand-in recording ``(sql, params)`` in ``queries``.
+
+    Each fetch pops the next queued ``fetchone_results``/``fetchall_results``
+    entry; once the queue is empty it uses ``fetchone``/``fetchall``, either a
+    fixed value or ``callable(cursor)`` deciding from ``cursor.sql`` and
+    ``cursor.params``. Extra keyword arguments become attributes (``host``,
+    ``version``, ``prepared_statements``...).
+    """
+
+    encoding = "UTF8"
+
+    def __init__(
+        self,
+        *,
+        fetchone_results=None,
+        fetchall_results=None,
+        fetchone=None,
+        fetchall=(),
+        queries=None,
+        **attributes,
+    ):
+        self.queries = queries if queries is not None else []
+        self.fetchone_results = list(fetchone_results or [])
+        self.fetchall_results = list(fetchall_results or [])
+        self.defaults = {"fetchone": fetchone, "fetchall": fetchall}
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+        self.autocommit = False
+        self.notifies = []
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+    @property
+    def statements(self):
+        return [sql for sql, _ in self.queries]
+
+    def answer(self, method, cursor):
+        queue = self.fetchone_results if method == "fetchone" else self.fetchall_results
+        if queue:
+            return queue.pop(0)
+        default = self.defaults[method]
+        if callable(default):
+            return default(cursor)
+        return list(default) if method == "fetchall" else default
+
+    def cursor(self):
+        return MockCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def poll(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def mock_connection():
+    """Return the :class:`MockConnection` class, to build connections inside tests."""
+    return MockConnection
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """Install a fake ``psycopg2.connect``.
+
+    ``mock_db(connection)`` hands out that connection on every connect and
+    ``mock_db(connect)`` delegates to the callable. ``mock_db(**options)``
+    builds a fresh ``MockConnection(**options)`` per connect and returns the
+    list they are appended to.
+    """
+
+    def install(target=None, **options):
+        if target is None:
+            target = []
+
+            def connect(*args, **kwargs):
+                target.append(MockConnection(**options))
+                return target[-1]
+
+        elif callable(target):
+            connect = target
+        else:
+            connect = lambda *args, **kwargs: target  # noqa: E731
+        monkeypatch.setattr("app.utils.database.psycopg2.connect", connect)
+        return target
+
+    return install
+
+
+@pytest.fixture
+def query_budget():
+    """Return ``query_stats.budget``: ``with query_budget(connections=1, statements=2):``.
+
+    The block fails when it opens more connections, runs more statements or
+    fetches more rows than declared, or repeats an identical statement.
+    """
+    return query_stats.budget
@@ -55,6 +55,19 @@ def load_data():
                 ),
             )
 
+    # Invalida las cachés de la aplicación (ver tabla dataset_version)
+    cur.execute(
+        "INSERT INTO dataset_version (id, version) VALUES (TRUE, 1) "
+        "ON CONFLICT (id) DO UPDATE SET version = dataset_version.version + 1, updated_at = NOW() "
+        "RETURNING version;"
+    )
+    # Avisa a los workers al confirmar (ver app/services/invalidation_service.py)
+    cur.execute(
+        "SELECT pg_notify('pm_dataset_version', json_build_object("
+        "'version', %s, 'sent_at', EXTRACT(EPOCH FROM clock_timestamp()))::text);",
+        (cur.fetchone()[0],),
+    )
+
     conn.commit()
     cur.close()
     conn.close()
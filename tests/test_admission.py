@@ -0,0 +1,89 @@
+import runpy
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.web import admission
+from app.web.admission import HIGH, LOW, NORMAL, AdmissionController
+from app.web.flask_app import create_app
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr("app.settings.ADMISSION_MAX_CONCURRENT", 4)
+    monkeypatch.setattr("app.settings.ADMISSION_RESERVED_HIGH", 1)
+    monkeypatch.setattr("app.settings.ADMISSION_LOW_SHARE", 0.5)
+    monkeypatch.setattr("app.settings.ADMISSION_MAX_QUEUE", 4)
+
+
+def test_lower_priorities_leave_room_for_cheap_requests(limits):
+    controller = AdmissionController()
+
+    assert [controller.acquire(LOW, timeout=0) for _ in range(3)] == [True, True, False]
+    assert controller.acquire(NORMAL, timeout=0)
+    assert not controller.acquire(NORMAL, timeout=0)
+    assert controller.acquire(HIGH, timeout=0)
+    assert not controller.acquire(HIGH, timeout=0)
+
+    stats = controller.stats()
+    assert stats["in_flight"] == 4
+    assert stats["shed"] == {"high": 1, "normal": 1, "low": 1}
+
+
+def test_waiter_admitted_when_slot_frees(limits):
+    controller = AdmissionController()
+    for _ in range(4):
+        controller.acquire(HIGH, timeout=0)
+
+    result = {}
+    waiter = threading.Thread(
+        target=lambda: result.setdefault("ok", controller.acquire(HIGH, timeout=2))
+    )
+    waiter.start()
+    threading.Timer(0.05, controller.release).start()
+    waiter.join(3)
+
+    assert result["ok"] is True
+    assert controller.stats()["wait_ms_max"] > 0
+
+
+def test_waiter_times_out(limits):
+    controller = AdmissionController()
+    for _ in range(4):
+        controller.acquire(HIGH, timeout=0)
+
+    assert not controller.acquire(HIGH, timeout=0.01)
+    assert controller.stats()["shed_reasons"]["timeout"] == 1
+
+
+def test_saturated_worker_returns_503_with_retry_after(limits, monkeypatch):
+    monkeypatch.setattr(admission, "controller", AdmissionController())
+    monkeypatch.setattr("app.settings.ADMISSION_QUEUE_TIMEOUT", 0.0)
+    client = create_app().test_client()
+    for _ in range(4):
+        admission.controller.acquire(HIGH, timeout=0)
+
+    response = client.get("/api/obras_geo")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+    # Las métricas no pasan por el limitador.
+    metrics = client.get("/api/metrics")
+    assert metrics.status_code == 200
+    assert "admission" in metrics.get_json()
+
+
+def test_metrics_token_is_required_when_configured(monkeypatch):
+    monkeypatch.setattr("app.settings.METRICS_TOKEN", "interno")
+    client = create_app().test_client()
+
+    assert client.get("/api/metrics").status_code == 401
+    response = client.get("/api/metrics", headers={"Authorization": "Bearer interno"})
+    assert response.status_code == 200
+
+
+def test_gunicorn_threads_leave_room_for_the_admission_queue(monkeypatch, limits):
+    monkeypatch.setenv("GUNICORN_THREADS", "2")
+    config = runpy.run_path(str(Path(__file__).resolve().parents[1] / "gunicorn.conf.py"))
+    assert config["threads"] == 8
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+
+from app.web.flask_app import create_app
+from scripts import vendor_assets
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.settings.JINJA_BYTECODE_CACHE_DIR", str(tmp_path / "jinja"))
+    return create_app().test_client()
+
+
+def test_pages_link_fingerprinted_assets(client):
+    html = client.get("/").get_data(as_text=True)
+    manifest = client.application.extensions["assets"]
+    styles = manifest.by_name["css/styles.css"]
+
+    assert f"/assets/{styles.hashed_name}" in html
+    assert "/static/css/styles.css" not in html
+
+
+def test_hashed_asset_is_immutable_and_precompressed(client):
+    styles = client.application.extensions["assets"].by_name["css/styles.css"]
+
+    response = client.get(f"/assets/{styles.hashed_name}", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == styles.body
+
+    again = client.get(
+        f"/assets/{styles.hashed_name}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+    )
+    assert again.status_code == 304
+
+
+def test_unhashed_names_get_short_cache_and_unknown_404(client):
+    response = client.get("/assets/css/styles.css")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+    assert "Content-Encoding" not in response.headers
+    assert client.get("/assets/css/nope.css").status_code == 404
+
+
+def test_map_loads_leaflet_once(client, monkeypatch):
+    html = client.get("/mapa").get_data(as_text=True)
+    assert html.count("leaflet.js") == 1
+    assert html.count("leaflet.css") == 1
+    assert "jsdelivr" not in html
+
+
+def test_vendor_check_reports_missing_and_altered_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        vendor_assets,
+        "FILES",
+        (("dist/a.js", "lib/a.js", vendor_assets.sri(b"a")), ("LICENSE", "lib/LICENSE", None)),
+    )
+    assert vendor_assets.main(["--check", "--target", str(tmp_path)]) == 1
+
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "a.js").write_bytes(b"b")
+    (tmp_path / "lib" / "LICENSE").write_text("BSD-2-Clause")
+    assert vendor_assets.check(tmp_path) == [
+        f"lib/a.js: hash distinto de {vendor_assets.sri(b'a')}"
+    ]
+
+    (tmp_path / "lib" / "a.js").write_bytes(b"a")
+    assert vendor_assets.main(["--check", "--target", str(tmp_path)]) == 0
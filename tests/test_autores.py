@@ -44,16 +44,6 @@ class MockConnection:
         return None
 
 
-class ConnectionQueue:
-    def __init__(self, connections):
-        self._connections = list(connections)
-
-    def __call__(self, *args, **kwargs):
-        if not self._connections:
-            raise RuntimeError("No hay más conexiones disponibles")
-        return self._connections.pop(0)
-
-
 @pytest.fixture
 def app_client():
     app = Flask(__name__)
@@ -85,6 +75,7 @@ def test_list_autores_with_filters(monkeypatch, app_client):
     assert data["meta"]["count"] == 2
     assert data["filters"]["nombre"] == "an"
     assert connection.queries[0][0].lower().startswith("with agg as")
+    assert "GROUP BY" in connection.queries[1][0]  # min_obras needs every total
     assert connection.queries[1][1][-2] == 10  # limit in data query
     assert connection.queries[1][1][-1] == 0  # offset defaults to 0
 
@@ -105,6 +96,7 @@ def test_list_autores_limit_capped(monkeypatch, app_client):
     assert data["meta"]["limit"] == 100
     assert data["meta"]["offset"] == 15
     assert data["meta"]["total_pages"] == 1
+    assert "GROUP BY" not in connection.queries[1][0]  # counts only the page's autores
     assert connection.queries[1][1][-2] == 100
     assert connection.queries[1][1][-1] == 15
 
@@ -135,10 +127,9 @@ def test_list_autores_no_results(monkeypatch, app_client):
     assert data["meta"]["count"] == 0
 
 
-def test_autor_detail_success(monkeypatch, app_client):
-    lookup_conn = MockConnection(fetchone_results=[(5, "Autor Detalle")])
-    obras_conn = MockConnection(
-        fetchone_results=[(2,)],
+def test_autor_detail_success(monkeypatch, app_client, query_budget):
+    connection = MockConnection(
+        fetchone_results=[(5, "Autor Detalle", 2)],
         fetchall_results=[
             [
                 (
@@ -158,15 +149,32 @@ def test_autor_detail_success(monkeypatch, app_client):
             ]
         ],
     )
-    queue = ConnectionQueue([lookup_conn, obras_conn])
-    monkeypatch.setattr("app.utils.database.psycopg2.connect", queue)
+    monkeypatch.setattr(
+        "app.utils.database.psycopg2.connect",
+        lambda *args, **kwargs: connection,
+    )
 
-    response = app_client.get("/autores/5")
+    with query_budget(connections=1, statements=2):
+        response = app_client.get("/autores/5")
     assert response.status_code == 200
     data = response.get_json()
     assert data["autor"]["id"] == 5
     assert data["obras"]["meta"]["total"] == 2
-    assert obras_conn.queries[1][1][-2] == 50  # default limit applied
+    assert connection.queries[1][1][-2] == 50  # default limit applied
+
+
+def test_autor_detail_with_filters_counts_obras(monkeypatch, app_client, query_budget):
+    connection = MockConnection(fetchone_results=[(5, "Autor Detalle", 2), (1,)])
+    monkeypatch.setattr(
+        "app.utils.database.psycopg2.connect",
+        lambda *args, **kwargs: connection,
+    )
+
+    with query_budget(connections=1, statements=3):
+        response = app_client.get("/autores/5?comuna=Comuna%2010")
+    assert response.status_code == 200
+    assert response.get_json()["obras"]["meta"]["total"] == 1
+    assert "COUNT(*)" in connection.queries[1][0]
 
 
 def test_autor_detail_not_found(monkeypatch, app_client):
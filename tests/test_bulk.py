@@ -0,0 +1,202 @@
+import io
+import json
+
+import pytest
+from flask import Flask
+
+from app.services import dataset_service
+from app.utils.record_stream import iter_json_array, iter_records
+from app.web.consistency import init_consistency
+from app.web.routes.autores_routes import autores_bp
+from app.web.routes.obras_routes import obras_bp
+
+TOKEN = "secreto"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    monkeypatch.setattr("app.settings.BULK_API_TOKEN", TOKEN)
+    app = Flask(__name__)
+    init_consistency(app)
+    app.register_blueprint(obras_bp)
+    app.register_blueprint(autores_bp)
+    yield app.test_client()
+    dataset_service.reset()
+
+
+def _ndjson(records):
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+
+def test_json_array_is_decoded_across_chunk_boundaries():
+    records = [{"nombre": "a ], b", "anio": 12345}, 678, [1, {"x": "}"}], None]
+    body = " [ " + ",\n".join(json.dumps(record) for record in records) + " ] "
+    chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+
+    assert list(iter_json_array(chunks)) == list(enumerate(records))
+    assert list(iter_json_array(["[", "]"])) == []
+
+
+def test_ndjson_skips_blank_lines_and_reports_the_bad_one():
+    body = io.BytesIO(b'{"nombre": "Ana"}\n\n{"nombre": "Bea"}\n{"nombre": \n')
+    records = iter_records(body, "application/x-ndjson")
+    assert next(records) == (0, {"nombre": "Ana"})
+    assert next(records) == (1, {"nombre": "Bea"})
+    with pytest.raises(ValueError, match="línea 4"):
+        next(records)
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ('{"nombre": "Ana"}', "arreglo JSON"),
+        ('[{"nombre": "Ana"} {"nombre": "Bea"}]', "después del registro 0"),
+        ('[{"nombre": "Ana"}', "incompleto"),
+        ('[{"nombre": "Ana"}, {"nombre": ', "registro 1"),
+        ("[] []", "después del arreglo"),
+    ],
+)
+def test_malformed_json_bodies_are_rejected(body, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_records(io.BytesIO(body.encode("utf-8")), "application/json"))
+
+
+def test_bulk_endpoints_require_a_token(app_client, monkeypatch):
+    response = app_client.post("/obras/bulk", json=[], headers={"Authorization": "Bearer otro"})
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"].startswith("Bearer")
+
+    monkeypatch.setattr("app.settings.BULK_API_TOKEN", None)
+    response = app_client.post("/autores/bulk", json=[], headers=AUTH)
+    assert response.status_code == 403
+
+
+def test_obras_bulk_upserts_in_batches_and_bumps_the_version_once(
+    app_client, monkeypatch, query_budget, mock_connection, mock_db
+):
+    monkeypatch.setattr("app.settings.BULK_BATCH_SIZE", 2)
+    connection = mock_connection(
+        fetchone_results=[(8,)],
+        fetchall_results=[
+            [("Ana", 1)],  # autores por nombre
+            [("Obra B", 1, 10)],  # obras existentes por (nombre, autor_id)
+            [(11, "Obra A", 1)],  # obras insertadas
+            [(1,)],  # autor_id conocidos
+            [(12,)],  # id de obras conocidos
+        ],
+    )
+    mock_db(connection)
+    records = [
+        {"nombre": "Obra A", "autor": "Ana", "lat": 6.25, "lon": -75.56},
+        {"nombre": "Obra B", "autor": "Ana", "anio": 1990},
+        {"nombre": "Sin autor"},
+        {"id": 12, "nombre": "Obra C", "autor_id": 1},
+    ]
+
+    with query_budget(connections=1, statements=10):
+        response = app_client.post(
+            "/obras/bulk",
+            data=_ndjson(records),
+            headers={**AUTH, "Content-Type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["version"] == 8
+    assert data["summary"] == {
+        "total": 4,
+        "created": 1,
+        "updated": 2,
+        "unchanged": 0,
+        "errors": 1,
+    }
+    assert [item.get("id") for item in data["items"]] == [11, 10, None, 12]
+    assert data["items"][2]["status"] == "error"
+    assert "autor" in data["items"][2]["error"]
+
+    statements = connection.statements
+    updates = [sql for sql in statements if sql.startswith("UPDATE obras")]
+    inserts = [sql for sql in statements if sql.startswith("INSERT INTO obras")]
+    assert len(updates) == 2 and len(inserts) == 1
+    assert "'Obra A'" in inserts[0] and "'Obra B'" in updates[0]
+    assert sum("dataset_version" in sql for sql in statements) == 1
+    assert connection.commits == 1
+    assert dataset_service._version == 8
+    assert "pm_ryw=" in response.headers["Set-Cookie"]
+
+
+def test_malformed_body_rolls_back_everything(app_client, monkeypatch, mock_connection, mock_db):
+    connection = mock_connection(fetchall_results=[[("Ana", 1)], [], [(11, "Obra A", 1)]])
+    mock_db(connection)
+    monkeypatch.setattr("app.settings.BULK_BATCH_SIZE", 1)
+
+    response = app_client.post(
+        "/obras/bulk",
+        data='[{"nombre": "Obra A", "autor": "Ana"}, {"nombre": ',
+        headers={**AUTH, "Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 400
+    assert "registro 1" in response.get_json()["error"]
+    assert connection.commits == 0
+    assert connection.rollbacks == 1
+    assert not any("dataset_version" in sql for sql, _ in connection.queries)
+
+
+def test_failed_obras_do_not_create_autores(app_client, mock_connection, mock_db):
+    connection = mock_db(mock_connection())  # Ni el autor 99 ni la obra 40 existen.
+    records = [
+        {"id": 40, "nombre": "Obra A", "autor": "Nueva"},
+        {"nombre": "Obra B", "autor_id": 99},
+    ]
+
+    response = app_client.post("/obras/bulk", json=records, headers=AUTH)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["version"] is None
+    assert data["summary"]["errors"] == 2
+    assert [item["error"] for item in data["items"]] == [
+        "Obra 40 no encontrada.",
+        "Autor 99 no encontrado.",
+    ]
+    assert not any(sql.startswith("INSERT") for sql in connection.statements)
+    assert not any("dataset_version" in sql for sql in connection.statements)
+
+
+def test_autores_bulk_creates_renames_and_reports_conflicts(app_client, mock_connection, mock_db):
+    connection = mock_connection(
+        fetchone_results=[(9,)],
+        fetchall_results=[
+            [(1, "Ana"), (2, "Beatriz"), (3, "Cora")],
+            [("Carla", 4)],
+        ],
+    )
+    mock_db(connection)
+    records = [
+        {"nombre": "Ana"},
+        {"id": 2, "nombre": "Bea"},
+        {"id": 3, "nombre": "Beatriz"},
+        {"nombre": "Carla"},
+        {"nombre": "Carla"},
+        {"id": 7, "nombre": "Dora"},
+    ]
+
+    response = app_client.post("/autores/bulk", json=records, headers=AUTH)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item["status"] for item in data["items"]] == [
+        "unchanged",
+        "updated",
+        "error",
+        "created",
+        "error",
+        "error",
+    ]
+    assert [item.get("id") for item in data["items"][:4]] == [1, 2, None, 4]
+    assert "pertenece al autor 2" in data["items"][2]["error"]
+    assert data["version"] == 9
+    assert connection.queries[1][0].startswith("UPDATE autores")
+    assert connection.commits == 1
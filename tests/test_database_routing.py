@@ -0,0 +1,82 @@
+import psycopg2
+import pytest
+from flask import Flask
+
+from app.utils import database
+from app.web.consistency import RYW_COOKIE, init_consistency, mark_write
+
+
+@pytest.fixture
+def cluster(monkeypatch, mock_connection, mock_db):
+    state = {"down": set(), "lag": {}}
+
+    def connect(*args, **kwargs):
+        host = kwargs.get("host")
+        if host in state["down"]:
+            raise psycopg2.OperationalError("connection refused")
+        lag = state["lag"].get(host, 0.0)
+        return mock_connection(host=host, fetchone=(lag,))
+
+    monkeypatch.setenv("POSTGRES_HOST", "primary")
+    mock_db(connect)
+    monkeypatch.setattr("app.settings.POSTGRES_READ_HOSTS", "replica-a,replica-b:5433")
+    monkeypatch.setattr("app.settings.POSTGRES_READ_LAG_CHECK_SECONDS", 0.0)
+    monkeypatch.setattr(database, "_router", None)
+    return state
+
+
+def test_reads_round_robin_between_replicas(cluster):
+    hosts = [database.get_read_connection().host for _ in range(4)]
+    assert sorted(hosts[:2]) == ["replica-a", "replica-b"]
+    assert hosts[:2] == hosts[2:]
+    assert database.get_write_connection().host == "primary"
+
+
+def test_failed_replica_is_skipped_until_retry(cluster):
+    cluster["down"].add("replica-a")
+    hosts = {database.get_read_connection().host for _ in range(4)}
+    assert hosts == {"replica-b"}
+
+    cluster["down"].add("replica-b")
+    assert database.get_read_connection().host == "primary"
+
+
+def test_lagging_replica_falls_back_to_primary(cluster, monkeypatch):
+    monkeypatch.setattr("app.settings.POSTGRES_READ_MAX_LAG", 5.0)
+    cluster["lag"] = {"replica-a": 30.0, "replica-b": 12.0}
+    assert database.get_read_connection().host == "primary"
+
+    cluster["lag"]["replica-b"] = 0.5
+    assert {database.get_read_connection().host for _ in range(2)} == {"replica-b"}
+
+
+def test_use_primary_pins_reads(cluster):
+    with database.use_primary():
+        assert database.get_read_connection().host == "primary"
+    assert database.get_read_connection().host != "primary"
+
+
+def test_read_your_writes_header_and_cookie(cluster):
+    app = Flask(__name__)
+    init_consistency(app)
+
+    @app.route("/read")
+    def read():
+        return database.get_read_connection().host
+
+    @app.route("/write", methods=["POST"])
+    def write():
+        mark_write()
+        return database.get_read_connection().host
+
+    client = app.test_client()
+    assert client.get("/read", headers={"X-Read-Your-Writes": "1"}).text == "primary"
+
+    response = client.post("/write")
+    assert response.text == "primary"
+    assert RYW_COOKIE in response.headers["Set-Cookie"]
+    # La cookie mantiene las lecturas siguientes en el primario.
+    assert client.get("/read").text == "primary"
+
+    client.delete_cookie(RYW_COOKIE)
+    assert client.get("/read").text.startswith("replica")
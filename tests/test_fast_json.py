@@ -0,0 +1,128 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+from app.models.obra import Obra
+from app.services.obras_service import OBRA_COLUMNS
+from app.utils import fast_json
+from app.web.compression import init_compression
+from app.web.json_provider import FastJSONProvider, json_response
+
+ROWS = [
+    (
+        1,
+        'Escultura "Uno"',
+        10,
+        "Autor Ñ",
+        1999,
+        "Escultura",
+        "Comuna 1",
+        None,
+        None,
+        None,
+        6.27,
+        -75.55,
+    ),
+    (
+        2,
+        "Obra Dos",
+        12,
+        "Autor 2",
+        None,
+        None,
+        None,
+        "Barrio",
+        "Calle 1",
+        "Texto\nlargo",
+        None,
+        None,
+    ),
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(fast_json, "_orjson", None)
+    return request.param
+
+
+def test_rows_to_json_matches_dict_path(backend):
+    encoded = fast_json.rows_to_json(ROWS, OBRA_COLUMNS)
+    assert json.loads(encoded) == [Obra._make(row).to_dict() for row in ROWS]
+    assert fast_json.rows_to_json([], OBRA_COLUMNS) == "[]"
+
+
+def test_rows_to_json_projects_columns(backend, monkeypatch):
+    monkeypatch.setattr(fast_json, "ROWS_CHUNK", 1)  # Fuerza varios lotes.
+    columns = Obra.columns(("lon", "id"))
+    assert json.loads(fast_json.rows_to_json(ROWS, columns)) == [
+        {"lon": -75.55, "id": 1},
+        {"lon": None, "id": 2},
+    ]
+    assert json.loads(fast_json.rows_to_json(ROWS, Obra.columns(("nombre",)))) == [
+        {"nombre": 'Escultura "Uno"'},
+        {"nombre": "Obra Dos"},
+    ]
+
+
+def test_dumps_embeds_raw_fragments(backend):
+    payload = {
+        "autor": {"id": 5, "nombre": "Ana"},
+        "obras": {"items": fast_json.RawJSON('[{"id":1}]'), "meta": {"total": 1}},
+    }
+    assert json.loads(fast_json.dumps(payload)) == {
+        "autor": {"id": 5, "nombre": "Ana"},
+        "obras": {"items": [{"id": 1}], "meta": {"total": 1}},
+    }
+
+
+def _make_app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    init_compression(app)
+
+    @app.route("/big")
+    def big():
+        return json_response({"items": fast_json.rows_to_json(ROWS * 50, OBRA_COLUMNS)})
+
+    @app.route("/small")
+    def small():
+        return json_response({"ok": True})
+
+    return app
+
+
+def test_compression_respects_min_size(monkeypatch):
+    monkeypatch.setattr("app.settings.COMPRESSION_MIN_SIZE", 1024)
+    client = _make_app().test_client()
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(json.loads(gzip.decompress(response.data))["items"]) == 100
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"ok": True}
+
+
+def test_compression_prefers_brotli_when_available(monkeypatch):
+    brotli = pytest.importorskip("brotli")
+    client = _make_app().test_client()
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert len(json.loads(brotli.decompress(response.data))["items"]) == 100
+
+
+def test_compression_can_be_disabled(monkeypatch):
+    monkeypatch.setattr("app.settings.COMPRESSION_ENABLED", False)
+    client = _make_app().test_client()
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
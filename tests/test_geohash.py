@@ -0,0 +1,112 @@
+import math
+import random
+
+import pytest
+from flask import Flask
+
+from app.repositories.obras_repository import list_obras
+from app.repositories.spatial import near_clauses
+from app.services import density_service
+from app.utils import geohash
+from app.web.routes.mapa_routes import mapa_bp
+
+
+def test_encode_matches_reference_and_prefixes_nest():
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    cell = geohash.encode(6.2447, -75.5794)
+    assert len(cell) == geohash.STORED_PRECISION
+    assert geohash.encode(6.2447, -75.5794, 5) == cell[:5]
+    south, west, north, east = geohash.bbox(cell[:5])
+    assert south <= 6.2447 <= north and west <= -75.5794 <= east
+    with pytest.raises(ValueError):
+        geohash.bbox("d3a")  # La 'a' no pertenece al alfabeto.
+
+
+def _distance(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6_356_752 * math.asin(math.sqrt(a))  # Radio polar: distancias pesimistas.
+
+
+def test_cover_contains_every_point_of_the_circle():
+    rng = random.Random(7)
+    for _ in range(3000):
+        lat, lon = rng.uniform(-70, 70), rng.uniform(-180, 180)
+        radius = 10 ** rng.uniform(0, 5.5)
+        cells = geohash.cover(lat, lon, radius)
+        assert len(cells) == 9
+        bearing = rng.uniform(0, 2 * math.pi)
+        step = radius * math.sqrt(rng.random()) / 111_000
+        plat = lat + step * math.cos(bearing)
+        plon = lon + step * math.sin(bearing) / math.cos(math.radians(lat))
+        plon = (plon + 180) % 360 - 180
+        if _distance(lat, lon, plat, plon) > radius:
+            continue
+        point = geohash.encode(plat, plon)
+        assert any(point.startswith(cell) for cell in cells)
+
+    assert geohash.cover(89.9, 0.0, 50_000) == ()
+
+
+def test_near_prefilter_keeps_exact_check(monkeypatch):
+    near = {"lat": 6.25, "lon": -75.57, "radius": 500}
+    clauses, params = near_clauses(near)
+    assert clauses[0].count("o.geohash >= %s") == 9
+    assert clauses[-1].startswith("ST_DWithin")
+    assert params[:2] == ["d34780", "d34780{"]
+    assert params[-3:] == [-75.57, 6.25, 500]
+
+    monkeypatch.setattr("app.settings.GEOHASH_PREFILTER", False)
+    clauses, params = near_clauses(near)
+    assert len(clauses) == 1 and params == [-75.57, 6.25, 500]
+
+
+def test_near_without_cover_queries_only_dwithin(mock_connection):
+    connection = mock_connection(fetchone=(0,))
+    near = {"lat": 6.25, "lon": -75.57, "radius": 15_000_000}
+    assert geohash.cover(near["lat"], near["lon"], near["radius"]) == ()
+
+    list_obras(connection, near=near, limit=10, offset=0)
+
+    assert len(connection.queries) == 2  # COUNT y datos.
+    for sql, params in connection.queries:
+        assert "ST_DWithin" in sql and "geohash" not in sql
+        assert params[:3] == [-75.57, 6.25, 15_000_000]
+
+
+@pytest.fixture
+def client(monkeypatch, mock_db):
+    queries = []
+    mock_db(queries=queries, fetchone=(1,), fetchall=[("d3478", 4), ("d347b", 1)])
+    monkeypatch.setattr("app.services.density_service.current_version", lambda: 1)
+    density_service.reset()
+    app = Flask(__name__)
+    app.register_blueprint(mapa_bp)
+    yield app.test_client(), queries
+    density_service.reset()
+
+
+def test_density_counts_per_cell_and_caches(client):
+    http, queries = client
+    response = http.get("/api/obras_density?precision=5&cell=d34")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total"] == 5
+    assert [item["cell"] for item in data["cells"]] == ["d3478", "d347b"]
+    south, west, north, east = data["cells"][0]["bbox"]
+    assert south < data["cells"][0]["lat"] < north and west < data["cells"][0]["lon"] < east
+    assert queries[0][1] == [5, "d34", "d34{"]
+
+    http.get("/api/obras_density?precision=5&cell=D34")
+    assert len(queries) == 1
+
+
+@pytest.mark.parametrize(
+    "query", ["precision=0", "precision=x", "precision=3&cell=d3478", "cell=d3a"]
+)
+def test_density_rejects_invalid_params(client, query):
+    http, _ = client
+    assert http.get(f"/api/obras_density?{query}").status_code == 400
@@ -0,0 +1,118 @@
+import json
+import time
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+
+from app import settings
+from app.repositories.dataset_repository import DATASET_CHANNEL, bump_dataset_version
+from app.services import dataset_service, invalidation_service
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", False)
+    dataset_service.reset()
+    yield
+    invalidation_service.stop()
+    dataset_service.reset()
+
+
+@pytest.fixture
+def make_connection(mock_connection):
+    def make(version=1):
+        return mock_connection(version=version, fetchone=_version)
+
+    return make
+
+
+def _version(cursor):
+    return (cursor.connection.version,)
+
+
+def test_bump_queues_notification_with_version(make_connection):
+    conn = make_connection(version=7)
+    assert bump_dataset_version(conn) == 7
+
+    sql, params = conn.queries[-1]
+    assert "pg_notify" in sql
+    assert params[0] == DATASET_CHANNEL
+    payload = json.loads(params[1])
+    assert payload["version"] == 7
+    assert payload["sent_at"] == pytest.approx(time.time(), abs=5)
+
+
+def test_notification_applies_newer_version_and_measures_latency():
+    dataset_service.set_version(3)
+    changes = []
+    listener = dataset_service.on_version_change(lambda old, new: changes.append((old, new)))
+    try:
+        sent_at = time.time() - 0.25
+        payload = json.dumps({"version": 4, "sent_at": sent_at})
+        assert invalidation_service.handle_notification(payload, received_at=sent_at + 0.25)
+    finally:
+        dataset_service._listeners.remove(listener)
+
+    assert changes == [(3, 4)]
+    assert dataset_service.current_version() == 4
+    stats = invalidation_service.stats()
+    assert stats["last_version"] == 4
+    assert stats["last_latency_ms"] == pytest.approx(250, abs=1)
+
+
+def test_stale_or_invalid_notifications_are_ignored():
+    dataset_service.set_version(5)
+
+    assert not invalidation_service.handle_notification(json.dumps({"version": 5}))
+    assert not invalidation_service.handle_notification(json.dumps({"version": 4}))
+    assert not invalidation_service.handle_notification("no es json")
+    assert dataset_service.current_version() == 5
+
+
+def test_listener_drains_notifications(monkeypatch, make_connection, mock_db):
+    conn = make_connection(version=1)
+    monkeypatch.setattr(invalidation_service, "get_listen_connection", lambda: conn)
+    mock_db(conn)
+
+    def fake_select(readers, writers, errors, timeout):
+        conn.notifies.append(SimpleNamespace(payload=json.dumps({"version": 2})))
+        invalidation_service._stop.set()
+        return readers, [], []
+
+    monkeypatch.setattr(invalidation_service.select, "select", fake_select)
+    invalidation_service._stop.clear()
+    invalidation_service._listen()
+
+    assert conn.queries[0][0] == f"LISTEN {DATASET_CHANNEL}"
+    assert conn.closed
+    assert conn.notifies == []
+    assert dataset_service.current_version() == 2
+
+
+def test_falls_back_to_polling_when_listen_fails(monkeypatch, make_connection, mock_db):
+    conn = make_connection(version=1)
+
+    def refuse():
+        raise psycopg2.OperationalError("LISTEN no soportado")
+
+    monkeypatch.setattr(invalidation_service, "get_listen_connection", refuse)
+    mock_db(conn)
+    monkeypatch.setattr(settings, "INVALIDATION_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "DATASET_VERSION_TTL", 60.0)
+    changes = []
+    listener = dataset_service.on_version_change(lambda old, new: changes.append((old, new)))
+    try:
+        assert invalidation_service.start()
+        deadline = time.monotonic() + 2
+        while invalidation_service.stats()["last_version"] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn.version = 2
+        while not changes and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        invalidation_service.stop()
+        dataset_service._listeners.remove(listener)
+
+    assert changes == [(1, 2)]
+    assert invalidation_service.stats()["listen_errors"] >= 1
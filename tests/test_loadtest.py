@@ -0,0 +1,91 @@
+import itertools
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from app.services import dataset_service, obras_service
+from scripts.loadtest import (
+    BUILDERS,
+    DEFAULT_MIX,
+    Client,
+    Recorder,
+    _percentile,
+    compare,
+    generate_plan,
+    load_catalog,
+    parse_mix,
+    run_closed,
+    stub_patches,
+    summarize,
+)
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog()
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 95) == 95
+    assert _percentile(values, 99) == 99
+    assert _percentile([7.0], 99) == 7.0
+
+
+def test_plan_is_replayable_from_seed(catalog):
+    first = list(itertools.islice(generate_plan(DEFAULT_MIX, catalog, seed=7), 200))
+    again = list(itertools.islice(generate_plan(DEFAULT_MIX, catalog, seed=7), 200))
+    other = list(itertools.islice(generate_plan(DEFAULT_MIX, catalog, seed=8), 200))
+    assert first == again
+    assert first != other
+    assert {route for route, _ in first} == set(BUILDERS)
+    assert all(path.startswith("/") for _, path in first)
+
+
+def test_mix_rejects_unknown_routes():
+    assert parse_mix("obras=3,mapa") == {"obras": 3.0, "mapa": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("obras=1,nada=2")
+
+
+def test_compare_reports_percentile_deltas():
+    recorder = Recorder()
+    for value in (10.0, 20.0, 30.0):
+        recorder.add("obras", "200", value)
+    baseline = summarize(recorder, 1.0, {})
+    recorder.add("obras", "500", 300.0)
+    current = summarize(recorder, 1.0, {})
+
+    rows = {row["route"]: row for row in compare(current, baseline)}
+    assert current["routes"]["obras"]["errors"] == 1
+    assert rows["obras"]["p99_ms_delta"] == 270.0
+    assert rows["obras"]["p99_ms_pct"] == 900.0
+    assert rows["total"]["error_rate_delta"] == 0.25
+
+
+def test_stubbed_app_serves_the_whole_mix(monkeypatch, catalog):
+    for module, name, value in stub_patches(catalog, scale=1):
+        monkeypatch.setattr(module, name, value)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_ENABLED", False)
+    from app.web.flask_app import create_app
+
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = Client(f"http://127.0.0.1:{server.server_port}", timeout=10)
+        plan = generate_plan(DEFAULT_MIX, catalog, seed=3)
+        recorder, elapsed = run_closed(client, plan, concurrency=4, requests=60, duration=None)
+    finally:
+        server.shutdown()
+        thread.join()
+        dataset_service.reset()
+        obras_service.reset_geo_cache()
+
+    result = summarize(recorder, elapsed, {})
+    assert result["total"]["requests"] == 60
+    assert result["total"]["errors"] == 0
+    for stats in result["routes"].values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
@@ -0,0 +1,238 @@
+import struct
+import time
+
+import pytest
+from flask import Flask
+
+from app.utils.refresher import BackgroundRefresher
+from app.web.routes.mapa_routes import mapa_bp
+
+ROWS = [
+    (
+        1,
+        "Obra Uno",
+        10,
+        "Autor",
+        1999,
+        "Escultura",
+        "Comuna 1",
+        None,
+        None,
+        None,
+        6.25,
+        -75.5,
+    ),
+    (
+        2,
+        "Sin coordenadas",
+        10,
+        "Autor",
+        2000,
+        "Escultura",
+        "Comuna 1",
+        None,
+        None,
+        None,
+        None,
+        None,
+    ),
+    (
+        3,
+        "Obra Tres",
+        11,
+        "Otra Autora",
+        None,
+        "Escultura",
+        None,
+        None,
+        None,
+        None,
+        6.3,
+        -75.6,
+    ),
+]
+
+
+@pytest.fixture
+def app_client(monkeypatch, mock_db):
+    monkeypatch.setattr("app.settings.GEO_REFRESH_ENABLED", False)
+    mock_db(fetchone=(len(ROWS),), fetchall=ROWS)
+    app = Flask(__name__)
+    app.register_blueprint(mapa_bp)
+    return app.test_client()
+
+
+def test_obras_geo_skips_rows_without_coordinates(app_client):
+    response = app_client.get("/api/obras_geo")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total"] == 2
+    assert data["items"][0] == {
+        "id": 1,
+        "nombre": "Obra Uno",
+        "autor": "Autor",
+        "anio": 1999,
+        "tipo": "Escultura",
+        "comuna": "Comuna 1",
+        "lat": 6.25,
+        "lon": -75.5,
+    }
+
+
+def test_obras_geo_columnar_dictionary_encodes(app_client):
+    response = app_client.get("/api/obras_geo?format=columnar")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["format"] == "columnar"
+    assert data["columns"]["id"] == [1, 3]
+    assert data["columns"]["lat"] == [6.25, 6.3]
+    assert data["dictionaries"]["autor"] == ["Autor", "Otra Autora"]
+    assert data["columns"]["autor"] == [0, 1]
+    assert data["dictionaries"]["tipo"] == ["Escultura"]
+    assert data["columns"]["tipo"] == [0, 0]
+    assert data["columns"]["comuna"] == [0, None]
+
+
+def test_obras_geo_binary_layout(app_client):
+    response = app_client.get("/api/obras_geo?format=binary")
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.pm.geo"
+    buf = response.data
+
+    assert buf[:4] == b"PMG1"
+    count, string_count, field_count = struct.unpack_from("<III", buf, 4)
+    assert (count, field_count) == (2, 4)
+    pos = 16
+    lats = struct.unpack_from(f"<{count}f", buf, pos)
+    pos += 4 * count
+    lons = struct.unpack_from(f"<{count}f", buf, pos)
+    pos += 4 * count
+    ids = struct.unpack_from(f"<{count}I", buf, pos)
+    pos += 4 * count
+    years = struct.unpack_from(f"<{count}i", buf, pos)
+    pos += 4 * count
+    indexes = struct.unpack_from(f"<{count * field_count}I", buf, pos)
+    pos += 4 * count * field_count
+    offsets = struct.unpack_from(f"<{string_count + 1}I", buf, pos)
+    blob = buf[pos + 4 * (string_count + 1) :]
+    strings = [blob[offsets[i] : offsets[i + 1]].decode() for i in range(string_count)]
+
+    assert lats == pytest.approx((6.25, 6.3))
+    assert lons == pytest.approx((-75.5, -75.6))
+    assert ids == (1, 3)
+    assert years == (1999, -1)
+    nombres = [strings[index] for index in indexes[:count]]
+    assert nombres == ["Obra Uno", "Obra Tres"]
+    assert indexes[3 * count + 1] == 0xFFFFFFFF  # comuna nula
+
+
+def test_obras_geo_invalid_format(app_client):
+    response = app_client.get("/api/obras_geo?format=xml")
+    assert response.status_code == 400
+    assert "format" in response.get_json()["error"]
+
+
+@pytest.fixture
+def geo_refresh(monkeypatch, mock_db):
+    from app.services import obras_service
+
+    state = {"version": 1, "connections": mock_db(fetchone=(len(ROWS),), fetchall=ROWS)}
+    monkeypatch.setattr("app.settings.GEO_REFRESH_ENABLED", True)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_INTERVAL", 3600.0)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_JITTER", 0.0)
+    monkeypatch.setattr(obras_service, "current_version", lambda: state["version"])
+    monkeypatch.setattr(obras_service, "peek_version", lambda: state["version"])
+    obras_service.reset_geo_cache()
+    yield obras_service, state
+    obras_service.reset_geo_cache()
+
+
+def test_obras_geo_served_from_memory_and_refreshed_in_background(geo_refresh):
+    obras_service, state = geo_refresh
+
+    first = obras_service.get_obras_geo("columnar")
+    assert first["columns"]["id"] == [1, 3]
+    assert len(state["connections"]) == 1
+
+    # Todos los formatos se precalculan en la misma carga.
+    obras_service.get_obras_geo("binary")
+    obras_service.get_obras_geo()
+    assert len(state["connections"]) == 1
+
+    # Nueva versión: se responde con la copia actual y se recarga en segundo plano.
+    state["version"] = 2
+    assert obras_service.get_obras_geo("columnar") is first
+    holder = obras_service._geo_refresher()
+    for _ in range(100):
+        if holder.stats()["version"] == 2:
+            break
+        time.sleep(0.02)
+    assert holder.stats()["version"] == 2
+    assert len(state["connections"]) == 2
+    assert holder.stats()["stale_hits"] == 1
+
+
+def test_obras_geo_blocks_past_max_staleness(geo_refresh, monkeypatch):
+    obras_service, state = geo_refresh
+    monkeypatch.setattr("app.settings.GEO_MAX_STALENESS", 0.0)
+
+    obras_service.get_obras_geo()
+    obras_service.get_obras_geo()
+
+    assert len(state["connections"]) == 2
+    assert obras_service._geo_refresher().stats()["blocking_loads"] == 2
+
+
+def test_obras_geo_request_does_not_read_the_version(monkeypatch, mock_db):
+    from app.services import dataset_service, obras_service
+
+    connections = mock_db(fetchone=(1,), fetchall=ROWS)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_ENABLED", True)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_INTERVAL", 3600.0)
+    monkeypatch.setattr("app.settings.DATASET_VERSION_TTL", 3600.0)
+    dataset_service.reset()
+    obras_service.reset_geo_cache()
+    try:
+        obras_service.get_obras_geo()
+        opened = len(connections)
+
+        # Con el TTL vencido, la petición compara con la versión en memoria sin ir a la base.
+        monkeypatch.setattr("app.settings.DATASET_VERSION_TTL", 0.0)
+        for _ in range(3):
+            obras_service.get_obras_geo()
+        assert len(connections) == opened
+        assert obras_service._geo_refresher().stats()["hits"] == 3
+    finally:
+        obras_service.reset_geo_cache()
+        dataset_service.reset()
+
+
+def test_background_thread_rechecks_the_version():
+    state = {"version": 1, "loads": 0}
+
+    def load():
+        state["loads"] += 1
+        return state["loads"]
+
+    holder = BackgroundRefresher(
+        "prueba",
+        load,
+        version=lambda: state["version"],
+        peek=lambda: None,
+        interval=3600.0,
+        jitter=0.0,
+        max_stale=3600.0,
+        check_interval=0.01,
+    )
+    try:
+        assert holder.get() == 1
+        state["version"] = 2
+        for _ in range(100):
+            if holder.stats()["version"] == 2:
+                break
+            time.sleep(0.02)
+        assert holder.stats()["version"] == 2
+        assert holder.get() == 2
+        assert holder.stats()["stale_hits"] == 0
+    finally:
+        holder.stop()
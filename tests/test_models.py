@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from app.models import Autor, Obra
+from scripts.bench_models import measure, rows_to_dicts, rows_to_models, sample_rows
+
+ROW = (
+    7,
+    "Pájaros",
+    3,
+    "Botero",
+    1993,
+    "Escultura",
+    "Comuna 10",
+    "Centro",
+    None,
+    None,
+    6.25,
+    -75.56,
+)
+
+
+def test_obra_wraps_cursor_row_positionally():
+    obra = Obra._make(ROW)
+    assert obra == ROW
+    assert obra.autor == "Botero"
+    assert obra[10:] == (6.25, -75.56)
+    assert not hasattr(obra, "__dict__")
+
+
+def test_to_dict_and_to_json_respect_field_order():
+    obra = Obra._make(ROW)
+    assert list(obra.to_dict(("lat", "id"))) == ["lat", "id"]
+    assert obra.to_dict()["descripcion"] is None
+    assert json.loads(Obra.to_json([obra], ("id", "nombre"))) == [{"id": 7, "nombre": "Pájaros"}]
+
+    autor = Autor(3, "Botero", 12)
+    assert autor.to_dict() == {"id": 3, "nombre": "Botero", "total_obras": 12}
+    assert json.loads(Autor.to_json([autor], ("nombre",))) == [{"nombre": "Botero"}]
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError, match="Campo desconocido: 'precio'"):
+        Obra.columns(("id", "precio"))
+
+
+def test_models_retain_less_memory_than_dicts():
+    rows = sample_rows(2000)
+    _, dict_bytes = measure(rows_to_dicts, rows)
+    _, model_bytes = measure(rows_to_models, rows)
+    assert model_bytes < dict_bytes / 2
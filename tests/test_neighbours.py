@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+from app.services import dataset_service, neighbours_service
+from app.utils.neighbours import NeighbourIndex, compute_knn, update_knn, write_neighbours
+from app.web.routes.obras_routes import obras_bp
+
+
+def _random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.sort(rng.choice(10 * n, n, replace=False)).astype(np.int64)
+    return ids, 6.2 + rng.random(n) * 0.1, -75.6 + rng.random(n) * 0.1
+
+
+def test_incremental_update_matches_full_computation():
+    ids, lat, lon = _random_points(500)
+    previous = compute_knn(ids, lat, lon, 8)
+
+    lat, lon = lat.copy(), lon.copy()
+    lat[[3, 100]] += 0.01  # Dos obras se mueven.
+    keep = np.ones(len(ids), dtype=bool)
+    keep[[10, 20]] = False  # Dos desaparecen y llegan dos nuevas.
+    ids = np.concatenate((ids[keep], [10**6, 10**6 + 1]))
+    lat = np.concatenate((lat[keep], [6.25, 6.26]))
+    lon = np.concatenate((lon[keep], [-75.55, -75.56]))
+
+    table, recomputed = update_knn(previous, ids, lat, lon)
+    expected = compute_knn(ids, lat, lon, 8)
+
+    assert np.array_equal(table.idx, expected.idx)
+    assert np.allclose(table.dist, expected.dist)
+    assert 4 <= recomputed < len(ids) // 2
+
+
+def test_unchanged_coordinates_recompute_nothing():
+    ids, lat, lon = _random_points(50)
+    previous = compute_knn(ids, lat, lon, 8)
+    _, recomputed = update_knn(previous, ids, lat, lon)
+    assert recomputed == 0
+
+
+def test_fewer_obras_than_k_are_padded(tmp_path):
+    ids, lat, lon = _random_points(3)
+    path = write_neighbours(tmp_path / "vecinos.bin", 4, compute_knn(ids, lat, lon, 5))
+
+    index = NeighbourIndex(path)
+    assert index.version == 4
+    assert index.k == 5
+    nearest = index.neighbours(int(ids[0]))
+    assert sorted(pid for pid, _ in nearest) == sorted(int(i) for i in ids[1:])
+    assert nearest[0][1] <= nearest[1][1]
+    with pytest.raises(KeyError):
+        index.neighbours(-1)
+
+
+POINTS = [
+    (1, 6.200, -75.5),
+    (2, 6.210, -75.5),
+    (3, 6.230, -75.5),
+    (4, 6.265, -75.5),
+    (5, 6.310, -75.5),
+    (6, 6.320, -75.5),
+]
+
+
+@pytest.fixture
+def db_state(monkeypatch, tmp_path, mock_db):
+    state = {"version": 1, "points": list(POINTS), "queries": []}
+
+    def fetchall(cursor):
+        if "ANY" in cursor.sql:
+            ids = set(cursor.params[0])
+            return [(pid, f"Obra {pid}", None, lat, lon) for pid, lat, lon in POINTS if pid in ids]
+        if "<->" in cursor.sql:
+            return [(2, "Obra 2", None, 6.21, -75.5, 1111.9)]
+        return list(state["points"])
+
+    monkeypatch.setattr("app.settings.NEIGHBOURS_ENABLED", True)
+    monkeypatch.setattr("app.settings.NEIGHBOURS_PATH", str(tmp_path / "vecinos.bin"))
+    monkeypatch.setattr("app.settings.NEIGHBOURS_K", 2)
+    mock_db(
+        queries=state["queries"], fetchone=lambda cursor: (state["version"],), fetchall=fetchall
+    )
+    dataset_service.reset()
+    neighbours_service.reset()
+    yield state
+    dataset_service.reset()
+    neighbours_service.reset()
+
+
+def test_build_updates_only_moved_neighbourhoods(db_state):
+    first = neighbours_service.build_neighbours()
+    assert first == {"version": 1, "obras": 6, "recalculadas": 6}
+
+    # La obra 6 se aleja un poco: solo ella y la 5 (su vecina) se recalculan.
+    db_state["points"][5] = (6, 6.325, -75.5)
+    db_state["version"] = 2
+    second = neighbours_service.build_neighbours()
+    assert second == {"version": 2, "obras": 6, "recalculadas": 2}
+
+    index = NeighbourIndex(neighbours_service._path())
+    assert index.version == 2
+    assert [pid for pid, _ in index.neighbours(5)] == [6, 4]
+    assert [pid for pid, _ in index.neighbours(1)] == [2, 3]
+
+
+def test_cercanas_uses_precomputed_table(db_state):
+    app = Flask(__name__)
+    app.register_blueprint(obras_bp)
+    client = app.test_client()
+
+    response = client.get("/obras/1/cercanas?limit=5")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["source"] == "precomputed"
+    assert [item["id"] for item in data["items"]] == [2, 3]
+    assert data["items"][0]["distancia_m"] == pytest.approx(1112, rel=1e-2)
+    assert not any("<->" in sql for sql, _ in db_state["queries"])
+
+    assert client.get("/obras/99/cercanas").status_code == 404
+    assert client.get("/obras/1/cercanas?limit=x").status_code == 400
+
+
+def test_cercanas_falls_back_to_postgis(db_state, monkeypatch):
+    monkeypatch.setattr("app.settings.NEIGHBOURS_ENABLED", False)
+    app = Flask(__name__)
+    app.register_blueprint(obras_bp)
+
+    data = app.test_client().get("/obras/1/cercanas").get_json()
+    assert data["source"] == "database"
+    assert data["items"][0]["id"] == 2
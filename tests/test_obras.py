@@ -228,3 +228,98 @@ def test_list_obras_no_results(monkeypatch, app_client):
     assert data["meta"]["total"] == 0
     assert data["meta"]["total_pages"] == 1
     assert data["meta"]["count"] == 0
+
+
+def _obra_row(obra_id):
+    return (obra_id, f"Obra {obra_id}", 10, "Autor", 1999, None, None, None, None, None, None, None)
+
+
+def test_list_obras_estimated_total_without_filters(monkeypatch, app_client):
+    connection = MockConnection(
+        fetchone_results=[(12000,)],
+        fetchall_results=[[_obra_row(1), _obra_row(2), _obra_row(3)]],
+    )
+    monkeypatch.setattr(
+        "app.utils.database.psycopg2.connect",
+        lambda *args, **kwargs: connection,
+    )
+
+    response = app_client.get("/obras?count=estimate&limit=2")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item["id"] for item in data["items"]] == [1, 2]
+    assert data["meta"]["count_mode"] == "estimate"
+    assert data["meta"]["total"] == 12000
+    assert data["meta"]["has_next"] is True
+    assert "pg_class" in connection.queries[0][0]
+    assert not any("COUNT(*)" in sql for sql, _ in connection.queries)
+    # Se pide una fila extra para saber si hay página siguiente.
+    assert connection.queries[1][1][-2:] == [3, 0]
+
+
+def test_list_obras_estimated_total_with_filters_uses_planner(monkeypatch, app_client):
+    plan = [{"Plan": {"Node Type": "Hash Join", "Plan Rows": 42}}]
+    connection = MockConnection(
+        fetchone_results=[(plan,)],
+        fetchall_results=[[_obra_row(1)]],
+    )
+    monkeypatch.setattr(
+        "app.utils.database.psycopg2.connect",
+        lambda *args, **kwargs: connection,
+    )
+
+    response = app_client.get("/obras?count=estimate&comuna=Centro")
+
+    data = response.get_json()
+    assert connection.queries[0][0].startswith("EXPLAIN (FORMAT JSON) SELECT 1 FROM obras")
+    assert data["meta"]["total"] == 42
+    assert data["meta"]["has_next"] is False
+
+
+def test_list_obras_without_total(monkeypatch, app_client):
+    connection = MockConnection(fetchall_results=[[_obra_row(1), _obra_row(2)]])
+    monkeypatch.setattr(
+        "app.utils.database.psycopg2.connect",
+        lambda *args, **kwargs: connection,
+    )
+
+    response = app_client.get("/obras?count=none&limit=1&offset=5")
+
+    meta = response.get_json()["meta"]
+    assert len(connection.queries) == 1
+    assert meta["count_mode"] == "none"
+    assert meta["total"] is None
+    assert meta["total_pages"] is None
+    assert meta["has_next"] is True
+    assert meta["next_offset"] == 6
+
+
+def test_list_obras_invalid_count_mode(app_client):
+    response = app_client.get("/obras?count=aprox")
+    assert response.status_code == 400
+    assert "count" in response.get_json()["error"]
+
+
+def test_list_obras_fields_pushed_down_to_select(monkeypatch, app_client):
+    row = (3, "Mural", None, None, None, None, None, None, None, None, 6.25, -75.56)
+    connection = MockConnection(fetchone_results=[(1,)], fetchall_results=[[row]])
+    monkeypatch.setattr(
+        "app.utils.database.psycopg2.connect",
+        lambda *args, **kwargs: connection,
+    )
+
+    response = app_client.get("/obras?fields=lat,id,lon,id")
+    assert response.status_code == 200
+    assert response.get_json()["items"] == [{"lat": 6.25, "id": 3, "lon": -75.56}]
+
+    data_sql = connection.queries[1][0]
+    assert "o.descripcion" not in data_sql
+    assert "a.nombre" not in data_sql.split("FROM")[0]
+    assert data_sql.count("ST_Y") == 1
+
+
+def test_list_obras_unknown_field_returns_400(app_client):
+    response = app_client.get("/obras?fields=id,precio")
+    assert response.status_code == 400
+    assert "precio" in response.get_json()["error"]
@@ -0,0 +1,70 @@
+import pytest
+
+from app.web.flask_app import create_app
+from app.web.template_cache import fragment_cache
+
+
+@pytest.fixture
+def queries(mock_db):
+    executed = []
+    mock_db(queries=executed, fetchone=(3,), fetchall=[(1, "Ana", 3), (2, "Andrés", 2)])
+    return executed
+
+
+@pytest.fixture
+def version(monkeypatch):
+    state = {"value": 1}
+    monkeypatch.setattr(
+        "app.web.template_cache.current_version", lambda: state["value"]
+    )
+    return state
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.settings.JINJA_BYTECODE_CACHE_DIR", str(tmp_path / "jinja"))
+    fragment_cache.clear()
+    return create_app().test_client()
+
+
+def test_autores_page_served_from_fragment_cache(client, queries, version):
+    response = client.get("/autores/page?nombre=an&limit=1")
+    assert response.status_code == 200
+    assert "Andrés" in response.get_data(as_text=True)
+    assert "offset=1" in response.get_data(as_text=True)
+    executed = len(queries)
+    assert executed == 2
+
+    # Mismos filtros en otro orden: misma clave normalizada, sin consultas nuevas.
+    response = client.get("/autores/page?limit=1&nombre=an&min_obras=")
+    assert response.status_code == 200
+    assert 'value="an"' in response.get_data(as_text=True)
+    assert len(queries) == executed
+
+    version["value"] = 2
+    client.get("/autores/page?nombre=an&limit=1")
+    assert len(queries) == executed + 2
+
+
+def test_invalid_filters_are_not_cached(client, queries, version):
+    response = client.get("/autores/page?min_obras=5&max_obras=1")
+    assert response.status_code == 400
+    assert "No pudimos interpretar" in response.get_data(as_text=True)
+    assert queries == []
+    assert len(fragment_cache) == 0
+
+
+def test_templates_precompiled_to_bytecode_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "bytecode"
+    monkeypatch.setattr("app.settings.JINJA_BYTECODE_CACHE_DIR", str(cache_dir))
+    create_app()
+    assert len(list(cache_dir.iterdir())) >= 5
+
+
+def test_unfiltered_page_shows_estimated_total(client, queries, version):
+    response = client.get("/autores/page?limit=1")
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "Aprox. 3 autores encontrados" in html
+    assert "count=estimate" in html
+    assert not any("COUNT(*)" in sql for sql, _ in queries)
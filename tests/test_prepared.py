@@ -0,0 +1,114 @@
+from collections import OrderedDict
+
+import pytest
+
+from app.utils import database, prepared
+from app.utils.query_log import timed_execute
+
+
+SQL = "SELECT COUNT(*) FROM obras o WHERE o.anio = %s AND o.comuna = %s"
+
+
+@pytest.fixture
+def make_connection(mock_connection):
+    def make(preparing=True):
+        attributes = {"prepared_statements": OrderedDict()} if preparing else {}
+        return mock_connection(fetchone=(0,), **attributes)
+
+    return make
+
+
+def test_statement_for_is_stable_and_numbers_placeholders():
+    name, converted = prepared.statement_for(SQL)
+
+    assert prepared.statement_for(SQL) == (name, converted)
+    assert name.startswith("pm_")
+    assert converted == "SELECT COUNT(*) FROM obras o WHERE o.anio = $1 AND o.comuna = $2"
+
+
+def test_prepares_once_then_executes(make_connection):
+    conn = make_connection()
+
+    with conn.cursor() as cur:
+        timed_execute(cur, SQL, [1990, "Santiago"], source="test", statement="count", shape="anio")
+        timed_execute(cur, SQL, [2001, "Providencia"], source="test", statement="count", shape="anio")
+
+    name, converted = prepared.statement_for(SQL)
+    assert conn.queries == [
+        (f"PREPARE {name} AS {converted}", None),
+        (f"EXECUTE {name} (%s, %s)", [1990, "Santiago"]),
+        (f"EXECUTE {name} (%s, %s)", [2001, "Providencia"]),
+    ]
+
+
+def test_plain_connections_and_disabled_setting_run_sql_directly(monkeypatch, make_connection):
+    plain = make_connection(preparing=False)
+    with plain.cursor() as cur:
+        prepared.execute(cur, SQL, [1990, "Santiago"])
+    assert plain.queries == [(SQL, [1990, "Santiago"])]
+
+    monkeypatch.setattr("app.settings.PREPARED_STATEMENTS", False)
+    conn = make_connection()
+    with conn.cursor() as cur:
+        prepared.execute(cur, SQL, [1990, "Santiago"])
+    assert conn.queries == [(SQL, [1990, "Santiago"])]
+
+
+def test_least_recently_used_statement_is_deallocated(monkeypatch, make_connection):
+    monkeypatch.setattr("app.settings.PREPARED_CACHE_SIZE", 2)
+    conn = make_connection()
+    statements = [f"SELECT {n} WHERE x = %s" for n in range(3)]
+
+    with conn.cursor() as cur:
+        for sql in statements:
+            prepared.execute(cur, sql, [1])
+
+    oldest, _ = prepared.statement_for(statements[0])
+    assert (f"DEALLOCATE {oldest}", None) in conn.queries
+    assert oldest not in conn.prepared_statements
+    assert len(conn.prepared_statements) == 2
+
+
+def test_pool_reuses_connections_and_rolls_back(monkeypatch, make_connection, mock_db):
+    created = []
+
+    def connect(*args, **kwargs):
+        conn = make_connection()
+        created.append(conn)
+        return conn
+
+    monkeypatch.setenv("POSTGRES_HOST", "primary")
+    mock_db(connect)
+    monkeypatch.setattr("app.settings.POSTGRES_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "_pools", {})
+
+    first = database.get_connection()
+    first.close()
+    second = database.get_connection()
+    third = database.get_connection()
+    second.close()
+    third.close()
+
+    assert len(created) == 2
+    assert created[0].rollbacks == 2
+    assert not created[0].closed
+    assert created[1].closed
+
+
+def test_unpooled_connections_do_not_prepare(monkeypatch, make_connection, mock_db):
+    created = []
+
+    def connect(*args, **kwargs):
+        conn = make_connection(preparing="connection_factory" in kwargs)
+        created.append(conn)
+        return conn
+
+    monkeypatch.setenv("POSTGRES_HOST", "primary")
+    mock_db(connect)
+    monkeypatch.setattr("app.settings.POSTGRES_POOL_SIZE", 0)
+
+    conn = database.get_connection()
+    with conn.cursor() as cur:
+        timed_execute(cur, SQL, [1990, "Santiago"], source="test", statement="count", shape="anio")
+
+    assert created[0].queries == [(SQL, [1990, "Santiago"])]
@@ -0,0 +1,79 @@
+import gzip
+import json
+
+import pytest
+
+from app.services import obras_service
+from app.web.flask_app import create_app
+from app.web.template_cache import fragment_cache
+from scripts.prerender import build
+
+OBRAS = [
+    (1, "Obra Uno", 10, "Autor", 1999, "Escultura", "Comuna 1", None, None, None, 6.25, -75.5),
+    (2, "Obra Dos", 11, "Otra", None, None, None, None, None, None, None, None),
+]
+AUTORES = [(10, "Autor", 1), (11, "Otra", 1)]
+
+
+@pytest.fixture
+def catalog(monkeypatch, tmp_path, mock_db):
+    state = {"version": 1, "obras": list(OBRAS)}
+
+    def fetchone(cursor):
+        if "dataset_version" in cursor.sql:
+            return (state["version"],)
+        if "FROM autores WHERE id" in cursor.sql:
+            autor_id = cursor.params[0]
+            return next(((a, n) for a, n, _ in AUTORES if a == autor_id), None)
+        return (len(state["obras"]),)
+
+    def fetchall(cursor):
+        if "agg" in cursor.sql:
+            return list(AUTORES)
+        return list(state["obras"])
+
+    mock_db(fetchone=fetchone, fetchall=fetchall)
+    monkeypatch.setattr("app.settings.JINJA_BYTECODE_CACHE_DIR", str(tmp_path / "jinja"))
+    monkeypatch.setattr("app.settings.FRAGMENT_CACHE_ENABLED", False)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_ENABLED", False)
+    fragment_cache.clear()
+    obras_service.reset_geo_cache()
+    return state
+
+
+def test_prerender_writes_pages_with_compressed_siblings(catalog, tmp_path):
+    out = tmp_path / "site"
+    app = create_app()
+
+    result = build(out, app=app)
+
+    assets = len(app.extensions["assets"].by_name)
+    assert result["written"] == 7 + 2 * assets
+    assert (out / "assets/css/styles.css.gz").exists()
+    html = (out / "obras/page/offset-0.html").read_bytes()
+    assert b"Obra Uno" in html
+    assert gzip.decompress((out / "obras/page/offset-0.html.gz").read_bytes()) == html
+    assert (out / "autores/page/offset-0.html").exists()
+    detail = json.loads((out / "autores/10.json").read_text())
+    assert detail["autor"]["nombre"] == "Autor"
+    assert (out / "api/obras_geo.bin").exists()
+    manifest = json.loads((out / "manifest.json").read_text())
+    assert manifest["dataset_version"] == 1
+
+
+def test_prerender_skips_unchanged_version_and_rewrites_only_changed(catalog, tmp_path):
+    out = tmp_path / "site"
+    app = create_app()
+    build(out, app=app)
+
+    assert build(out, app=app)["written"] == 0
+
+    catalog["version"] = 2
+    catalog["obras"][1] = (2, "Obra Dos", 11, "Otra", 2005, None, None, None, None, None, None, None)
+    result = build(out, app=app)
+
+    # Cambian el listado de obras y los detalles de autor (el mock no filtra por
+    # autor); el listado de autores y el mapa (obra sin coordenadas) se conservan.
+    assert result["written"] == 3
+    assert result["unchanged"] == 4 + 2 * len(app.extensions["assets"].by_name)
+    assert b"2005" in (out / "obras/page/offset-0.html").read_bytes()
@@ -0,0 +1,123 @@
+import logging
+from collections import OrderedDict
+
+import pytest
+from flask import Flask
+
+from app.utils import database, prepared, query_log, query_stats
+from app.web.query_debug import init_query_debug
+
+
+@pytest.fixture
+def connection(mock_connection, mock_db):
+    return mock_db(mock_connection(fetchall_results=[[(1,), (2,), (3,)]]))
+
+
+def _lookup(autor_id):
+    conn = database.get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT nombre FROM autores WHERE id = %s", (autor_id,))
+            return cur.fetchone()
+    finally:
+        conn.close()
+
+
+def test_connections_are_untouched_outside_a_scope(connection):
+    assert database.get_read_connection() is connection
+
+
+def test_track_counts_connections_statements_and_rows(connection):
+    with query_stats.track() as stats:
+        conn = database.get_read_connection()
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM obras")
+            cur.fetchall()
+        _lookup(1)
+
+    assert stats.as_dict() == {"connections": 2, "statements": 2, "rows": 3}
+    assert stats.repeated() == {}
+
+
+def test_budget_fails_when_exceeded(connection, query_budget):
+    with pytest.raises(query_stats.QueryBudgetExceeded, match="connections: 2 > 1"):
+        with query_budget(connections=1):
+            _lookup(1)
+            _lookup(2)
+
+
+def test_budget_flags_repeated_statements(connection, query_budget):
+    with pytest.raises(query_stats.QueryBudgetExceeded, match="repetida 3 veces"):
+        with query_budget():
+            for _ in range(3):
+                _lookup(7)
+
+    with query_budget(allow_repeats=True) as stats:
+        _lookup(7)
+        _lookup(7)
+    assert len(stats.statements) == 2
+
+
+def test_slow_log_explain_is_not_counted(monkeypatch, connection):
+    monkeypatch.setattr("app.settings.SLOW_QUERY_EXPLAIN", "plain")
+    connection.fetchone_results = [([{"Plan": {}}],)]
+
+    with query_stats.track() as stats:
+        conn = database.get_read_connection()
+        plan = query_log._explain(conn, "SELECT id FROM obras WHERE anio = %s", [1990])
+
+    assert plan == [{"Plan": {}}]
+    assert connection.queries[0][0] == "SAVEPOINT slow_query_explain"
+    assert any(sql.startswith("EXPLAIN") for sql in connection.statements)
+    assert stats.as_dict() == {"connections": 1, "statements": 0, "rows": 0}
+
+
+def test_prepared_statements_count_once_and_show_their_sql(monkeypatch, connection):
+    monkeypatch.setattr("app.settings.PREPARED_STATEMENTS", True)
+    connection.prepared_statements = OrderedDict()
+    sql = "SELECT nombre FROM obras WHERE id = %s"
+
+    with query_stats.track() as stats:
+        conn = database.get_read_connection()
+        with conn.cursor() as cur:
+            prepared.execute(cur, sql, [1])
+
+    assert connection.queries[0][0].startswith("PREPARE ")
+    assert len(stats.statements) == 1
+    assert query_stats.display_sql(stats.statements[0][0]) == sql
+
+
+def test_debug_mode_reports_and_logs_repeats(monkeypatch, caplog, mock_connection, mock_db):
+    monkeypatch.setattr("app.settings.QUERY_DEBUG", True)
+    app = Flask(__name__)
+    init_query_debug(app)
+
+    @app.route("/n-mas-uno")
+    def n_plus_one():
+        for _ in range(2):
+            _lookup(3)
+        return "ok"
+
+    mock_db(mock_connection(fetchone_results=[("Ana",), ("Ana",)]))
+    with caplog.at_level(logging.INFO, logger="app.query_debug"):
+        response = app.test_client().get("/n-mas-uno")
+
+    assert response.headers["X-Query-Connections"] == "2"
+    assert response.headers["X-Query-Statements"] == "2"
+    assert response.headers["X-Query-Rows"] == "2"
+    assert "Sentencia repetida 2 veces" in caplog.text
+    assert query_stats._scopes.get() == ()
+
+
+def test_debug_mode_off_adds_nothing(connection):
+    app = Flask(__name__)
+    init_query_debug(app)
+
+    @app.route("/consulta")
+    def one_query():
+        _lookup(1)
+        return "ok"
+
+    response = app.test_client().get("/consulta")
+    assert response.status_code == 200
+    assert "X-Query-Statements" not in response.headers
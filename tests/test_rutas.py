@@ -0,0 +1,136 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from app.utils.tour import haversine_matrix, path_length, solve
+from app.web.routes.rutas_routes import rutas_bp
+
+# Obras sobre una línea al norte del inicio, devueltas desordenadas.
+ROWS = [
+    (3, "Tercera", "Autor", 6.230, -75.5),
+    (1, "Primera", "Autor", 6.210, -75.5),
+    (4, "Cuarta", None, 6.240, -75.5),
+    (2, "Segunda", "Otra", 6.220, -75.5),
+]
+
+
+def _fetchall(cursor):
+    rows = list(ROWS)
+    if "ANY" in cursor.sql:
+        ids = set(cursor.params[0])
+        rows = [row for row in rows if row[0] in ids]
+    if "ST_DWithin" in cursor.sql:
+        lon, lat, radius = cursor.params[-4:-1]
+        dist = haversine_matrix(
+            np.array([lat, *(row[3] for row in rows)]), np.array([lon, *(row[4] for row in rows)])
+        )
+        rows = [row for row, metres in zip(rows, dist[0, 1:]) if metres <= radius]
+    return rows
+
+
+@pytest.fixture
+def app_client(mock_db):
+    mock_db(fetchall=_fetchall)
+    app = Flask(__name__)
+    app.register_blueprint(rutas_bp)
+    return app.test_client()
+
+
+def _brute_force(dist, closed):
+    n = dist.shape[0]
+    best = float("inf")
+    for perm in itertools.permutations(range(1, n)):
+        path = np.array((0, *perm, 0) if closed else (0, *perm))
+        best = min(best, path_length(path, dist))
+    return best
+
+
+def test_haversine_matrix_matches_known_distance():
+    # Un grado de latitud son ~111.2 km.
+    dist = haversine_matrix(np.array([0.0, 1.0]), np.array([0.0, 0.0]))
+    assert dist[0, 1] == pytest.approx(111_195, rel=1e-3)
+    assert dist[0, 0] == 0
+    assert np.allclose(dist, dist.T)
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_solver_finds_optimum_on_small_tours(closed):
+    rng = np.random.default_rng(7)
+    for _ in range(5):
+        dist = haversine_matrix(6.2 + rng.random(8) * 0.05, -75.6 + rng.random(8) * 0.05)
+        tour = solve(dist, closed=closed, time_budget=1.0)
+        assert tour.order[0] == 0
+        assert sorted(tour.order) == list(range(8))
+        assert tour.distance == pytest.approx(_brute_force(dist, closed))
+
+
+def test_solver_handles_hundreds_of_stops_within_budget():
+    rng = np.random.default_rng(3)
+    dist = haversine_matrix(6.2 + rng.random(400) * 0.08, -75.6 + rng.random(400) * 0.08)
+
+    started = time.monotonic()
+    tour = solve(dist, time_budget=0.5)
+
+    assert time.monotonic() - started < 1.5
+    assert sorted(tour.order) == list(range(400))
+    assert tour.distance <= tour.initial_distance
+
+
+def test_rutas_orders_stops_from_start(app_client):
+    response = app_client.get("/rutas?lat=6.2&lon=-75.5&obras=4,1,3,2,99")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [stop["id"] for stop in data["paradas"]] == [1, 2, 3, 4]
+    assert data["paradas"][0]["orden"] == 1
+    assert data["meta"]["omitidas"] == [99]
+    assert data["meta"]["circular"] is False
+    assert data["regreso_m"] is None
+    # Cuatro tramos de 0.01° de latitud (~1.11 km cada uno).
+    assert data["distancia_total_m"] == pytest.approx(4 * 1112, rel=1e-2)
+    assert data["distancia_total_m"] == pytest.approx(
+        sum(stop["distancia_desde_anterior_m"] for stop in data["paradas"]), abs=1
+    )
+    assert data["duracion_estimada_min"] > 0
+
+
+def test_rutas_circular_returns_to_start(app_client):
+    response = app_client.get("/rutas?lat=6.2&lon=-75.5&comuna=Comuna%201&circular=true")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["meta"]["circular"] is True
+    assert data["regreso_m"] > 0
+    assert data["distancia_total_m"] == pytest.approx(8 * 1112, rel=1e-2)
+
+
+def test_rutas_reports_ids_outside_the_filters_apart(app_client):
+    response = app_client.get("/rutas?lat=6.2&lon=-75.5&obras=4,1,99,2&radius=2500")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [stop["id"] for stop in data["paradas"]] == [1, 2]
+    assert data["meta"]["omitidas"] == [99]
+    assert data["meta"]["fuera_de_filtro"] == [4]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "obras=1,2",
+        "lat=6.2&lon=-75.5",
+        "lat=6.2&lon=-75.5&obras=1,x",
+        "lat=6.2&lon=-75.5&radius=-1",
+        "lat=6.2&lon=-75.5&obras=1&circular=tal vez",
+    ],
+)
+def test_rutas_rejects_invalid_params(app_client, query):
+    response = app_client.get(f"/rutas?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_rutas_rejects_too_many_stops(app_client, monkeypatch):
+    monkeypatch.setattr("app.settings.RUTAS_MAX_PARADAS", 3)
+    response = app_client.get("/rutas?lat=6.2&lon=-75.5&radius=5000")
+    assert response.status_code == 400
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from app.services import obras_service
+from app.utils.singleflight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"ok": True}
+
+    results, errors = _run_concurrently(8, lambda: flight.do("k", slow))
+
+    assert errors == []
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"executions": 1, "coalesced": 7, "in_flight": 0}
+
+    # Sin caché: una llamada posterior vuelve a ejecutar.
+    flight.do("k", slow)
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test-errors")
+
+    def failing():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    results, errors = _run_concurrently(4, lambda: flight.do("k", failing))
+
+    assert results == []
+    assert len(errors) == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_disabled_setting_runs_every_call(monkeypatch):
+    monkeypatch.setattr("app.settings.SINGLE_FLIGHT_ENABLED", False)
+    flight = SingleFlight("test-disabled")
+    calls = []
+    flight.do("k", lambda: calls.append(1))
+    flight.do("k", lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def slow_list_obras(monkeypatch):
+    calls = []
+
+    class Conn:
+        def close(self):
+            return None
+
+    def list_obras(conn, **kwargs):
+        calls.append(kwargs)
+        time.sleep(0.1)
+        return [], 0
+
+    monkeypatch.setattr(obras_service, "get_read_connection", Conn)
+    monkeypatch.setattr(obras_service, "list_obras", list_obras)
+    return calls
+
+
+def test_identical_obras_queries_coalesce(slow_list_obras):
+    params = [{"comuna": "Centro", "limit": "10"}, {"limit": "10", "comuna": "Centro", "tipo": ""}]
+
+    results, errors = _run_concurrently(
+        6, lambda: obras_service.get_obras(params[threading.get_ident() % 2])
+    )
+
+    assert errors == []
+    assert len(results) == 6
+    assert len(slow_list_obras) == 1
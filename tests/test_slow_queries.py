@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.repositories.obras_repository import list_obras
+from app.utils.query_log import query_shape, redact_params
+from scripts.slow_queries import read_entries, summarize
+
+
+@pytest.fixture
+def slow_log(monkeypatch, tmp_path):
+    path = tmp_path / "slow.log"
+    monkeypatch.setattr("app.settings.SLOW_QUERY_THRESHOLD_MS", 0.0)
+    monkeypatch.setattr("app.settings.SLOW_QUERY_LOG_PATH", str(path))
+    monkeypatch.setattr("app.settings.SLOW_QUERY_REDACT", "strings")
+    return path
+
+
+def test_query_shape_marks_deep_offset():
+    shape = query_shape({"autor": "bot", "near": {"lat": 1}, "tipo": None}, 5000)
+    assert shape == "autor+near+offset:deep"
+    assert query_shape({"autor": ""}, 0) == "sin_filtros"
+
+
+def test_redact_params_modes():
+    assert redact_params(["%bot%", 10], "strings") == ["<str>", 10]
+    assert redact_params(["%bot%", 10], "all") == ["<str>", "<int>"]
+    assert redact_params(["%bot%", 10], "none") == ["%bot%", 10]
+
+
+def test_slow_statements_are_logged_with_plan(slow_log, mock_connection):
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Total Cost": 42.0}}]
+    connection = mock_connection(
+        # El EXPLAIN se ejecuta antes de leer el resultado de la consulta original.
+        fetchone_results=[(plan,), (3,), (plan,)],
+        fetchall_results=[[]],
+    )
+
+    list_obras(connection, autor="bot", limit=10, offset=2000)
+
+    explains = [sql for sql in connection.statements if sql.startswith("EXPLAIN")]
+    assert len(explains) == 2
+    assert explains[0].startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT COUNT(*)")
+
+    entries = list(read_entries(slow_log))
+    assert [entry["statement"] for entry in entries] == ["count", "data"]
+    assert entries[0]["shape"] == "autor+offset:deep"
+    assert entries[0]["params"] == ["<str>"]
+    assert entries[1]["params"] == ["<str>", 10, 2000]
+    assert entries[0]["plan"] == plan
+
+
+def test_summarize_groups_by_shape(tmp_path):
+    path = tmp_path / "slow.log"
+    lines = [
+        {"source": "list_obras", "statement": "data", "shape": "autor", "elapsed_ms": 10},
+        {"source": "list_obras", "statement": "data", "shape": "autor", "elapsed_ms": 30},
+        {"source": "list_autores", "statement": "count", "shape": "nombre", "elapsed_ms": 5},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+
+    summary = summarize(read_entries(path))
+    assert summary[0]["shape"] == "autor"
+    assert summary[0]["count"] == 2
+    assert summary[0]["total"] == 40
+    assert summary[0]["max"] == 30
+    assert summary[1]["source"] == "list_autores"
@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+from app.services import snapshot_service
+from app.services.obras_service import get_obras_geo
+from app.utils.snapshot import Snapshot, read_header, write_snapshot
+
+OBRAS = [
+    (
+        1,
+        "Obra Uno",
+        10,
+        "Autor",
+        1999,
+        "Escultura",
+        "Comuna 1",
+        None,
+        None,
+        None,
+        6.25,
+        -75.5,
+    ),
+    (2, "Sin coordenadas", 10, "Autor", None, None, None, None, None, None, None, None),
+    (3, "Obra Ñ", 11, "Otra", 2001, "Mural", "Comuna 2", "B", "D", "Texto", 6.3, -75.6),
+]
+AUTORES = [(10, "Autor", 2), (11, "Otra", 1)]
+
+
+def _fetchall(cursor):
+    return list(AUTORES) if "agg" in cursor.sql else list(OBRAS)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = write_snapshot(tmp_path / "data.bin", 7, OBRAS, AUTORES)
+    assert read_header(path) == (7, 3, 2)
+
+    snapshot = Snapshot(path)
+    assert snapshot.version == 7
+    assert list(snapshot.obras()) == OBRAS
+    assert list(snapshot.autores()) == AUTORES
+    assert list(snapshot.ids) == [1, 2, 3]
+    assert math.isnan(snapshot.lat[1])
+    assert snapshot.located_indexes() == [0, 2]
+    snapshot.close()
+
+
+@pytest.fixture
+def snapshot_env(monkeypatch, tmp_path, mock_connection, mock_db):
+    state = {"version": 1, "connections": []}
+
+    def connect(*args, **kwargs):
+        connection = mock_connection(fetchone=(state["version"],), fetchall=_fetchall)
+        state["connections"].append(connection)
+        return connection
+
+    mock_db(connect)
+    monkeypatch.setattr("app.settings.SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr("app.settings.GEO_REFRESH_ENABLED", False)
+    monkeypatch.setattr(
+        "app.settings.SNAPSHOT_PATH", str(tmp_path / "snap" / "data.bin")
+    )
+    monkeypatch.setattr(
+        "app.services.snapshot_service.current_version", lambda: state["version"]
+    )
+    snapshot_service.reset()
+    yield state
+    snapshot_service.reset()
+
+
+def test_geo_served_from_snapshot_and_swapped_on_new_version(snapshot_env):
+    payload = get_obras_geo("columnar")
+    assert payload["columns"]["id"] == [1, 3]
+    built = len(snapshot_env["connections"])
+    assert built == 1
+
+    # Con la misma versión no se vuelve a consultar la base de datos.
+    get_obras_geo()
+    assert len(snapshot_env["connections"]) == built
+
+    snapshot_env["version"] = 2
+    get_obras_geo()
+    assert len(snapshot_env["connections"]) == built + 1
+    assert snapshot_service.get_snapshot().version == 2
@@ -0,0 +1,129 @@
+import re
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from app.repositories import obras_repository
+from app.services import dataset_service, neighbours_service, spatial_service
+from app.utils.spatial_index import SpatialIndex, haversine_to
+from app.web.routes.obras_routes import obras_bp
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = 6.15 + rng.random(n) * 0.2
+    lon = -75.65 + rng.random(n) * 0.2
+    lat[::50] = np.nan  # Obras sin coordenadas.
+    return lat, lon
+
+
+def test_radius_bbox_and_nearest_match_brute_force():
+    lat, lon = _points(3000)
+    index = SpatialIndex(lat, lon, cell_deg=0.005)
+    assert len(index) == 3000 - 60
+    distances = np.where(np.isnan(lat), np.inf, haversine_to(6.25, -75.57, lat, lon))
+
+    positions, metres = index.within_radius(6.25, -75.57, 800)
+    assert np.array_equal(positions, np.flatnonzero(distances <= 800))
+    assert np.allclose(metres, distances[positions])
+
+    box = index.within_bbox(6.2, -75.6, 6.22, -75.55)
+    expected = np.flatnonzero((lat >= 6.2) & (lat <= 6.22) & (lon >= -75.6) & (lon <= -75.55))
+    assert np.array_equal(box, expected)
+
+    nearest, metres = index.nearest(6.25, -75.57, 5)
+    assert np.array_equal(nearest, np.argsort(distances, kind="stable")[:5])
+    assert list(metres) == sorted(metres)
+
+
+def test_bbox_across_antimeridian():
+    index = SpatialIndex([0.0, 0.0, 0.0], [179.5, -179.5, 10.0])
+    assert list(index.within_bbox(-1, 179, 1, -179)) == [0, 1]
+
+
+# id, nombre, autor_id, autor, anio, tipo, comuna, barrio, direccion, descripcion, lat, lon
+ROWS = [
+    (1, "Gorda", 1, "Botero", 1986, "Escultura", "Centro", None, None, None, 6.2500, -75.5700),
+    (2, "Pájaros", 1, "Botero", 1993, "Escultura", "Centro", None, None, None, 6.2510, -75.5700),
+    (3, "Mural", 2, "Otra", 1993, "Mural", "Laureles", None, None, None, 6.2525, -75.5700),
+    (4, "Lejana", 2, "Otra", 2000, "Escultura", "Centro", None, None, None, 6.3000, -75.5700),
+    (5, "Sin punto", 2, "Otra", 2001, "Busto", "Centro", None, None, None, None, None),
+]
+
+
+@pytest.fixture
+def client(monkeypatch, mock_db):
+    queries = []
+    monkeypatch.setattr("app.settings.SPATIAL_INDEX_ENABLED", True)
+    mock_db(queries=queries, fetchone=(1,), fetchall=ROWS)
+    dataset_service.reset()
+    spatial_service.reset()
+    neighbours_service.reset()
+    app = Flask(__name__)
+    app.register_blueprint(obras_bp)
+    yield app.test_client(), queries
+    dataset_service.reset()
+    spatial_service.reset()
+
+
+def test_near_filter_is_evaluated_in_memory(client):
+    http, queries = client
+    data = http.get("/obras?lat=6.25&lon=-75.57&radius=300&tipo=Escultura").get_json()
+    assert [item["id"] for item in data["items"]] == [1, 2]
+    assert data["meta"]["total"] == 2
+    assert not any("ST_DWithin" in sql for sql, _ in queries)
+
+    queries.clear()
+    data = http.get("/obras?lat=6.25&lon=-75.57&radius=300&autor=bot&limit=1&offset=1")
+    assert [item["id"] for item in data.get_json()["items"]] == [2]
+    assert not any("FROM obras" in sql for sql, _ in queries)  # Índice ya construido.
+
+
+def test_cercanas_uses_memory_index(client):
+    http, queries = client
+    data = http.get("/obras/2/cercanas?limit=2").get_json()
+    assert data["source"] == "memory"
+    assert [item["id"] for item in data["items"]] == [1, 3]
+    assert data["items"][0]["distancia_m"] == pytest.approx(111.2, abs=0.5)
+    assert not any("<->" in sql for sql, _ in queries)
+    assert http.get("/obras/5/cercanas").status_code == 404
+
+
+def _ilike(pattern, text):
+    # LIKE (con barra invertida como escape) traducido a regex: lo que haría PostgreSQL.
+    regex = ""
+    escaped = False
+    for char in pattern:
+        if escaped:
+            regex += re.escape(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        else:
+            regex += re.escape(char)
+    return re.fullmatch(regex, text, re.IGNORECASE | re.DOTALL) is not None
+
+
+def test_autor_filter_matches_sql_semantics(mock_db):
+    autores = ["Grupo a_b", "Grupo axb", "50% Colectivo", "Sin_Nombre"]
+    rows = [row[:3] + (autor,) + row[4:] for row, autor in zip(ROWS, autores)]
+    mock_db(fetchall=rows)
+    catalog = spatial_service.build_catalog(1)
+    near = {"lat": 6.25, "lon": -75.57, "radius": 10_000}
+
+    for autor in ("a_b", "A_B", "0%", "n_n", "_"):
+        _, params = obras_repository._build_filters(autor, None, None, None, None, None)
+        expected = sorted(row[0] for row in rows if _ilike(params[0], row[3]))
+        found, total = spatial_service.list_obras_near(
+            catalog, near=near, autor=autor, limit=10, offset=0
+        )
+        assert sorted(obra.id for obra in found) == expected, autor
+        assert total == len(expected)
+
+    _, params = obras_repository._build_filters("a_b", None, None, None, None, None)
+    assert [row[0] for row in rows if _ilike(params[0], row[3])] == [1]
@@ -0,0 +1,91 @@
+import pytest
+from flask import Flask
+
+from app.models import Autor, Obra
+from app.services import suggest_service
+from app.utils.prefix_index import PrefixIndex, fold
+from app.web.routes.autores_routes import autores_bp
+from app.web.routes.obras_routes import obras_bp
+
+AUTORES = [
+    Autor(1, "Débora Arango", 4),
+    Autor(2, "Fernando Botero", 23),
+    Autor(3, "Bernardo Díaz", 2),
+    Autor(4, "Rodrigo Arenas Betancourt", 9),
+]
+OBRAS = [
+    Obra._make((10, "La Gorda", 2, "Fernando Botero", 1986, None, None, None, None, None, None, None)),
+    Obra._make((11, "Monumento a la Raza", 4, "Rodrigo Arenas Betancourt", 1988, None, None, None, None, None, None, None)),
+    Obra._make((12, "Lámpara", 3, "Bernardo Díaz", 1990, None, None, None, None, None, None, None)),
+]
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    state = {"autores": list(AUTORES), "obras": list(OBRAS), "loads": 0}
+
+    def load_rows():
+        state["loads"] += 1
+        return state["autores"], state["obras"]
+
+    monkeypatch.setattr(suggest_service, "_load_rows", load_rows)
+    monkeypatch.setattr(suggest_service, "current_version", lambda: 1)
+    suggest_service.reset()
+    yield state
+    suggest_service.reset()
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(autores_bp)
+    app.register_blueprint(obras_bp)
+    return app.test_client()
+
+
+def test_fold_strips_accents_and_case():
+    assert fold("  Débora   ARANGO ") == "debora arango"
+
+
+def test_prefix_index_matches_words_and_orders_by_weight():
+    index = PrefixIndex((nombre, total, autor_id) for autor_id, nombre, total in AUTORES)
+
+    assert index.search("deb", 5) == [1]
+    assert index.search("ar", 5) == [4, 1]  # "Arenas" pesa más que "Arango"
+    assert index.search("B", 2) == [2, 4]
+    assert index.search("bo", 1) == [2]
+    assert index.search("zz", 5) == []
+    assert index.search("", 5) == []
+
+
+def test_autores_suggest(client, rows):
+    response = client.get("/autores/suggest?q=ber")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["q"] == "ber"
+    assert data["items"] == [{"id": 3, "nombre": "Bernardo Díaz", "total_obras": 2}]
+
+
+def test_obras_suggest_weighted_by_author(client, rows):
+    response = client.get("/obras/suggest?q=la")
+
+    names = [item["nombre"] for item in response.get_json()["items"]]
+    assert names == ["La Gorda", "Monumento a la Raza", "Lámpara"]
+
+
+def test_suggest_validates_limit_and_skips_empty_query(client, rows):
+    assert client.get("/autores/suggest?q=a&limit=x").status_code == 400
+    assert client.get("/obras/suggest").get_json()["items"] == []
+    assert rows["loads"] == 0
+
+
+def test_index_rebuilt_after_version_change(client, rows):
+    client.get("/autores/suggest?q=a")
+    rows["autores"] = [*AUTORES, Autor(5, "Ana Mercedes Hoyos", 1)]
+
+    suggest_service._rebuild(2)
+
+    items = client.get("/autores/suggest?q=hoy").get_json()["items"]
+    assert [item["id"] for item in items] == [5]
+    assert rows["loads"] == 2